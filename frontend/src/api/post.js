@@ -43,7 +43,8 @@ export const fetchInbox = async (authorId) => {
   if (!response.ok) {
     throw new Error('Error fetching posts')
   }
-  return data.items;
+  // The inbox also holds comments, likes and follow requests
+  return data.items.filter((item) => item.type === 'post');
 }
 
 export const fetchPost = async (postId) => {
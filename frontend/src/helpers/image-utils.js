@@ -0,0 +1,4 @@
+// Build an <img> srcset from the resized variants of a stored image, e.g. {"320": url, ...}
+export const variantSrcset = (variants) => {
+    return Object.entries(variants || {}).map(([width, url]) => `${url} ${width}w`).join(', ')
+}
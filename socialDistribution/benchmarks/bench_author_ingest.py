@@ -0,0 +1,65 @@
+"""
+Benchmark creating local copies of remote authors.
+
+Compares the previous addOrGetRemoteAuthor body, which hashed a password
+with create_user and made several single-row queries per author, against
+the bulk ingest_remote_authors path.
+
+Usage:
+    python benchmarks/bench_author_ingest.py [authors ...]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+"""
+
+import sys
+import uuid
+
+from common import measure, test_database
+
+from django.contrib.auth.models import User
+
+from project.directory import ingest_remote_authors
+from project.models import Author
+
+HOST = "https://remote.example.com/"
+
+
+def remote_authors(count):
+    ids = [uuid.uuid4() for _ in range(count)]
+    return [{"type": "author", "id": f"{HOST}authors/{author_id}", "url": f"{HOST}authors/{author_id}",
+             "host": HOST, "displayName": f"remote{i}", "github": None, "profileImage": None}
+            for i, author_id in enumerate(ids)]
+
+
+def per_author_create(authors):
+    """The previous addOrGetRemoteAuthor body, once per author."""
+    for remote_author in authors:
+        author_id = remote_author["id"].split('/')[-1]
+        query = Author.objects.filter(pk=author_id)
+        if query.count() == 0:
+            user = User.objects.create_user(username=author_id, password="inactive")
+            user.is_active = False
+            user.save()
+            Author.objects.create(user=user, id=author_id, url=remote_author["url"], host=remote_author["host"],
+                                  displayName=remote_author["displayName"], github=remote_author["github"],
+                                  profileImage="https://clipart-library.com/img/1331574.jpg")
+
+
+def main(sizes):
+    with test_database():
+        for size in sizes:
+            print(f"--- {size} remote authors")
+            with measure("create_user per author"):
+                per_author_create(remote_authors(size))
+            with measure("ingest_remote_authors"):
+                ingest_remote_authors(remote_authors(size))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100])
@@ -0,0 +1,84 @@
+"""
+Benchmark the peak memory used to store one uploaded image.
+
+Compares the previous CreatePostView code, which read the whole upload and
+base64-encoded it into Post.content, against HashingUploadHandler followed by
+store_upload, which stream the upload to disk a chunk at a time and then move
+the file into the blob store. Peak memory is the largest amount allocated by
+Python while handling the upload, as measured by tracemalloc; the upload is
+fed to the handler in 64 KiB chunks, as Django's multipart parser does.
+
+Usage:
+    python benchmarks/bench_image_upload.py [megabytes ...]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.python.org/3/library/tracemalloc.html
+"""
+
+import base64
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import common  # noqa: F401 (sets up Django)
+
+from django.test import override_settings
+
+from project.blobs import store_upload
+from project.uploads import HashingUploadHandler
+
+CHUNK = 64 * 1024
+
+
+def upload(size):
+    """Stream `size` bytes through the upload handler, as the multipart parser would."""
+    handler = HashingUploadHandler()
+    handler.new_file("picture", "picture.jpg", "image/jpeg", None)
+    for start in range(0, size, CHUNK):
+        handler.receive_data_chunk(os.urandom(min(CHUNK, size - start)), start)
+    return handler.file_complete(size)
+
+
+def read_and_encode(uploaded):
+    """The previous CreatePostView code."""
+    uploaded.seek(0)
+    return 'data:image/jpeg;base64,' + str(base64.b64encode(uploaded.file.read()).decode('ascii'))
+
+
+def store_and_close(uploaded):
+    """Store an upload, then close it as Django does at the end of a request."""
+    store_upload(uploaded)
+    uploaded.close()
+
+
+def peak(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {elapsed * 1000:>10.1f} ms {peak_bytes / 2 ** 20:>8.2f} MiB peak")
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as blob_root, \
+            override_settings(BLOB_ROOT=blob_root, UPLOAD_MAX_BYTES=max(sizes) * 2 ** 20):
+        for megabytes in sizes:
+            size = megabytes * 2 ** 20
+            print(f"--- {megabytes} MiB upload")
+            uploaded = upload(size)
+            peak("read and base64-encode", lambda: read_and_encode(uploaded))
+            uploaded.close()
+            peak("stream to handler, store_upload", lambda: store_and_close(upload(size)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1, 5, 20])
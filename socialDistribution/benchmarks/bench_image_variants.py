@@ -0,0 +1,100 @@
+"""
+Benchmark the bytes a client downloads to show one page of image posts.
+
+Compares three ways of loading the page:
+    base64 content - images inlined in the JSON, as before images were stored
+        as blobs (and as still sent to nodes with inlineImages)
+    original images - the JSON page, then every image at full size
+    320px variants - the JSON page, then every image's 320px variant; the
+        first pass makes the variants, the second serves them from disk
+
+The images are synthetic noisy photos, which compress about as badly as
+real ones.
+
+Usage:
+    python benchmarks/bench_image_variants.py [posts] [width] [height]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.effect_noise
+"""
+
+import base64
+import io
+import sys
+import tempfile
+
+from common import measure, test_database
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from project.models import Author, Node, Post
+
+
+def noisy_jpeg(width, height, seed):
+    """A JPEG of smooth colour with noise on top."""
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = [Image.effect_noise((width, height), 40 + seed + channel * 5) for channel in range(3)]
+    image = Image.merge("RGB", [Image.blend(base, layer, 0.5) for layer in noise])
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def download(client, url):
+    resp = client.get(url)
+    if hasattr(resp, "streaming_content"):
+        return len(b"".join(resp.streaming_content))
+    return len(resp.content)
+
+
+def load_page(client, page_url, image_url=None):
+    """Download the page and, with `image_url`, every image on it. Returns the bytes downloaded."""
+    resp = client.get(page_url)
+    total = len(resp.content)
+    for post in resp.data["items"]:
+        if image_url is not None:
+            total += download(client, image_url(post))
+    return total
+
+
+def main(posts, width, height):
+    with tempfile.TemporaryDirectory() as blob_root, override_settings(BLOB_ROOT=blob_root), test_database():
+        alice = Author.objects.create(user=User.objects.create(username="alice"), displayName="alice")
+        node = Node.objects.create(user=User.objects.create(username="bench-node"), host="https://remote.example.com/")
+        for i in range(posts):
+            content = "data:image/jpeg;base64," + base64.b64encode(noisy_jpeg(width, height, i)).decode("ascii")
+            Post.objects.create(author=alice, title=f"post {i}", contentType=Post.TypeChoice.IMAGE2, content=content)
+
+        client = APIClient()
+        client.force_authenticate(user=node.user)
+        page_url = reverse("project:posts_api", args=[alice.id]) + f"?size={posts}"
+        print(f"--- {posts} image posts of {width}x{height}")
+
+        results = []
+        Node.objects.filter(pk=node.pk).update(inlineImages=True)
+        with measure("base64 content"):
+            results.append(("base64 content", load_page(client, page_url)))
+        Node.objects.filter(pk=node.pk).update(inlineImages=False)
+        with measure("original images"):
+            results.append(("original images", load_page(client, page_url, lambda post: post["content"])))
+        with measure("320px variants (first request)"):
+            results.append(("320px variants", load_page(client, page_url, lambda post: post["variants"]["320"])))
+        with measure("320px variants (cached)"):
+            load_page(client, page_url, lambda post: post["variants"]["320"])
+
+        for label, total in results:
+            print(f"{label:<40} {total / 1024:>10.1f} KiB per page")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [10, 2400, 1600][len(args):]))
@@ -0,0 +1,88 @@
+"""
+Benchmark the requests per second a node can make to InboxAPIView.post.
+
+A remote node repeatedly POSTs the same like to a local author's inbox,
+authenticating with Basic auth. Compares DRF's BasicAuthentication, which
+runs the PBKDF2 password hasher on every request, against
+NodeBasicAuthentication, which runs it once and then serves the node's
+credentials from the cache. Requests run through the full Django stack in
+one thread, with the project's real password hasher.
+
+Usage:
+    python benchmarks/bench_inbox_auth.py [requests]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/auth/passwords/#how-django-stores-passwords
+"""
+
+import base64
+import sys
+import time
+from unittest import mock
+
+from common import measure, test_database
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from project.authentication import NodeBasicAuthentication
+from project.models import Author, Node, Post, PostLike
+from project.serializers import PostLikeSerializer
+from project.views import InboxAPIView
+
+HOST = "https://local.example.com/"
+
+
+def run(client, url, payload, requests):
+    """POST the payload `requests` times. Returns the requests per second."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        resp = client.post(url, payload, format="json")
+        assert resp.status_code == 201, resp.status_code
+    return requests / (time.perf_counter() - start)
+
+
+def main(requests):
+    # Process each like in the request, so that every POST does the same work
+    with test_database(), override_settings(ALLOWED_HOSTS=["testserver"], INBOX_ASYNC=False):
+        alice = Author.objects.create(user=User.objects.create_user(username="alice", password="alicepass"),
+                                      displayName="alice", host=HOST, url=f"{HOST}authors/alice")
+        post = Post.objects.create(author=alice, title="Hello", content="world")
+        Node.objects.create(user=User.objects.create_user(username="remote", password="nodepass"),
+                            host="https://remote.example.com/")
+        bob_id = "4b1ee2a7-2d0e-4e7c-9b5f-2ec0e1a5c7a1"
+        bob = Author.objects.create(user=User.objects.create(username="bob"), id=bob_id, displayName="bob",
+                                    host="https://remote.example.com/", url=f"https://remote.example.com/authors/{bob_id}")
+        # The like as the node would send it
+        like = PostLike.objects.create(author=bob, post=post, summary="bob likes your post", context=HOST)
+        payload = PostLikeSerializer(like).data
+        like.delete()
+        url = reverse("project:inbox_api", args=[alice.id])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Basic " + base64.b64encode(b"remote:nodepass").decode())
+        print(f"--- {requests} inbox POSTs from one node")
+
+        results = []
+        for label, authentication in [("BasicAuthentication", BasicAuthentication),
+                                      ("NodeBasicAuthentication", NodeBasicAuthentication)]:
+            cache.clear()
+            with mock.patch.object(InboxAPIView, "authentication_classes", [authentication, JWTAuthentication]):
+                with measure(label):
+                    results.append((label, run(client, url, payload, requests)))
+
+        for label, rate in results:
+            print(f"{label:<40} {rate:>10.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]] or [200])
@@ -0,0 +1,76 @@
+"""
+Benchmark the latency of repeated requests to a remote node.
+
+Compares a bare `requests.get()` per call, which opens a new connection every
+time, against a NodeClient that keeps connections to the node alive. The
+remote node is a local keep-alive HTTP server, so the numbers show the
+connection set-up cost only; against a real node over TLS the gap is larger.
+
+Usage:
+    python benchmarks/bench_node_client.py [calls]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.python.org/3/library/http.server.html
+"""
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import measure, test_database
+
+from django.contrib.auth.models import User
+
+import requests
+
+from project.federation import get_client
+from project.models import Node
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer every GET with a small JSON body, keeping the connection open."""
+    protocol_version = "HTTP/1.1"
+    # Send the headers and body in one packet so Nagle's algorithm does not delay the reply
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"type": "authors", "items": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(calls):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}/"
+    url = f"{host}api/authors/"
+    try:
+        with test_database():
+            node = Node.objects.create(user=User.objects.create(username="bench"), host=host, apiURL=f"{host}api/",
+                                       nodeName="bench", nodeCred="bench")
+            print(f"--- {calls} calls")
+            with measure("requests.get per call"):
+                for _ in range(calls):
+                    requests.get(url, auth=("bench", "bench")).json()
+            client = get_client(node)
+            with measure("NodeClient.get"):
+                for _ in range(calls):
+                    client.get(url).json()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
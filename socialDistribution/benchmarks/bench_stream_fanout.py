@@ -0,0 +1,74 @@
+"""
+Benchmark adding a new post to the streams of an author's local followers.
+
+Compares a per-follower INSERT loop, as made by the old
+`streamPosts.add()` signal body, against the bulk insert of inbox items made
+by the on_post_create signal.
+
+Usage:
+    python benchmarks/bench_stream_fanout.py [followers ...]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+import sys
+
+from common import measure, test_database
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+
+from project.models import Author, InboxItem, Post
+from project.signals import on_post_create
+from project.streams import add_to_inbox
+
+
+def make_followers(author, count):
+    """Create `count` local authors following `author`."""
+    users = User.objects.bulk_create([User(username=f"{author.displayName}-{i}") for i in range(count)])
+    followers = Author.objects.bulk_create(
+        [Author(user=user, displayName=user.username) for user in users]
+    )
+    Following = Author.following.through
+    Following.objects.bulk_create(
+        [Following(from_author_id=follower.id, to_author_id=author.id) for follower in followers]
+    )
+
+
+def per_follower_add(author):
+    """The previous signal body: one INSERT per follower."""
+    post_save.disconnect(on_post_create, sender=Post)
+    try:
+        post = Post.objects.create(author=author, title="per-follower")
+        for follower in author.followers.all():
+            add_to_inbox(follower, post)
+    finally:
+        post_save.connect(on_post_create, sender=Post)
+
+
+def bulk_on_commit(author):
+    """The current signal body, run on commit of the autocommit INSERT."""
+    Post.objects.create(author=author, title="bulk")
+
+
+def main(sizes):
+    with test_database():
+        for size in sizes:
+            print(f"--- {size} local followers")
+            author = Author.objects.create(user=User.objects.create(username=f"author{size}"),
+                                           displayName=f"author{size}")
+            make_followers(author, size)
+            with measure("per-follower INSERT"):
+                per_follower_add(author)
+            with measure("bulk_create on commit"):
+                bulk_on_commit(author)
+            assert InboxItem.objects.filter(post__author=author).count() == 2 * size
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
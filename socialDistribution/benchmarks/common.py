@@ -0,0 +1,60 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Each benchmark is a standalone script run from the socialDistribution
+directory, e.g. `python benchmarks/bench_stream_fanout.py`. The scripts run
+against a throwaway test database so they never touch real data.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/testing/advanced/#django.db.connection.creation.create_test_db
+"""
+
+import contextlib
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "socialDistribution.settings")
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+
+@contextlib.contextmanager
+def test_database():
+    """Create a test database for the duration of the benchmark."""
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+@contextlib.contextmanager
+def measure(label):
+    """Print the wall time and number of queries run inside the block."""
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:>10.1f} ms {queries:>8} queries")
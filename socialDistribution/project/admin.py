@@ -13,7 +13,7 @@ Sources:
 """
 
 from django.contrib import admin
-from .models import Author, FollowRequest, Post, Comment, PostLike, CommentLike, Node, Notification
+from .models import Author, FollowRequest, Post, Comment, PostLike, CommentLike, Node, Notification, InboxItem, OutboxItem
 
 
 # Register your models here.
@@ -24,4 +24,6 @@ admin.site.register(Comment)
 admin.site.register(PostLike)
 admin.site.register(CommentLike)
 admin.site.register(Node)
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(InboxItem)
+admin.site.register(OutboxItem)
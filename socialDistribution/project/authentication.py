@@ -0,0 +1,59 @@
+"""
+Module containing the Basic authentication used by remote nodes.
+
+Nodes send the same username and password with every request, and checking
+a password runs the PBKDF2 hasher, which costs far more CPU than the rest of
+a typical inbox POST. NodeBasicAuthentication checks a node's credentials
+with the hasher once, then remembers them in the cache for
+NODE_CREDENTIAL_CACHE_TTL seconds, keyed on an HMAC of the credentials so
+that no password is kept in the cache. Later requests with the same
+credentials skip the hasher entirely and only load the user.
+
+An entry stops matching as soon as the user's password is changed, because
+it records the password hash it was verified against. Other users are
+checked with the hasher every time, as before.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://www.django-rest-framework.org/api-guide/authentication/#custom-authentication
+https://docs.python.org/3/library/hmac.html
+"""
+
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authentication import BasicAuthentication
+
+from .models import Node
+
+
+def credential_key(userid, password):
+    """Get the cache key for a username and password."""
+    digest = hmac.new(settings.SECRET_KEY.encode(), f"{userid}:{password}".encode(), hashlib.sha256).hexdigest()
+    return f"node-credential:{digest}"
+
+
+class NodeBasicAuthentication(BasicAuthentication):
+    """Basic authentication that caches the verified credentials of nodes."""
+
+    def authenticate_credentials(self, userid, password, request=None):
+        key = credential_key(userid, password)
+        cached = cache.get(key)
+        if cached is not None:
+            user_id, password_hash = cached
+            user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+            if user is not None and user.password == password_hash:
+                return (user, None)
+            cache.delete(key)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        if Node.objects.filter(user=user).exists():
+            cache.set(key, (user.pk, user.password), settings.NODE_CREDENTIAL_CACHE_TTL)
+        return (user, auth)
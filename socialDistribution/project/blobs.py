@@ -0,0 +1,174 @@
+"""
+Module containing the content-addressed storage for post images.
+
+Images are stored once on local disk under BLOB_ROOT, named by the SHA-256
+of their bytes and sharded into two levels of directories. An image post
+keeps only a short reference in Post.content: the path of the blob endpoint,
+e.g. /api/blobs/<sha256>.png, so templates and the frontend can use the
+content as an <img> src directly. Because a blob's name is its hash, its
+bytes never change, and clients may cache it forever.
+
+Posts that arrive with base64 data URIs (from the create form, the local
+API, or other nodes) are moved into storage by the pre_save signal on Post.
+Serializers for remote nodes turn references into absolute URLs, or back
+into data URIs for nodes that cannot fetch images (Node.inlineImages).
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.python.org/3/library/hashlib.html
+https://docs.python.org/3/library/os.html#os.replace
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+
+BLOB_URL_PREFIX = "/api/blobs/"
+
+MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg"}
+EXTENSIONS = {mime: ext for ext, mime in MIME_TYPES.items()}
+
+# Resized variants of a blob add their width, e.g. <sha256>-320.png
+BLOB_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:-(?P<width>[0-9]+))?\.(?P<ext>png|jpg)$")
+DATA_URI = re.compile(r"^data:(?P<mime>image/(?:png|jpeg));base64,")
+
+
+def blob_path(digest):
+    """Get the file path of a blob, e.g. BLOB_ROOT/ab/cd/abcd..."""
+    return os.path.join(settings.BLOB_ROOT, digest[:2], digest[2:4], digest)
+
+
+def store_blob(data):
+    """Store bytes in the blob store if they are not there already.
+
+    Readers never see a partly written blob; see write_file.
+    Returns the SHA-256 hex digest naming the blob.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    if not os.path.exists(path):
+        write_file(path, data)
+    return digest
+
+
+def store_upload(uploaded):
+    """Store an uploaded file in the blob store.
+
+    Files streamed to disk by HashingUploadHandler are already hashed and
+    are moved into place rather than copied; nothing is read or written if
+    the blob exists. Small files held in memory are stored as bytes.
+    Returns the SHA-256 hex digest naming the blob.
+    """
+    if not hasattr(uploaded, "temporary_file_path"):
+        uploaded.seek(0)
+        return store_blob(uploaded.read())
+
+    digest = getattr(uploaded, "sha256", None)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        uploaded.seek(0)
+        for chunk in uploaded.chunks():
+            sha256.update(chunk)
+        digest = sha256.hexdigest()
+    path = blob_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            # Atomic when the upload temp dir is on the same filesystem as BLOB_ROOT
+            os.replace(uploaded.temporary_file_path(), path)
+        except OSError:
+            uploaded.seek(0)
+            write_file(path, uploaded.chunks())
+    return digest
+
+
+def write_file(path, data):
+    """Write a file under a temporary name and rename it into place.
+
+    Parameters:
+        path - the file to write
+        data - the bytes, or an iterable of chunks of bytes
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in [data] if isinstance(data, bytes) else data:
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def blob_reference(digest, mime, width=None):
+    """Get the reference stored in Post.content for a blob, or for one of its resized variants."""
+    suffix = f"-{width}" if width is not None else ""
+    return f"{BLOB_URL_PREFIX}{digest}{suffix}.{EXTENSIONS[mime]}"
+
+
+def parse_reference(content):
+    """Get the digest and MIME type of a blob reference, or None if `content` is not one."""
+    if not content or not content.startswith(BLOB_URL_PREFIX):
+        return None
+    match = BLOB_NAME.match(content[len(BLOB_URL_PREFIX):])
+    if match is None or match["width"] is not None:
+        return None
+    return match["digest"], MIME_TYPES[match["ext"]]
+
+
+def externalize(content):
+    """Move a base64 image data URI into the blob store.
+
+    Returns the blob reference, or None if `content` is not an image data URI
+    or its base64 is invalid.
+    """
+    match = DATA_URI.match(content or "")
+    if match is None:
+        return None
+    try:
+        data = base64.b64decode(content[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return blob_reference(store_blob(data), match["mime"])
+
+
+def inline(content):
+    """Turn a blob reference back into a base64 data URI.
+
+    Content that is not a reference, or whose blob is missing, is returned as is.
+    """
+    parsed = parse_reference(content)
+    if parsed is None:
+        return content
+    digest, mime = parsed
+    try:
+        with open(blob_path(digest), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return content
+    return f"data:{mime};base64," + base64.b64encode(data).decode("ascii")
+
+
+def external_content(content, base_url, inline_images=False):
+    """Get post content as sent to other nodes.
+
+    Parameters:
+        content - the stored post content
+        base_url - the scheme and host blob URLs are served from
+        inline_images - send images as base64 data URIs instead of URLs
+    """
+    if parse_reference(content) is None:
+        return content
+    if inline_images:
+        return inline(content)
+    return base_url.rstrip("/") + content
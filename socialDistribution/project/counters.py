@@ -0,0 +1,54 @@
+"""
+Module containing the denormalized like and comment counters.
+
+Post.like_count, Post.comment_count and Comment.like_count are kept up to date
+with F() updates by the signals in signals.py, so lists of posts and comments
+can read their counts straight from the row. Author.follower_count is
+recounted whenever follows change, and decides which authors are fanned out
+(see streams.py). Rows written without signals
+(bulk operations, raw SQL, or crashes between writes) can leave a counter
+wrong; repair_counters recomputes them in bulk.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/expressions/#subquery-expressions
+"""
+
+from django.apps import apps as global_apps
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# (model, counter field, counted model, foreign key from the counted model)
+COUNTERS = [
+    ("Post", "like_count", "PostLike", "post"),
+    ("Post", "comment_count", "Comment", "post"),
+    ("Comment", "like_count", "CommentLike", "comment"),
+    ("Author", "follower_count", "Follow", "to_author"),
+]
+
+
+def actual_count(counted, fk):
+    """An expression for the true number of `counted` rows pointing at the outer row."""
+    return Coalesce(Subquery(
+        counted.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(n=Count("pk")).values("n")
+    ), 0)
+
+
+def repair_counters(apps=global_apps):
+    """Recompute every counter that has drifted from the rows it counts.
+
+    Parameters:
+        apps - the app registry to load models from
+    Returns a dict mapping each counter, e.g. "Post.like_count", to the number of rows fixed.
+    """
+    results = {}
+    for model_name, field, counted_name, fk in COUNTERS:
+        model = apps.get_model("project", model_name)
+        counted = apps.get_model("project", counted_name)
+        actual = actual_count(counted, fk)
+        results[f"{model_name}.{field}"] = model.objects.exclude(**{field: actual}).update(**{field: actual})
+    return results
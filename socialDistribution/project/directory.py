@@ -0,0 +1,190 @@
+"""
+Module containing the local mirror of remote author directories.
+
+The sync_remote_authors command pages through the author list of every node
+and upserts the authors into local Author rows, so that author search never
+has to make requests to other nodes. Only new or changed authors are written.
+Each node records when its directory was last mirrored in authorsSyncedAt.
+
+Remote authors met anywhere else (in inbox items, comments, and likes) are
+added with ingest_remote_authors, which creates them in bulk.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#bulk-create
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#bulk-update
+"""
+
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .federation import fetch_json, get_client
+from .models import Author, Node
+
+DEFAULT_PROFILE_IMAGE = "https://clipart-library.com/img/1331574.jpg"
+
+SYNCED_FIELDS = ["url", "host", "displayName", "github", "profileImage"]
+
+
+def remote_author_id(remote_author):
+    """Get the UUID of a remote author from the last segment of its id URL.
+
+    Raises ValueError if the segment is not a UUID.
+    """
+    return str(uuid.UUID(remote_author["id"].rstrip("/").split("/")[-1]))
+
+
+def fetch_directories(nodes, page_size):
+    """Fetch the full author lists of several nodes.
+
+    One page is requested from every node at a time, concurrently. A node is
+    done when it returns a short page or repeats a page (nodes that ignore
+    the page parameter return their whole list every time).
+
+    Returns a dict mapping each node to its list of authors, leaving out
+    nodes that failed partway.
+    """
+    deadline = settings.NODE_CLIENT_CONNECT_TIMEOUT + settings.NODE_CLIENT_READ_TIMEOUT
+    directories = {node: [] for node in nodes}
+    seen = {node: set() for node in nodes}
+    active = list(nodes)
+    page = 1
+    while active:
+        urls = [(get_client(node), f"{node.apiURL}authors/?page={page}&size={page_size}") for node in active]
+        still_active = []
+        for node, data in zip(active, fetch_json(urls, deadline)):
+            if data is None or not isinstance(data, dict):
+                del directories[node]
+                continue
+            authors = data.get("items", data.get("data")) or []
+            new_authors = [author for author in authors if author.get("id") not in seen[node]]
+            seen[node].update(author.get("id") for author in new_authors)
+            directories[node].extend(new_authors)
+            if len(new_authors) == page_size:
+                still_active.append(node)
+        active = still_active
+        page += 1
+    return directories
+
+
+def author_row(remote_author, host=None):
+    """Get the Author fields for a serialized remote author.
+
+    Raises KeyError, TypeError, ValueError, or AttributeError for malformed authors.
+    """
+    row = {
+        "url": remote_author.get("url") or remote_author["id"],
+        "host": host or remote_author["host"],
+        "displayName": remote_author["displayName"][:50],
+        "github": remote_author.get("github") or None,
+        "profileImage": remote_author.get("profileImage") or DEFAULT_PROFILE_IMAGE,
+    }
+    # URLs cannot be cut short like names, and would fail the whole INSERT on databases that check lengths
+    for field in ("url", "host", "github", "profileImage"):
+        if row[field] is not None and len(row[field]) > Author._meta.get_field(field).max_length:
+            raise ValueError(f"{field} of author {remote_author['id']} is too long")
+    return row
+
+
+def author_rows(remote_authors, host=None):
+    """Map the ids of serialized remote authors to their Author fields, skipping bad data."""
+    rows = {}
+    for remote_author in remote_authors:
+        try:
+            rows[remote_author_id(remote_author)] = author_row(remote_author, host)
+        except (KeyError, TypeError, AttributeError, ValueError):
+            continue
+    return rows
+
+
+def create_authors(rows):
+    """Bulk-create local copies of remote authors.
+
+    Parameters:
+        rows - a dict mapping author ids to Author fields
+    Authors that already exist are skipped.
+    """
+    if not rows:
+        return
+    ids = list(rows.keys())
+    # bulk_create skips the pre_save signal that links authors to their node
+    node_ids = dict(Node.objects.filter(host__in={row["host"] for row in rows.values()}).values_list("host", "pk"))
+    with transaction.atomic():
+        # Remote authors get inactive users with unusable passwords; nobody logs in as them,
+        # and hashing a password for each would cost far more than the INSERT
+        User.objects.bulk_create(
+            [User(username=author_id, password=make_password(None), is_active=False) for author_id in ids],
+            ignore_conflicts=True,
+        )
+        users = User.objects.filter(username__in=ids).values_list("username", "id")
+        Author.objects.bulk_create(
+            [Author(id=username, user_id=user_id, node_id=node_ids.get(rows[username]["host"]), **rows[username])
+             for username, user_id in users],
+            ignore_conflicts=True,
+        )
+
+
+def ingest_remote_authors(remote_authors):
+    """Get the local copies of remote authors, creating any that are missing.
+
+    Parameters:
+        remote_authors - serialized authors from other nodes
+    Returns a dict mapping the id of every well-formed author to its Author.
+    """
+    rows = author_rows(remote_authors)
+    authors = {str(pk): author for pk, author in Author.objects.in_bulk(list(rows.keys())).items()}
+    missing = {author_id: row for author_id, row in rows.items() if author_id not in authors}
+    if missing:
+        create_authors(missing)
+        authors.update((str(pk), author) for pk, author in Author.objects.in_bulk(list(missing.keys())).items())
+    return authors
+
+
+def upsert_remote_authors(node, remote_authors):
+    """Create or update the local copies of a node's authors in bulk.
+
+    Existing authors hosted elsewhere are left untouched. Returns the number
+    of authors created and the number updated.
+    """
+    rows = author_rows(remote_authors, node.host)
+    existing = Author.objects.in_bulk(list(rows.keys()))
+    existing_ids = {str(pk) for pk in existing}
+    new_rows = {author_id: row for author_id, row in rows.items() if author_id not in existing_ids}
+    changed = []
+    for author in existing.values():
+        if author.host != node.host:
+            continue
+        row = rows[str(author.id)]
+        if any(getattr(author, field) != row[field] for field in SYNCED_FIELDS):
+            for field in SYNCED_FIELDS:
+                setattr(author, field, row[field])
+            changed.append(author)
+
+    with transaction.atomic():
+        create_authors(new_rows)
+        Author.objects.bulk_update(changed, SYNCED_FIELDS)
+    return len(new_rows), len(changed)
+
+
+def sync_remote_authors(nodes=None, page_size=None):
+    """Mirror the author directories of the given nodes, or of every node.
+
+    Returns a dict mapping each node that synced to its (created, updated) counts.
+    """
+    nodes = list(nodes if nodes is not None else Node.objects.all())
+    directories = fetch_directories(nodes, page_size or settings.AUTHOR_SYNC_PAGE_SIZE)
+    results = {}
+    for node, remote_authors in directories.items():
+        results[node] = upsert_remote_authors(node, remote_authors)
+        node.authorsSyncedAt = timezone.now()
+        Node.objects.filter(pk=node.pk).update(authorsSyncedAt=node.authorsSyncedAt)
+    return results
@@ -0,0 +1,227 @@
+"""
+Module containing the local copies of comments and likes from other nodes.
+
+Remote comments are identified by the UUID at the end of their id URL, which
+becomes their primary key. Remote likes have no id we can rely on, so they
+are identified by who liked what: the (author, post) or (author, comment)
+pair, which the unique_post_like and unique_comment_like constraints index.
+Each function inserts a whole list in one statement, skipping the rows that
+already exist, so ingesting the same list again changes nothing.
+
+bulk_create skips the signals that keep the like and comment counters up to
+date, so the counters of the liked or commented object are recomputed after
+each insert.
+
+Post pages serve the comments and likes already stored and never wait on the
+post's node. When a public remote post is viewed and its engagement is older
+than ENGAGEMENT_REFRESH_TTL, refresh_in_background fetches it again in a
+worker thread (stale-while-revalidate). The first request to see the post
+stale claims the refresh by moving Post.engagementSyncedAt to now with a
+conditional UPDATE. The database lets only one such UPDATE match, so a busy
+post is fetched at most once per TTL window across all worker processes,
+however many pages are served meanwhile. The URLs are built from the
+apiURL of the author's node, like every other request to a node.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#bulk-create
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#update
+https://www.rfc-editor.org/rfc/rfc5861#section-3
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .counters import actual_count
+from .directory import ingest_remote_authors, remote_author_id
+from .federation import fetch_json, get_client
+from .models import Comment, CommentLike, Post, PostLike
+from .nodes import node_for
+
+DEFAULT_LIKE_CONTEXT = "http://127.0.0.1:8000/"
+
+# Errors raised while reading badly formatted remote objects, which are skipped
+BAD_DATA_ERRORS = (KeyError, TypeError, AttributeError, ValueError)
+
+
+def remote_object_id(remote_object):
+    """Get the UUID at the end of a remote object's id URL."""
+    return uuid.UUID(remote_object["id"].rstrip("/").split("/")[-1])
+
+
+def like_fields(remote_like, author):
+    """Get the fields of a remote like, filling in the ones other nodes often leave out."""
+    return {
+        "summary": remote_like.get("summary") or f"{author.displayName} likes this",
+        "context": remote_like.get("context") or DEFAULT_LIKE_CONTEXT,
+    }
+
+
+def ingest_remote_comments(post, remote_comments):
+    """Add the comments another node has on one of its posts.
+
+    Parameters:
+        post - the local copy of the post
+        remote_comments - serialized comments from the post's node
+    Returns a dict mapping the id of every well-formed comment to its Comment.
+    """
+    remote_comments = [comment for comment in remote_comments if isinstance(comment, dict)]
+    authors = ingest_remote_authors(comment.get("author") for comment in remote_comments)
+    comments = {}
+    for remote_comment in remote_comments:
+        try:
+            comment_id = remote_object_id(remote_comment)
+            comments[str(comment_id)] = Comment(
+                id=comment_id, post=post, author=authors[remote_author_id(remote_comment["author"])],
+                comment=remote_comment["comment"], contentType=remote_comment["contentType"],
+                published=remote_comment["published"],
+            )
+        except BAD_DATA_ERRORS:
+            continue
+    if not comments:
+        return {}
+
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments.values(), ignore_conflicts=True)
+        Post.objects.filter(pk=post.pk).update(comment_count=actual_count(Comment, "post"))
+    return {str(pk): comment for pk, comment in Comment.objects.in_bulk(list(comments.keys())).items()}
+
+
+def ingest_remote_post_likes(post, remote_likes):
+    """Add the likes another node has on one of its posts.
+
+    Parameters:
+        post - the local copy of the post
+        remote_likes - serialized likes from the post's node
+    Returns a dict mapping the id of the author of every well-formed like to its PostLike.
+    """
+    return ingest_likes(PostLike, "post", post, remote_likes)
+
+
+def ingest_remote_comment_likes(comment, remote_likes):
+    """Add the likes another node has on one of its comments.
+
+    Parameters:
+        comment - the local copy of the comment
+        remote_likes - serialized likes from the comment's node
+    Returns a dict mapping the id of the author of every well-formed like to its CommentLike.
+    """
+    return ingest_likes(CommentLike, "comment", comment, remote_likes)
+
+
+def ingest_likes(model, field, liked, remote_likes):
+    """Bulk-insert the likes on `liked`, where `field` is the like's foreign key to it."""
+    remote_likes = [like for like in remote_likes if isinstance(like, dict)]
+    authors = ingest_remote_authors(like.get("author") for like in remote_likes)
+    likes = {}
+    for remote_like in remote_likes:
+        try:
+            author = authors[remote_author_id(remote_like["author"])]
+        except BAD_DATA_ERRORS:
+            continue
+        likes[str(author.id)] = model(author=author, **{field: liked}, **like_fields(remote_like, author))
+    if not likes:
+        return {}
+
+    with transaction.atomic():
+        model.objects.bulk_create(likes.values(), ignore_conflicts=True)
+        type(liked).objects.filter(pk=liked.pk).update(like_count=actual_count(model, field))
+    existing = model.objects.filter(**{field: liked, "author_id__in": list(likes.keys())})
+    return {str(like.author_id): like for like in existing}
+
+
+# The comment and like endpoints under a node's apiURL, as (kind, path)
+ENGAGEMENT_PATHS = [
+    ("comments", "authors/{author_id}/posts/{post_id}/comments"),
+    ("likes", "authors/{author_id}/posts/{post_id}/likes"),
+]
+
+# Keys that nodes put their lists under, in the order they are tried
+LIST_KEYS = ("items", "comments", "data")
+
+INGEST = {
+    "comments": ingest_remote_comments,
+    "likes": ingest_remote_post_likes,
+}
+
+_pool = ThreadPoolExecutor(max_workers=settings.ENGAGEMENT_REFRESH_WORKERS, thread_name_prefix="engagement-refresh")
+
+
+def listed_items(data):
+    """Get the list in a node's response, or None if it has none."""
+    if not isinstance(data, dict):
+        return None
+    for key in LIST_KEYS:
+        if isinstance(data.get(key), list):
+            return data[key]
+    return None
+
+
+def is_stale(post):
+    """Check whether a post's remote comments and likes are due to be fetched again."""
+    synced = post.engagementSyncedAt
+    return synced is None or timezone.now() - synced >= timedelta(seconds=settings.ENGAGEMENT_REFRESH_TTL)
+
+
+def refresh_in_background(post):
+    """Fetch a remote post's comments and likes in a worker thread if they are stale.
+
+    Returns True if a refresh was started.
+    """
+    if post.visibility != Post.VisibilityChoice.PUBLIC or not is_stale(post):
+        return False
+    node = node_for(post.author)
+    if node is None or not node.apiURL:
+        return False
+    # Only the first request in any process to see the post stale in each TTL window refreshes it
+    now = timezone.now()
+    synced_before = now - timedelta(seconds=settings.ENGAGEMENT_REFRESH_TTL)
+    stale = Q(engagementSyncedAt__isnull=True) | Q(engagementSyncedAt__lte=synced_before)
+    if not Post.objects.filter(stale, pk=post.pk).update(engagementSyncedAt=now):
+        return False
+    _pool.submit(refresh_in_thread, post.pk)
+    return True
+
+
+def refresh_in_thread(post_id):
+    try:
+        refresh(Post.objects.select_related("author").get(pk=post_id))
+    except Exception as e:
+        print(f"Refreshing the engagement of post {post_id} failed: {e}")
+    finally:
+        # Worker threads would otherwise keep their database connections open
+        connection.close()
+
+
+def refresh(post):
+    """Fetch a remote post's comments and likes from its node and store them.
+
+    Returns True if the node answered at least one of the requests.
+    """
+    node = node_for(post.author)
+    if node is None or not node.apiURL:
+        return False
+    client = get_client(node)
+    deadline = settings.NODE_CLIENT_CONNECT_TIMEOUT + settings.NODE_CLIENT_READ_TIMEOUT
+    urls = [(client, node.apiURL + path.format(author_id=post.author_id, post_id=post.pk))
+            for kind, path in ENGAGEMENT_PATHS]
+
+    refreshed = False
+    for (kind, path), data in zip(ENGAGEMENT_PATHS, fetch_json(urls, deadline)):
+        items = listed_items(data)
+        if items is not None:
+            INGEST[kind](post, items)
+            refreshed = True
+    if refreshed:
+        Post.objects.filter(pk=post.pk).update(engagementSyncedAt=timezone.now())
+    return refreshed
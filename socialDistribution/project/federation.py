@@ -0,0 +1,132 @@
+"""
+Module containing the HTTP client used to talk to remote nodes.
+
+Each Node gets one NodeClient holding a pooled requests.Session, so calls to
+the same node reuse open connections instead of paying a TCP and TLS
+handshake every time. Every request has connect and read timeouts and is
+authenticated with the node's nodeName and nodeCred.
+
+Requests to several nodes can be made concurrently with fetch_json, which
+returns whatever has arrived by a deadline.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://requests.readthedocs.io/en/latest/user/advanced/#session-objects
+https://requests.readthedocs.io/en/latest/user/advanced/#timeouts
+https://docs.python.org/3/library/concurrent.futures.html#concurrent.futures.wait
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .nodes import node_for, node_for_host
+
+
+class NodeClient:
+    """A keep-alive HTTP client for a single remote node.
+
+    Attributes:
+        node - the node this client talks to
+        session - the pooled session used for every request
+        timeout - the (connect, read) timeout in seconds
+    """
+
+    def __init__(self, node):
+        self.node = node
+        self.session = requests.Session()
+        self.session.auth = (node.nodeName, node.nodeCred)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.NODE_CLIENT_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = (settings.NODE_CLIENT_CONNECT_TIMEOUT, settings.NODE_CLIENT_READ_TIMEOUT)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(node):
+    """Get the shared client for a node, creating it on first use.
+
+    A new client is made if the node's credentials have changed.
+    """
+    with _lock:
+        client = _clients.get(node.pk)
+        if client is None or client.session.auth != (node.nodeName, node.nodeCred):
+            if client is not None:
+                client.close()
+            client = _clients[node.pk] = NodeClient(node)
+        return client
+
+
+def client_for_host(host):
+    """Get the client for the node hosting `host`, or None if it is not a known node."""
+    node = node_for_host(host)
+    if node is None:
+        return None
+    return get_client(node)
+
+
+def client_for(author):
+    """Get the client for the node hosting an author, or None for local authors."""
+    node = node_for(author)
+    if node is None:
+        return None
+    return get_client(node)
+
+
+# Shared by all requests so a slow node cannot hold up a request's worker beyond its deadline
+_pool = ThreadPoolExecutor(max_workers=settings.NODE_FETCH_WORKERS, thread_name_prefix="node-fetch")
+
+
+def _get_json(client, url):
+    resp = client.get(url)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def fetch_json(urls, deadline):
+    """GET several URLs from remote nodes concurrently.
+
+    Parameters:
+        urls - a list of (client, url) pairs
+        deadline - the most seconds to wait for all of the responses
+    Returns a list with the decoded JSON body of each response, or None for
+    responses that failed or did not arrive before the deadline.
+    """
+    futures = [_pool.submit(_get_json, client, url) for client, url in urls]
+    wait(futures, timeout=deadline)
+    results = []
+    for future, (client, url) in zip(futures, urls):
+        if not future.done():
+            future.cancel()
+            print(f"{client.node.host} did not respond in time")
+            results.append(None)
+        elif future.exception() is not None:
+            print(f"{client.node.host} failed: {future.exception()}")
+            results.append(None)
+        else:
+            results.append(future.result())
+    return results
@@ -15,6 +15,7 @@ https://www.javatpoint.com/django-usercreationform
 """
 
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.contrib.auth.forms import UserCreationForm
@@ -106,8 +107,19 @@ class CreatePostForm(forms.ModelForm):
         content = cleaned.get('content')
         picture = cleaned.get('picture')
 
-        if not content and not picture:
+        if cleaned.get("contentType") in (Post.TypeChoice.IMAGE, Post.TypeChoice.IMAGE2):
+            # Pillow has read the image's header; trust it over the chosen content type
+            image_types = {"image/png": Post.TypeChoice.IMAGE, "image/jpeg": Post.TypeChoice.IMAGE2}
+            if not picture:
+                # Images over the size limit are dropped by the upload handler
+                self.add_error("picture", f"Upload an image of at most {settings.UPLOAD_MAX_BYTES // 2 ** 20} MB.")
+            elif picture.content_type not in image_types:
+                self.add_error("picture", "Upload a PNG or JPEG image.")
+            else:
+                cleaned["contentType"] = image_types[picture.content_type]
+        elif not content and not picture:
             raise ValidationError("You must add a photo for type PNG/JPEG, or fill out content field otherwise.")
+        return cleaned
 
 
 # TODO delete?
@@ -0,0 +1,76 @@
+"""
+Module containing the identity of the caller of an API request.
+
+API views check who is calling on almost every request: which scheme the
+Authorization header uses, whether the user is a remote node, and which
+local author the user is. An Identity answers all of these once per
+request; use identity_for to get it. The node and the author are each
+loaded on first use and then kept for the rest of the request. The node is
+read from the database rather than the node registry, so that a node that
+was just removed cannot keep authenticating as one.
+
+DRF authenticates lazily inside the view, so the identity is resolved the
+first time a view asks for it rather than by middleware.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://www.django-rest-framework.org/api-guide/requests/#authentication
+"""
+
+from functools import cached_property
+
+from .models import Author, Node
+
+
+class Identity:
+    """The caller of a request.
+
+    Attributes:
+        user - the authenticated user, or AnonymousUser
+        scheme - the scheme of the Authorization header, e.g. "Basic" or
+            "Bearer", or "" without one
+        node - the node the user belongs to, or None; loaded on first use
+        author - the user's local author, or None; loaded on first use
+    """
+
+    def __init__(self, user, scheme):
+        self.user = user
+        self.scheme = scheme
+
+    @cached_property
+    def node(self):
+        if not self.user.is_authenticated:
+            return None
+        return Node.objects.filter(user=self.user).first()
+
+    @property
+    def is_node(self):
+        return self.node is not None
+
+    @property
+    def basic_without_node(self):
+        """Whether the caller used Basic auth without being a node, which node API endpoints refuse."""
+        return self.scheme == "Basic" and not self.is_node
+
+    @cached_property
+    def author(self):
+        if not self.user.is_authenticated:
+            return None
+        try:
+            # Goes through the user so that request.user.author is cached too
+            return self.user.author
+        except Author.DoesNotExist:
+            return None
+
+
+def identity_for(request):
+    """Get the identity of the caller of a request, created once and cached on the request."""
+    identity = getattr(request, "identity", None)
+    if identity is None:
+        scheme, _, _ = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        identity = request.identity = Identity(request.user, scheme)
+    return identity
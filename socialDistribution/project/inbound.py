@@ -0,0 +1,221 @@
+"""
+Module containing the processing of objects sent to inboxes.
+
+Each type of object (post, Follow, Like, comment) has a handler, and
+receive() dispatches an object to its handler. Local clients are answered
+only once their object has been handled.
+
+Remote nodes can send bursts of objects, so with INBOX_ASYNC their objects
+are only recorded as InboundItem rows and answered with 202 Accepted. The
+process_inbound management command then claims the items in batches,
+creates the remote authors of a whole batch at once, and runs the handlers,
+retrying items that fail unexpectedly. If the batch's authors cannot be
+created together, each handler creates its own author instead. Each item is keyed on a digest of
+its recipient and payload, so a delivery that a node replays is recorded
+and processed only once.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#select-for-update
+https://www.rfc-editor.org/rfc/rfc9110#name-202-accepted
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, IntegrityError, transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .directory import ingest_remote_authors
+from .models import InboundItem, Notification, Post
+from .serializers import CommentLikeSerializer, CommentSerializer, FollowRequestSerializer, PostLikeSerializer
+from .streams import add_to_inbox
+from .utils import addOrGetRemoteAuthor
+
+# Errors raised by handlers for malformed objects, which retrying cannot fix
+BAD_DATA_ERRORS = (KeyError, IndexError, TypeError, ValueError, AttributeError, ValidationError, Http404)
+
+
+def save_to_inbox(author, serializer):
+    """Save a deserialized object and add it to an author's inbox."""
+    if serializer.is_valid():
+        add_to_inbox(author, serializer.save())
+        return Response(serializer.data, status=201)
+    return Response(status=400, data=serializer.errors)
+
+
+def handle_post(author, data):
+    post_author = addOrGetRemoteAuthor(data['author'])
+    # update the inbox
+    post = get_object_or_404(Post, id=data["id"].split('/')[6])
+    if post.visibility != post.VisibilityChoice.PRIVATE and not author.following.filter(id=post_author.id).count():
+        # We have unfollowed the remote author, don't accept
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    add_to_inbox(author, post)
+    return Response(status=200)
+
+
+def handle_follow(author, data):
+    addOrGetRemoteAuthor(data['actor'])
+    return save_to_inbox(author, FollowRequestSerializer(data=data))
+
+
+def handle_like(author, data):
+    addOrGetRemoteAuthor(data['author'])
+    if "comment" in data["object"]:
+        message = f"{data['author']['displayName']} liked your comment"
+        link = "/".join(data['object'].split('/')[:7])
+        data['comment'] = data["object"].split('/')[8]
+        serializer = CommentLikeSerializer(data=data)
+    else:
+        message = f"{data['author']['displayName']} liked your post"
+        link = data['object']
+        data['post'] = data["object"].split('/')[6]
+        serializer = PostLikeSerializer(data=data)
+    Notification.objects.create(author=author, message=message, link=link)
+    return save_to_inbox(author, serializer)
+
+
+def handle_comment(author, data):
+    addOrGetRemoteAuthor(data['author'])
+    post_id = data["id"].split('/')[6]
+    data['post'] = post_id
+    serializer = CommentSerializer(data=data)
+    link = f"{author.url}/posts/{post_id}"
+    message = f"{data['author']['displayName']} commented on your post"
+    Notification.objects.create(author=author, message=message, link=link)
+    return save_to_inbox(author, serializer)
+
+
+HANDLERS = {
+    "post": handle_post,
+    "Follow": handle_follow,
+    "Like": handle_like,
+    "comment": handle_comment,
+}
+
+
+def accepts(payload):
+    """Check whether an object has a type that an inbox can receive."""
+    return isinstance(payload, dict) and payload.get("type") in HANDLERS
+
+
+def receive(author, payload):
+    """Process a single object sent to an author's inbox.
+
+    Parameters:
+        author - the author whose inbox received the object
+        payload - the deserialized JSON object
+    Returns the Response to send for the object.
+    """
+    if not accepts(payload):
+        return Response(status=400)  # Invalid type
+    return HANDLERS[payload["type"]](author, {**payload})
+
+
+def record(author, payload):
+    """Record an object sent to an author's inbox, to be processed later.
+
+    Returns the InboundItem, which is the existing one if the same object was
+    already sent to the same author.
+    """
+    body = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder)
+    digest = hashlib.sha256(f"{author.pk}:{body}".encode()).hexdigest()
+    try:
+        # Insert first so that concurrent replays race on the unique digest,
+        # not on a read that both of them can pass
+        with transaction.atomic():
+            return InboundItem.objects.create(digest=digest, recipient=author, payload=payload)
+    except IntegrityError:
+        return InboundItem.objects.get(digest=digest)
+
+
+def claim(batch_size):
+    """Lease a batch of due items to this worker, oldest first.
+
+    Claimed items have their next attempt pushed back by the lease time so
+    that other workers skip them; if this worker dies they become due again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        items = list(
+            InboundItem.objects.select_for_update(skip_locked=True)
+            .select_related("recipient")
+            .filter(status=InboundItem.StatusChoice.PENDING, next_attempt__lte=now)
+            .order_by("next_attempt", "received")[:batch_size]
+        )
+        InboundItem.objects.filter(pk__in=[item.pk for item in items]).update(
+            next_attempt=now + timedelta(seconds=settings.INBOUND_LEASE_SECONDS)
+        )
+    return items
+
+
+def process_item(item):
+    """Run the handler of one item, recording the outcome on the item (unsaved)."""
+    item.attempts += 1
+    try:
+        # Roll back only this item if it fails part way through
+        with transaction.atomic():
+            resp = receive(item.recipient, item.payload)
+    except BAD_DATA_ERRORS as e:
+        item.status = InboundItem.StatusChoice.FAILED
+        item.last_error = f"{type(e).__name__}: {e}"[:200]
+        return
+    except Exception as e:
+        # Anything else, such as a lost database connection, may succeed later
+        item.last_error = f"{type(e).__name__}: {e}"[:200]
+        if item.attempts >= settings.INBOUND_MAX_ATTEMPTS:
+            item.status = InboundItem.StatusChoice.FAILED
+        else:
+            item.next_attempt = timezone.now() + timedelta(seconds=30 * 2 ** item.attempts)
+        return
+    if resp.status_code >= 400:
+        item.status = InboundItem.StatusChoice.FAILED
+        item.last_error = f"HTTP {resp.status_code}"
+    else:
+        item.status = InboundItem.StatusChoice.PROCESSED
+        item.last_error = ""
+
+
+def actor(payload):
+    """Get the serialized author who sent an object, or None."""
+    if not isinstance(payload, dict):
+        return None
+    return payload.get("actor") if payload.get("type") == "Follow" else payload.get("author")
+
+
+def process(batch_size=100):
+    """Process one batch of due inbound items.
+
+    Returns the number of items attempted.
+    """
+    items = claim(batch_size)
+    if not items:
+        return 0
+
+    with transaction.atomic():
+        try:
+            # Create the remote authors of the whole batch at once rather than one at a time
+            with transaction.atomic():
+                ingest_remote_authors(author for author in map(actor, (item.payload for item in items))
+                                      if isinstance(author, dict))
+        except DatabaseError as e:
+            # Leave the authors to each item's handler, so that only the items whose author
+            # cannot be stored fail, and their failures count towards INBOUND_MAX_ATTEMPTS
+            print(f"Creating the authors of an inbound batch failed: {e}")
+        for item in items:
+            process_item(item)
+        InboundItem.objects.bulk_update(items, ["status", "attempts", "next_attempt", "last_error"])
+    return len(items)
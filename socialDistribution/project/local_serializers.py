@@ -6,6 +6,8 @@ from rest_framework.exceptions import ValidationError
 
 # Add your serializers here.
 from .models import Author, FollowRequest, Post, Node, Comment
+from .summaries import use_preview
+from .thumbnails import variant_urls
 
 
 class CommentAuthorSerializer(serializers.ModelSerializer):
@@ -33,16 +35,22 @@ class FollowerAuthorSerializer(serializers.ModelSerializer):
 class AuthorSerializer(serializers.ModelSerializer):
     followers = FollowerAuthorSerializer(many=True)
     user = FollowerUserSerializer()
+    profileImageVariants = serializers.SerializerMethodField()
 
     class Meta:
         model = Author
-        fields = ["id", "url", "host", "displayName", "github", "profileImage", "followers", "user"]
+        fields = ["id", "url", "host", "displayName", "github", "profileImage", "profileImageVariants", "followers",
+                  "user"]
+
+    def get_profileImageVariants(self, obj):
+        return variant_urls(obj.profileImage)
 
 
 class PostSerializer(serializers.ModelSerializer):
-    like_count = serializers.IntegerField(required=False)
-    comment_count = serializers.IntegerField(required=False)
+    like_count = serializers.IntegerField(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
     author = AuthorSerializer(required=False)
+    variants = serializers.SerializerMethodField()
 
     max_content_length = 600
 
@@ -64,6 +72,7 @@ class PostSerializer(serializers.ModelSerializer):
             "author",
             "like_count",
             "comment_count",
+            "variants",
         ]
         read_only_fields = [
             "author",
@@ -74,6 +83,16 @@ class PostSerializer(serializers.ModelSerializer):
             "comment_count",
         ]
 
+    def get_variants(self, obj):
+        return variant_urls(obj.content)
+
+    def to_representation(self, instance):
+        truncated = use_preview(instance)
+        representation = super().to_representation(instance)
+        if truncated is not None:
+            representation["content_truncated"] = truncated
+        return representation
+
     def validate(self, attrs):
         if attrs["contentType"].startswith("text/"):
             if len(attrs["content"]) > self.max_content_length:
@@ -105,7 +124,7 @@ class PostRetrieveSerializer(PostSerializer):
 
 class CommentSerializer(serializers.ModelSerializer):
     author = CommentAuthorSerializer()
-    like_count = serializers.IntegerField(required=False)
+    like_count = serializers.IntegerField(read_only=True)
     liked_by_me = serializers.BooleanField(required=False)
     class Meta:
         model = Comment
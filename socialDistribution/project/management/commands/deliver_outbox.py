@@ -0,0 +1,58 @@
+"""
+Management command that delivers queued objects to remote inboxes.
+
+Every FOLLOW_RECONCILE_INTERVAL seconds it also asks remote nodes which of
+our authors' pending follow requests were accepted (see utils.update_followers).
+
+Usage:
+    python manage.py deliver_outbox            # drain the queue and exit
+    python manage.py deliver_outbox --forever  # keep polling for new items
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/howto/custom-management-commands/
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from project import outbox
+from project.utils import update_followers
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox items to remote inboxes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.OUTBOX_WORKERS,
+                            help="number of deliveries to make in parallel")
+        parser.add_argument("--batch-size", type=int, default=100,
+                            help="number of items to claim at a time")
+        parser.add_argument("--forever", action="store_true",
+                            help="keep polling instead of exiting when the queue is empty")
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="seconds to sleep between polls of an empty queue")
+        parser.add_argument("--reconcile-interval", type=float, default=settings.FOLLOW_RECONCILE_INTERVAL,
+                            help="seconds between checks of pending remote follow requests")
+
+    def handle(self, *args, **options):
+        total = 0
+        reconciled_at = None
+        while True:
+            if reconciled_at is None or time.monotonic() - reconciled_at >= options["reconcile_interval"]:
+                update_followers()
+                reconciled_at = time.monotonic()
+            count = outbox.drain(workers=options["workers"], batch_size=options["batch_size"])
+            total += count
+            if count:
+                continue
+            if not options["forever"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(f"Attempted {total} deliveries")
@@ -0,0 +1,122 @@
+"""
+Management command that shows the query plans of the API endpoints.
+
+Each endpoint is requested as an existing author, inside a transaction that
+is rolled back, and every SELECT it runs is passed through the database's
+EXPLAIN. Lines of a plan that read a whole table are marked with "!". On
+small tables the planner may prefer a full scan even when an index exists,
+so run this against a database of realistic size.
+
+Usage:
+    python manage.py explain_queries [--author AUTHOR_ID] [--full-scans-only]
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://www.sqlite.org/eqp.html
+https://www.postgresql.org/docs/current/using-explain.html
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project.models import Author
+
+# Plan lines that read every row of a table: SQLite's "SCAN table" without an
+# index, and PostgreSQL's "Seq Scan"
+FULL_SCAN = re.compile(r"^\s*(SCAN \w+(?! USING)(\s|$)|.*Seq Scan on )")
+
+
+def endpoints(author, post, comment):
+    """Get the (url name, kwargs, query string) of each endpoint to explain."""
+    urls = [
+        ("project:get_authors", {}, ""),
+        ("project:author_api", {"pk": author.id}, ""),
+        ("project:posts_api", {"pk": author.id}, ""),
+        ("project:inbox_api", {"pk": author.id}, ""),
+        ("project:get_followers", {"pk": author.id}, ""),
+        ("project:api_user_liked", {"author_id": author.id}, ""),
+        ("project:notifications_api", {"author_id": author.id}, ""),
+        ("project:search_authors", {}, "?username=a"),
+        ("project:post-list", {}, ""),
+    ]
+    if post is not None:
+        urls += [
+            ("project:single_post_api", {"pk": author.id, "post_id": post.id}, ""),
+            ("project:comment_api", {"author_id": author.id, "post_id": post.id}, ""),
+            ("project:api_post_likes", {"author_id": author.id, "post_id": post.id}, ""),
+            ("project:post-detail", {"pk": post.id}, ""),
+        ]
+    if comment is not None:
+        urls.append(("project:api_comment_likes",
+                      {"author_id": author.id, "post_id": post.id, "comment_id": comment.id}, ""))
+    return urls
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the queries made by each API endpoint, marking full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--author", help="the author to make the requests as (default: the one with most posts)")
+        parser.add_argument("--full-scans-only", action="store_true", help="only show queries with full scans")
+
+    def handle(self, *args, **options):
+        authors = Author.objects.filter(user__is_active=True)
+        if options["author"]:
+            author = authors.filter(pk=options["author"]).first()
+        else:
+            author = authors.annotate(posts=Count("post")).order_by("-posts").first()
+        if author is None:
+            raise CommandError("No local author to make the requests as")
+        post = author.post_set.order_by("-published").first()
+        comment = post.comment_set.first() if post is not None else None
+
+        total = scans = 0
+        with override_settings(ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+            client = APIClient()
+            client.force_authenticate(user=author.user)
+            for name, kwargs, query in endpoints(author, post, comment):
+                url = reverse(name, kwargs=kwargs) + query
+                queries = []
+
+                def capture(execute, sql, params, many, context):
+                    if sql.lstrip().upper().startswith("SELECT"):
+                        queries.append((sql, params))
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(capture):
+                    status = client.get(url).status_code
+                self.stdout.write(self.style.MIGRATE_HEADING(f"GET {url} -> {status}, {len(queries)} queries"))
+
+                seen = set()
+                for sql, params in queries:
+                    if sql in seen:
+                        continue
+                    seen.add(sql)
+                    plan = self.explain(sql, params)
+                    full_scan = any(FULL_SCAN.match(line) for line in plan)
+                    total += 1
+                    scans += full_scan
+                    if options["full_scans_only"] and not full_scan:
+                        continue
+                    self.stdout.write(f"  {sql[:200]}")
+                    for line in plan:
+                        self.stdout.write(f"  {'!' if FULL_SCAN.match(line) else ' '}   {line}")
+            transaction.set_rollback(True)
+        self.stdout.write(f"{total} distinct queries, {scans} with full table scans")
+
+    def explain(self, sql, params):
+        """Get the lines of the query plan of a query."""
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            # SQLite returns (id, parent, notused, detail) rows, PostgreSQL one line per row
+            return [str(row[-1]) for row in cursor.fetchall()]
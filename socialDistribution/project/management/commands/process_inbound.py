@@ -0,0 +1,45 @@
+"""
+Management command that processes objects recorded from remote inboxes.
+
+Usage:
+    python manage.py process_inbound            # drain the queue and exit
+    python manage.py process_inbound --forever  # keep polling for new items
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/howto/custom-management-commands/
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from project import inbound
+
+
+class Command(BaseCommand):
+    help = "Process objects that remote nodes sent to local inboxes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100,
+                            help="number of items to claim at a time")
+        parser.add_argument("--forever", action="store_true",
+                            help="keep polling instead of exiting when the queue is empty")
+        parser.add_argument("--interval", type=float, default=1.0,
+                            help="seconds to sleep between polls of an empty queue")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            count = inbound.process(batch_size=options["batch_size"])
+            total += count
+            if count:
+                continue
+            if not options["forever"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(f"Processed {total} inbound items")
@@ -0,0 +1,26 @@
+"""
+Management command that fixes drifted like, comment and follower counters.
+
+Usage:
+    python manage.py repair_counters
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/howto/custom-management-commands/
+"""
+
+from django.core.management.base import BaseCommand
+
+from project.counters import repair_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the like, comment and follower counters."
+
+    def handle(self, *args, **options):
+        for counter, fixed in repair_counters().items():
+            self.stdout.write(f"{counter}: {fixed} rows fixed")
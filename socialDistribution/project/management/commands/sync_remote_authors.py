@@ -0,0 +1,54 @@
+"""
+Management command that mirrors the author directories of remote nodes.
+
+Usage:
+    python manage.py sync_remote_authors            # sync every node once
+    python manage.py sync_remote_authors --forever  # re-sync periodically
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/howto/custom-management-commands/
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from project.directory import sync_remote_authors
+from project.models import Node
+
+
+class Command(BaseCommand):
+    help = "Mirror the author directories of remote nodes into local authors."
+
+    def add_arguments(self, parser):
+        parser.add_argument("hosts", nargs="*",
+                            help="hosts of the nodes to sync (default: every node)")
+        parser.add_argument("--page-size", type=int, default=settings.AUTHOR_SYNC_PAGE_SIZE,
+                            help="number of authors to request per page")
+        parser.add_argument("--forever", action="store_true",
+                            help="keep re-syncing instead of exiting")
+        parser.add_argument("--interval", type=float, default=300.0,
+                            help="seconds to sleep between syncs")
+
+    def handle(self, *args, **options):
+        while True:
+            nodes = Node.objects.all()
+            if options["hosts"]:
+                nodes = nodes.filter(host__in=options["hosts"])
+            nodes = list(nodes)
+            results = sync_remote_authors(nodes, page_size=options["page_size"])
+            for node in nodes:
+                if node in results:
+                    created, updated = results[node]
+                    self.stdout.write(f"{node.host}: {created} created, {updated} updated")
+                else:
+                    self.stderr.write(f"{node.host}: failed, keeping the previous mirror")
+            if not options["forever"]:
+                break
+            time.sleep(options["interval"])
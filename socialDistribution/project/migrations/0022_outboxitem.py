@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:11
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0021_alter_post_author'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('DELIVERED', 'DELIVERED'), ('FAILED', 'FAILED')], default='PENDING', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.CharField(blank=True, max_length=200)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_items', to='project.author')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt'], name='project_out_status_b898ab_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0022_outboxitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'published'], name='project_pos_author__3d5629_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+def copy_stream_posts(apps, schema_editor):
+    """Copy the old streamPosts rows into the inbox as post items."""
+    Author = apps.get_model('project', 'Author')
+    InboxItem = apps.get_model('project', 'InboxItem')
+    StreamPost = Author.streamPosts.through
+    rows = StreamPost.objects.select_related('post').iterator()
+    InboxItem.objects.bulk_create(
+        (InboxItem(owner_id=row.author_id, kind='post', post_id=row.post_id, received_at=row.post.published)
+         for row in rows),
+        batch_size=1000,
+    )
+
+
+def restore_stream_posts(apps, schema_editor):
+    """Copy the post items in the inbox back into the streamPosts rows."""
+    Author = apps.get_model('project', 'Author')
+    InboxItem = apps.get_model('project', 'InboxItem')
+    StreamPost = Author.streamPosts.through
+    rows = InboxItem.objects.filter(kind='post').values_list('owner_id', 'post_id').iterator()
+    StreamPost.objects.bulk_create(
+        (StreamPost(author_id=owner_id, post_id=post_id) for owner_id, post_id in rows),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0023_post_author_published_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('post', 'post'), ('Like', 'Like'), ('comment', 'comment'), ('Follow', 'Follow')], max_length=20)),
+                ('received_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.comment')),
+                ('comment_like', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.commentlike')),
+                ('follow_request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.followrequest')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_items', to='project.author')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.post')),
+                ('post_like', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='project.postlike')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'received_at'], name='project_inb_owner_i_bcd8d0_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='inboxitem',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'post')), fields=('owner', 'post'), name='unique_inbox_post'),
+        ),
+        migrations.RunPython(copy_stream_posts, restore_stream_posts),
+        migrations.RemoveField(
+            model_name='author',
+            name='streamPosts',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0024_inboxitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='supportsBatch',
+            field=models.BooleanField(default=False),
+        ),
+    ]
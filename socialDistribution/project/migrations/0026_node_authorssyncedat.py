@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0025_node_supportsbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='authorsSyncedAt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
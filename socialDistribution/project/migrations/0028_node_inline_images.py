@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:31
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.db import migrations, models
+
+# A frozen copy of the blob layout from project/blobs.py when this migration
+# was written, so that later changes to blobs.py do not change what it does
+DATA_URI = re.compile(r"^data:(?P<mime>image/(?:png|jpeg));base64,")
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg"}
+
+
+def store_blob(data):
+    """Store bytes under BLOB_ROOT/ab/cd/<sha256>, renaming a temporary file into place."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = os.path.join(settings.BLOB_ROOT, digest[:2], digest[2:4], digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return digest
+
+
+def externalize(content):
+    """Store a base64 image data URI, returning its blob reference or None if it is invalid."""
+    match = DATA_URI.match(content)
+    if match is None:
+        return None
+    try:
+        data = base64.b64decode(content[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return f"/api/blobs/{store_blob(data)}.{EXTENSIONS[match['mime']]}"
+
+
+def externalize_images(apps, schema_editor):
+    """Move the base64 images of existing posts into the blob store."""
+    Post = apps.get_model('project', 'Post')
+    for post in Post.objects.filter(content__startswith='data:image/').only('id', 'content').iterator(chunk_size=100):
+        reference = externalize(post.content)
+        if reference is not None:
+            Post.objects.filter(pk=post.pk).update(content=reference)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0027_post_comment_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='inlineImages',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(externalize_images, migrations.RunPython.noop),
+    ]
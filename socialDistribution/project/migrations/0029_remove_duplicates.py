@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:40
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(apps, model_name, field, counted_name, fk):
+    """Set a counter to the number of rows pointing at each row.
+
+    A frozen copy of counters.repair_counters, so that later changes to the
+    app do not change what this migration does.
+    """
+    model = apps.get_model("project", model_name)
+    counted = apps.get_model("project", counted_name)
+    actual = Coalesce(Subquery(
+        counted.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(n=Count("pk")).values("n")
+    ), 0)
+    model.objects.exclude(**{field: actual}).update(**{field: actual})
+
+
+def remove_duplicates(apps, schema_editor):
+    """Delete repeated likes and follow requests, keeping one of each, before they are made unique."""
+    for model_name, fields in [("PostLike", ["author", "post"]), ("CommentLike", ["author", "comment"]),
+                               ("FollowRequest", ["follower", "following"])]:
+        model = apps.get_model("project", model_name)
+        duplicates = model.objects.values(*fields).annotate(n=Count("id")).filter(n__gt=1)
+        for duplicate in duplicates:
+            ids = list(model.objects.filter(**{field: duplicate[field] for field in fields})
+                       .order_by("id").values_list("id", flat=True))
+            model.objects.filter(id__in=ids[1:]).delete()
+    # Signals do not run in migrations, so the like counters are recounted
+    recount(apps, "Post", "like_count", "PostLike", "post")
+    recount(apps, "Comment", "like_count", "CommentLike", "comment")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0028_node_inline_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0029_remove_duplicates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='author',
+            name='displayName',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='author',
+            name='host',
+            field=models.CharField(db_index=True, default='127.0.0.1', max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='node',
+            name='host',
+            field=models.CharField(db_index=True, default='127.0.0.1:8000', max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'published'], name='project_com_post_id_65547a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['author', 'timestamp'], name='project_not_author__b4c833_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['visibility', 'unlisted', 'published'], name='project_pos_visibil_6de05f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commentlike',
+            constraint=models.UniqueConstraint(fields=('author', 'comment'), name='unique_comment_like'),
+        ),
+        migrations.AddConstraint(
+            model_name='followrequest',
+            constraint=models.UniqueConstraint(fields=('follower', 'following'), name='unique_follow_request'),
+        ),
+        migrations.AddConstraint(
+            model_name='postlike',
+            constraint=models.UniqueConstraint(fields=('author', 'post'), name='unique_post_like'),
+        ),
+    ]
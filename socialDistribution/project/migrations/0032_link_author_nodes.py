@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:55
+
+from django.db import migrations
+
+
+def link_author_nodes(apps, schema_editor):
+    """Point every author hosted on a known node to that node."""
+    Author = apps.get_model("project", "Author")
+    Node = apps.get_model("project", "Node")
+    for node in Node.objects.all():
+        Author.objects.filter(host=node.host).update(node=node)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0031_author_node'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_author_nodes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:51
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0032_link_author_nodes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboundItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('PROCESSED', 'PROCESSED'), ('FAILED', 'FAILED')], default='PENDING', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('received', models.DateTimeField(default=django.utils.timezone.now)),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.CharField(blank=True, max_length=200)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbound_items', to='project.author')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt'], name='project_inb_status_f3bae7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0033_inbounditem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='engagementSyncedAt',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0034_post_engagementsyncedat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='postsSyncedAt',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='postsSyncedUntil',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
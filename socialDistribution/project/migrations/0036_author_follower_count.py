@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount(apps, model_name, field, counted_name, fk):
+    """Set a counter to the number of rows pointing at each row.
+
+    A frozen copy of counters.repair_counters, so that later changes to the
+    app do not change what this migration does.
+    """
+    model = apps.get_model("project", model_name)
+    counted = apps.get_model("project", counted_name)
+    actual = Coalesce(Subquery(
+        counted.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(n=Count("pk")).values("n")
+    ), 0)
+    model.objects.exclude(**{field: actual}).update(**{field: actual})
+
+
+def fill_counters(apps, schema_editor):
+    recount(apps, "Author", "follower_count", "Author_following", "to_author")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0035_author_posts_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='follower_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0036_author_follower_count'),
+    ]
+
+    operations = [
+        # Author.following keeps its table; only the model describing it changes
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Follow',
+                    fields=[
+                        ('id', models.AutoField(primary_key=True, serialize=False)),
+                        ('from_author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.author')),
+                        ('to_author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='project.author')),
+                    ],
+                    options={
+                        'db_table': 'project_author_following',
+                        'unique_together': {('from_author', 'to_author')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='author',
+                    name='following',
+                    field=models.ManyToManyField(blank=True, related_name='followers', through='project.Follow', to='project.author'),
+                ),
+            ],
+        ),
+        # Existing follows have no known start, so they are left null rather than set to now
+        migrations.AddField(
+            model_name='follow',
+            name='followed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='followed_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:22
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0037_follow'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(django.db.models.functions.text.Upper('displayName'), models.F('id'), name='author_name_search'),
+        ),
+    ]
@@ -14,7 +14,9 @@ Sources:
 """
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.urls import reverse
 from django.utils import timezone
 
@@ -32,27 +34,42 @@ class Author(models.Model):
         id - the UUID primary key for the author
         url - a link to the author's profile
         host - the address of the node hosting the author
+        node - the node hosting the author, or None for local authors
         displayName - the author's username
         github - the author's GitHub profile
         profileImage - a link to a profile image to use
         bio - a short description of the author
-        streamPosts - the posts that appear in the authors inbox
-        following - the authors that this user is following
+        following - the authors that this user is following, through Follow rows
+        follower_count - the number of followers, kept up to date by signals; authors with
+            more than STREAM_FANOUT_FOLLOWER_LIMIT are not fanned out (see streams.py)
+        postsSyncedAt - when the posts of a remote author were last fetched from its node,
+            or when a sync was last claimed (see profiles.py)
+        postsSyncedUntil - the newest publish time among the remote author's posts fetched
+            so far; older posts are skipped by later syncs (see profiles.py)
     """
 
     type = models.CharField(max_length=20, default="author")
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
     url = models.URLField(max_length=200, blank=True, null=True)
-    host = models.CharField(max_length=200, default="127.0.0.1")  # TODO add conditional for localhost if not deployed
-    displayName = models.CharField(max_length=50)
+    host = models.CharField(max_length=200, default="127.0.0.1", db_index=True)  # TODO add conditional for localhost if not deployed
+    node = models.ForeignKey("Node", related_name="authors", on_delete=models.SET_NULL, blank=True, null=True)
+    displayName = models.CharField(max_length=50, db_index=True)
     github = models.URLField(max_length=200, blank=True, null=True)
     profileImage = models.URLField(max_length=200, default="https://i.imgur.com/k7XVwpB.jpeg")
 
     bio = models.CharField(max_length=1000, blank=True)
 
-    streamPosts = models.ManyToManyField("Post", related_name="inboxes", blank=True)  # TODO wwe need to refactor this to add likes and comments
-    following = models.ManyToManyField("Author", related_name='followers', symmetrical=False, blank=True)
+    following = models.ManyToManyField("Author", related_name='followers', symmetrical=False, blank=True,
+                                       through="Follow")
+    follower_count = models.IntegerField(default=0, editable=False)
+
+    postsSyncedAt = models.DateTimeField(null=True, blank=True, editable=False)
+    postsSyncedUntil = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Serves the case-insensitive prefix search of views.SearchAuthors, in its order
+        indexes = [models.Index(Upper("displayName"), "id", name="author_name_search")]
 
     def get_url(self):
         return self.url
@@ -60,6 +77,27 @@ class Author(models.Model):
     def __str__(self):
         return self.displayName
 
+
+class Follow(models.Model):
+    """
+    A class representing one author following another (the rows of Author.following).
+
+    Attributes:
+        from_author - the follower
+        to_author - the author being followed
+        followed_at - when the follow started, or None for follows made before this was
+            recorded; followers only see posts published since they followed (see streams.py)
+    """
+    id = models.AutoField(primary_key=True)
+    from_author = models.ForeignKey(Author, related_name="+", on_delete=models.CASCADE)
+    to_author = models.ForeignKey(Author, related_name="+", on_delete=models.CASCADE)
+    followed_at = models.DateTimeField(default=timezone.now, blank=True, null=True)
+
+    class Meta:
+        db_table = "project_author_following"
+        unique_together = [("from_author", "to_author")]
+
+
 class Notification(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
@@ -67,6 +105,9 @@ class Notification(models.Model):
     link = models.URLField(max_length=500)
     timestamp = models.DateTimeField(default=timezone.now, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["author", "timestamp"])]
+
 class FollowRequest(models.Model):
     """
     A class representing a follow request sent by one author to another.
@@ -82,6 +123,11 @@ class FollowRequest(models.Model):
     follower = models.ForeignKey(Author, related_name='outgoing_follow_requests', on_delete=models.CASCADE)
     following = models.ForeignKey(Author, related_name='incoming_follow_requests', on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["follower", "following"], name="unique_follow_request"),
+        ]
+
 
 class Post(models.Model):
     """
@@ -103,6 +149,10 @@ class Post(models.Model):
         published - the ISO 8601 timestamp when the post was published
         visibility - one of PUBLIC, PRIVATE, or FRIENDS ONLY; determines who can see the post
         unlisted - flag whether the post is discoverable by browsing
+        like_count - the number of likes on the post, kept up to date by signals
+        comment_count - the number of comments on the post, kept up to date by signals
+        engagementSyncedAt - when the comments and likes of a remote post were last
+            fetched from its node, or when a refresh was last claimed (see engagement.py)
     """
 
     class VisibilityChoice(models.TextChoices):
@@ -131,7 +181,16 @@ class Post(models.Model):
     published = models.DateTimeField(default=timezone.now, blank=True)
     visibility = models.CharField(max_length=50, choices=VisibilityChoice.choices, default=VisibilityChoice.PUBLIC)
     unlisted = models.BooleanField(default=False)
+    like_count = models.IntegerField(default=0, editable=False)
+    comment_count = models.IntegerField(default=0, editable=False)
+    engagementSyncedAt = models.DateTimeField(null=True, blank=True, editable=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["author", "published"]),
+            # public, listed posts newest first
+            models.Index(fields=["visibility", "unlisted", "published"]),
+        ]
 
     def get_absolute_url(self):
         return reverse("project:post", kwargs={"author_id": self.author,"pk": self.pk})
@@ -152,6 +211,7 @@ class Comment(models.Model):
         published - the ISO 8601 timestamp when the comment was posted
         id - the UUID primary key of the comment
         post - the post that the comment was added too
+        like_count - the number of likes on the comment, kept up to date by signals
     """
 
     author = models.ForeignKey(Author, on_delete=models.CASCADE)
@@ -160,6 +220,10 @@ class Comment(models.Model):
     published = models.DateTimeField(default=timezone.now, blank=True)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    like_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["post", "published"])]
 
     def get_url(self):
         return f"{self.post.get_url()}/comments/{self.id}"
@@ -181,6 +245,9 @@ class PostLike(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["author", "post"], name="unique_post_like")]
+
 
 class CommentLike(models.Model):
     """
@@ -199,6 +266,9 @@ class CommentLike(models.Model):
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["author", "comment"], name="unique_comment_like")]
+
 
 class Node(models.Model):
     """
@@ -209,10 +279,132 @@ class Node(models.Model):
         nodeName - the name of the node
         apiURL - the address to access the API service
         host - the IP of the node
+        supportsBatch - flag whether the node accepts batched inbox deliveries
+            at {apiURL}inbox/batch
+        authorsSyncedAt - when the node's author directory was last mirrored
+        inlineImages - flag whether the node needs image posts sent as base64
+            data URIs instead of URLs
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     nodeName = models.CharField(max_length=50, blank=True)
     nodeCred = models.CharField(max_length=50, blank=True)
     apiURL = models.URLField(max_length=200, blank=True)
-    host = models.CharField(max_length=200, default="127.0.0.1:8000")
+    host = models.CharField(max_length=200, default="127.0.0.1:8000", db_index=True)
+    supportsBatch = models.BooleanField(default=False)
+    authorsSyncedAt = models.DateTimeField(null=True, blank=True)
+    inlineImages = models.BooleanField(default=False)
+
+
+
+class InboxItem(models.Model):
+    """
+    A class representing an object received in an author's inbox.
+    Exactly one of the object fields is set, depending on the kind.
+
+    Attributes:
+        id - the UUID primary key of the item
+        owner - the author whose inbox the item is in
+        kind - one of post, Like, comment, or Follow
+        post - the post, for post items
+        comment - the comment, for comment items
+        post_like - the like, for likes on a post
+        comment_like - the like, for likes on a comment
+        follow_request - the follow request, for Follow items
+        received_at - the time the item arrived; posts use their publish time
+            so that streams are ordered by when posts were published
+    """
+
+    class KindChoice(models.TextChoices):
+        POST = "post", "post"
+        LIKE = "Like", "Like"
+        COMMENT = "comment", "comment"
+        FOLLOW = "Follow", "Follow"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(Author, related_name="inbox_items", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KindChoice.choices)
+    post = models.ForeignKey(Post, blank=True, null=True, on_delete=models.CASCADE)
+    comment = models.ForeignKey(Comment, blank=True, null=True, on_delete=models.CASCADE)
+    post_like = models.ForeignKey(PostLike, blank=True, null=True, on_delete=models.CASCADE)
+    comment_like = models.ForeignKey(CommentLike, blank=True, null=True, on_delete=models.CASCADE)
+    follow_request = models.ForeignKey(FollowRequest, blank=True, null=True, on_delete=models.CASCADE)
+    received_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["owner", "received_at"])]
+        constraints = [
+            models.UniqueConstraint(fields=["owner", "post"], condition=models.Q(kind="post"),
+                                    name="unique_inbox_post"),
+        ]
+
+
+class OutboxItem(models.Model):
+    """
+    A class representing an object queued for delivery to a remote inbox.
+    Deliveries are made by the deliver_outbox management command.
+
+    Attributes:
+        id - the UUID primary key of the delivery
+        recipient - the remote author whose inbox receives the object
+        payload - the serialized object to POST to the inbox
+        status - one of PENDING, DELIVERED, or FAILED
+        attempts - the number of delivery attempts made so far
+        created - the time the delivery was queued
+        next_attempt - the earliest time the delivery may be (re)tried
+        last_error - a short description of the last failed attempt
+    """
+
+    class StatusChoice(models.TextChoices):
+        PENDING = "PENDING", "PENDING"
+        DELIVERED = "DELIVERED", "DELIVERED"
+        FAILED = "FAILED", "FAILED"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    recipient = models.ForeignKey(Author, related_name="outbox_items", on_delete=models.CASCADE)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=StatusChoice.choices, default=StatusChoice.PENDING)
+    attempts = models.IntegerField(default=0)
+    created = models.DateTimeField(default=timezone.now)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt"])]
+
+
+class InboundItem(models.Model):
+    """
+    A class representing an object a remote node POSTed to an inbox, waiting
+    to be processed. Items are processed by the process_inbound management command.
+
+    Attributes:
+        id - the UUID primary key of the item
+        recipient - the author whose inbox received the object
+        payload - the object as it was received
+        digest - the SHA-256 of the recipient and payload, so that a replayed
+            delivery is only recorded once
+        status - one of PENDING, PROCESSED, or FAILED
+        attempts - the number of processing attempts made so far
+        received - the time the object arrived
+        next_attempt - the earliest time the item may be (re)processed
+        last_error - a short description of why the last attempt failed
+    """
+
+    class StatusChoice(models.TextChoices):
+        PENDING = "PENDING", "PENDING"
+        PROCESSED = "PROCESSED", "PROCESSED"
+        FAILED = "FAILED", "FAILED"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    recipient = models.ForeignKey(Author, related_name="inbound_items", on_delete=models.CASCADE)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    digest = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=StatusChoice.choices, default=StatusChoice.PENDING)
+    attempts = models.IntegerField(default=0)
+    received = models.DateTimeField(default=timezone.now)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt"])]
@@ -0,0 +1,69 @@
+"""
+Module containing the in-memory registry of known nodes.
+
+There are only a handful of nodes and they rarely change, so each process
+keeps all of them in memory, loaded with a single query on first use.
+Remote authors point to the node hosting them with Author.node, so finding
+where to deliver to an author (node_for) makes no queries at all.
+
+Saving or deleting a Node clears the registry of the process that did it
+(see signals.py); other processes reload theirs once it is older than
+NODE_REGISTRY_TTL seconds. QuerySet.update() skips the signals, so call
+invalidate() after updating nodes that way.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/signals/#post-save
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Node
+
+_nodes = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def all_nodes():
+    """Get a dict mapping the primary key of every known node to the node, loading them if needed."""
+    global _nodes, _loaded_at
+    with _lock:
+        if _nodes is None or time.monotonic() - _loaded_at > settings.NODE_REGISTRY_TTL:
+            _nodes = {node.pk: node for node in Node.objects.all()}
+            _loaded_at = time.monotonic()
+        return _nodes
+
+
+def invalidate():
+    """Drop this process's registry so that it is reloaded on next use."""
+    global _nodes
+    with _lock:
+        _nodes = None
+
+
+def get_node(pk):
+    """Get a node by primary key, or None if `pk` is None or not a known node."""
+    if pk is None:
+        return None
+    return all_nodes().get(pk)
+
+
+def node_for(author):
+    """Get the node hosting an author, or None for local authors."""
+    return get_node(author.node_id)
+
+
+def node_for_host(host):
+    """Get the node with the given host, or None if it is not a known node."""
+    for node in all_nodes().values():
+        if node.host == host:
+            return node
+    return None
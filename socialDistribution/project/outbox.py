@@ -0,0 +1,174 @@
+"""
+Module containing the outbox used to deliver objects to remote inboxes.
+
+Objects sent to remote authors are queued as OutboxItem rows instead of being
+POSTed while the sender waits. The deliver_outbox management command drains
+the queue, making the HTTP requests in parallel and retrying failures.
+Deliveries to nodes that support it are coalesced into batch requests.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#select-for-update
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+import requests
+
+from .blobs import parse_reference
+from .federation import get_client
+from .models import OutboxItem
+from .nodes import node_for
+
+
+def enqueue(obj, recipient, serializer):
+    """Queue a serialized object for delivery to a remote author's inbox.
+
+    Parameters:
+        obj - the model instance to deliver
+        recipient - the remote author receiving the object
+        serializer - the serializer class used to build the payload
+    Returns the serialized data.
+    """
+    # Nodes that cannot fetch images by URL get them inline
+    node = node_for(recipient)
+    inline_images = node is not None and node.inlineImages and \
+        parse_reference(getattr(obj, "content", None)) is not None
+    data = serializer(instance=obj, context={"inline_images": inline_images}).data
+    OutboxItem.objects.create(recipient=recipient, payload=data)
+    return data
+
+
+def claim(batch_size):
+    """Lease a batch of due deliveries to this worker.
+
+    Claimed items have their next attempt pushed back by the lease time so
+    that other workers skip them; if this worker dies they become due again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        items = list(
+            OutboxItem.objects.select_for_update(skip_locked=True)
+            .select_related("recipient")
+            .filter(status=OutboxItem.StatusChoice.PENDING, next_attempt__lte=now)
+            .order_by("next_attempt")[:batch_size]
+        )
+        OutboxItem.objects.filter(pk__in=[item.pk for item in items]).update(
+            next_attempt=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+        )
+    return items
+
+
+def post_item(item, node):
+    """POST a single outbox item to the recipient's inbox.
+
+    Returns an error message, or None on success.
+    """
+    url = f"{node.apiURL}authors/{item.recipient.id}/inbox"
+    try:
+        resp = get_client(node).post(url, json=item.payload)
+    except requests.RequestException as e:
+        return str(e)
+    if resp.status_code >= 400:
+        return f"HTTP {resp.status_code}"
+    return None
+
+
+def post_items(items, node):
+    """POST the outbox items for one node, in a single batch if it supports them.
+
+    Falls back to one request per item if the node rejects the batch endpoint.
+    Returns a list with an error message (or None on success) for each item.
+    """
+    if not node.supportsBatch or len(items) == 1:
+        return [post_item(item, node) for item in items]
+
+    url = f"{node.apiURL}inbox/batch"
+    batch = {
+        "type": "inbox-batch",
+        "items": [{"recipient": str(item.recipient.id), "item": item.payload} for item in items],
+    }
+    try:
+        resp = get_client(node).post(url, json=batch)
+    except requests.RequestException as e:
+        return [str(e)] * len(items)
+    if resp.status_code in (404, 405, 501):
+        # The peer has no batch endpoint after all
+        return [post_item(item, node) for item in items]
+    if resp.status_code >= 400:
+        return [f"HTTP {resp.status_code}"] * len(items)
+
+    try:
+        results = resp.json()["items"]
+    except (ValueError, KeyError, TypeError):
+        return ["invalid batch response"] * len(items)
+    if not isinstance(results, list):
+        return ["invalid batch response"] * len(items)
+    errors = []
+    for i in range(len(items)):
+        # Missing or malformed results count as server errors for their item
+        result = results[i] if i < len(results) else None
+        code = result.get("status") if isinstance(result, dict) else None
+        if not isinstance(code, int):
+            code = 500
+        errors.append(f"HTTP {code}" if code >= 400 else None)
+    return errors
+
+
+def record_result(item, error):
+    """Mark an item as delivered, or schedule a retry with exponential backoff."""
+    item.attempts += 1
+    if error is None:
+        item.status = OutboxItem.StatusChoice.DELIVERED
+        item.last_error = ""
+    else:
+        item.last_error = error[:200]
+        if item.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            item.status = OutboxItem.StatusChoice.FAILED
+        else:
+            item.next_attempt = timezone.now() + timedelta(seconds=30 * 2 ** item.attempts)
+    item.save(update_fields=["status", "attempts", "next_attempt", "last_error"])
+
+
+def drain(workers=None, batch_size=100):
+    """Deliver one batch of due outbox items in parallel.
+
+    Returns the number of items attempted.
+    """
+    items = claim(batch_size)
+    if not items:
+        return 0
+
+    by_node = defaultdict(list)
+    for item in items:
+        node = node_for(item.recipient)
+        if node is None:
+            record_result(item, "no node for host " + item.recipient.host)
+        else:
+            by_node[node].append(item)
+
+    # Split each node's items into batches, or single items for nodes without batching
+    jobs = []
+    for node, node_items in by_node.items():
+        size = settings.OUTBOX_BATCH_SIZE if node.supportsBatch else 1
+        for i in range(0, len(node_items), size):
+            jobs.append((node_items[i:i + size], node))
+
+    # Only the HTTP requests run in the pool; database writes stay on this thread
+    with ThreadPoolExecutor(max_workers=workers or settings.OUTBOX_WORKERS) as pool:
+        results = list(pool.map(lambda job: post_items(*job), jobs))
+
+    for (job_items, node), errors in zip(jobs, results):
+        for item, error in zip(job_items, errors):
+            record_result(item, error)
+    return len(items)
@@ -10,14 +10,140 @@ Copyright 2023 RESTless Clients
 Licensed under the MIT License
 
 Sources:
+https://use-the-index-luke.com/no-offset
+https://github.com/encode/django-rest-framework/blob/master/rest_framework/pagination.py
 """
 
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    """Add an opt-in cursor mode to a page number paginator.
+
+    Requests with a `cursor` query parameter (empty for the first page) are
+    paginated by seeking past the last row seen on the ordering fields,
+    instead of counting rows and using an OFFSET. Responses then include
+    opaque `next` and `prev` links. Requests without it keep the `page` and
+    `size` behaviour.
+
+    Attributes:
+        ordering - the fields to order and seek on; the last must be unique
+    """
+    cursor_query_param = 'cursor'
+    ordering = ('-published', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate by cursor if requested, otherwise by page number."""
+        self.request = request
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request.query_params[self.cursor_query_param], queryset)
+        ordering = [self.flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(ordering, values))
+
+        return self.cursor_page(list(queryset[:self.size + 1]), values is not None, reverse)
+
+    def cursor_page(self, rows, seeked, reverse):
+        """Trim the rows read past a cursor (one extra, if there is more) to a page.
+
+        Parameters:
+            rows - up to size + 1 rows in the order they were read
+            seeked - whether the rows were read past a cursor position
+            reverse - whether the rows were read backwards, for a previous page
+        """
+        has_more = len(rows) > self.size
+        results = rows[:self.size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = seeked, has_more
+        else:
+            self.has_next, self.has_previous = has_more, seeked
+        self.page_items = results
+        return results
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def seek_filter(ordering, values):
+        """Build the filter for rows after `values` in the given ordering.
+
+        For ordering (-a, -b) and values (x, y) this is a < x OR (a = x AND b < y).
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, item, reverse):
+        values = [str(getattr(item, field.lstrip('-'))) for field in self.ordering]
+        token = json.dumps({'v': values, 'r': reverse}).encode()
+        return base64.urlsafe_b64encode(token).decode()
+
+    def decode_cursor(self, token, queryset):
+        """Return the position and direction encoded in a cursor token.
+
+        Each value is converted to the type of its ordering field, so forged
+        cursors are rejected here rather than failing in the query.
+        """
+        if not token:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()))
+            values, reverse = data['v'], bool(data['r'])
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError('wrong number of cursor values')
+            values = [self.cursor_field(queryset, field.lstrip('-')).to_python(value)
+                      for field, value in zip(self.ordering, values)]
+        except (ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    @staticmethod
+    def cursor_field(queryset, name):
+        """Get the model field or annotation that a queryset is ordered on."""
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(name)
+
+    def get_cursor_link(self, item, reverse):
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(item, reverse))
+
+    def get_cursor_fields(self):
+        """Return the extra response fields for a cursor page, if any."""
+        if not self.use_cursor:
+            return {}
+        return {
+            'size': self.size,
+            'next': self.get_cursor_link(self.page_items[-1], False) if self.has_next and self.page_items else None,
+            'prev': self.get_cursor_link(self.page_items[0], True) if self.has_previous and self.page_items else None,
+        }
 
 
-class CommentPagination(PageNumberPagination):
+class CommentPagination(KeysetPaginationMixin, PageNumberPagination):
     """Paginate a list of comments and return a response."""
+    ordering = ('-published', '-id')
     page_size = 100
     page_size_query_param = 'size'
     max_page_size = 1000
@@ -32,6 +158,14 @@ class CommentPagination(PageNumberPagination):
         """Return the paginated response with additional fields"""
         if self.Error:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
+        elif self.use_cursor:
+            return Response({
+                'type': 'comments',
+                'id': f"{self.post_id}/comments",
+                'post': self.post_id,
+                **self.get_cursor_fields(),
+                'comments': data
+                })
         else:
             return Response({
                 'type': 'comments',
@@ -43,8 +177,9 @@ class CommentPagination(PageNumberPagination):
                 })
 
 
-class AuthorPagination(PageNumberPagination):
+class AuthorPagination(KeysetPaginationMixin, PageNumberPagination):
     """Paginate a list of authors and return a response"""
+    ordering = ('id',)
     page_size = 100
     page_size_query_param = 'size'
     max_page_size = 1000
@@ -62,12 +197,36 @@ class AuthorPagination(PageNumberPagination):
                 'type': 'authors',
                 # 'page': int(self.get_page_number(self.request, self)),
                 # 'size': self.get_page_size(self.request),
+                **self.get_cursor_fields(),
                 'items': data
                 })
 
 
-class PostPagination(PageNumberPagination):
+class AuthorSearchPagination(KeysetPaginationMixin, PageNumberPagination):
+    """Paginate author search results, ordered by name_key (see views.SearchAuthors)."""
+    ordering = ('name_key', 'id')
+    page_size = 100
+    page_size_query_param = 'size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Obtain when each node's authors were last mirrored from the view."""
+        self.synced = view.synced
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        """Return the paginated response with when each node's authors were last mirrored."""
+        return Response({
+            'type': 'authors',
+            **self.get_cursor_fields(),
+            'items': data,
+            'synced': self.synced,
+            })
+
+
+class PostPagination(KeysetPaginationMixin, PageNumberPagination):
     """Paginate a list of posts and return a response."""
+    ordering = ('published', 'id')
     page_size = 100
     page_size_query_param = 'size'
     max_page_size = 1000
@@ -83,21 +242,53 @@ class PostPagination(PageNumberPagination):
         else:
             return Response({
                 'type': 'posts',
+                **self.get_cursor_fields(),
                 'items': data
                 })
 
 
-class InboxPagination(PageNumberPagination):
-    """Paginate the posts in the inbox."""
+class InboxPagination(KeysetPaginationMixin, PageNumberPagination):
+    """Paginate the inbox, ordered by stream_time (see streams.inbox_sources).
+
+    The inbox is a list of querysets rather than one. Each is read with the
+    same ordering and seek, so each read is an index range scan, and the
+    rows are merged by (stream_time, id). Page numbers read the rows of the
+    earlier pages from each queryset too, as an OFFSET would.
+    """
+    ordering = ('-stream_time', '-id')
     page_size = 100
     page_size_query_param = 'size'
     max_page_size = 1000
     
     def paginate_queryset(self, queryset, request, view=None):
-        """Obtain the author string from the view"""
+        """Obtain the author string from the view, and merge a page from the inbox's querysets."""
         self.author_string = view.author_str
         self.Basic = view.Basic
-        return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.use_cursor = self.cursor_query_param in request.query_params
+        self.size = self.get_page_size(request)
+        if self.use_cursor:
+            values, reverse = self.decode_cursor(request.query_params[self.cursor_query_param], queryset[0])
+            skip = 0
+        else:
+            values, reverse = None, False
+            try:
+                page = int(request.query_params.get(self.page_query_param, 1))
+            except ValueError:
+                raise NotFound(self.invalid_page_message)
+            if page < 1:
+                raise NotFound(self.invalid_page_message)
+            skip = (page - 1) * self.size
+
+        ordering = [self.flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        rows = []
+        for source in queryset:
+            source = source.order_by(*ordering)
+            if values is not None:
+                source = source.filter(self.seek_filter(ordering, values))
+            rows.extend(source[:skip + self.size + 1])
+        rows.sort(key=lambda row: (row.stream_time, row.id), reverse=not reverse)
+        return self.cursor_page(rows[skip:skip + self.size + 1], values is not None, reverse)
 
     def get_paginated_response(self, data):
         """Return the paginated response with additional fields if authenticated."""
@@ -107,5 +298,6 @@ class InboxPagination(PageNumberPagination):
             return Response({
                 'type': 'inbox',
                 'author': self.author_string,
+                **self.get_cursor_fields(),
                 'items': data
                 })
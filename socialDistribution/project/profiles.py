@@ -0,0 +1,165 @@
+"""
+Module containing the local copies of the posts of remote authors.
+
+Profile pages serve the posts already stored and never wait on the author's
+node. When a remote author's profile is viewed and their posts were last
+fetched more than PROFILE_SYNC_TTL seconds ago, sync_in_background fetches
+their post list again from the apiURL of their node in a worker thread
+(stale-while-revalidate). As with engagement.py, the sync is claimed by a
+conditional UPDATE of Author.postsSyncedAt, so only one request per TTL
+window starts it, across all worker processes.
+
+Each author records when their posts were last synced (postsSyncedAt) and
+the newest publish time seen so far (postsSyncedUntil). The nodes' post
+lists cannot be filtered by date, so a sync still fetches the list, but it
+only considers posts published since the watermark, and inserts the ones
+missing locally in one statement.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#bulk-create
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#update
+https://docs.djangoproject.com/en/4.2/ref/utils/#django.utils.dateparse.parse_datetime
+https://www.rfc-editor.org/rfc/rfc5861#section-3
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .blobs import externalize
+from .engagement import BAD_DATA_ERRORS, listed_items, remote_object_id
+from .federation import fetch_json, get_client
+from .models import Author, Post
+from .nodes import node_for
+from .streams import add_posts_to_follower_streams
+
+# The post list endpoint under a node's apiURL
+PROFILE_PATH = "authors/{author_id}/posts/"
+
+_pool = ThreadPoolExecutor(max_workers=settings.PROFILE_SYNC_WORKERS, thread_name_prefix="profile-sync")
+
+
+def parse_published(value):
+    """Parse the publish time of a remote post, assuming UTC if it has no time zone."""
+    published = parse_datetime(value)
+    if published is None:
+        raise ValueError(f"Invalid publish time {value!r}")
+    if timezone.is_naive(published):
+        published = timezone.make_aware(published, dt_timezone.utc)
+    return published
+
+
+def post_row(remote_post, author):
+    """Build an unsaved Post from a serialized remote post."""
+    content = remote_post["content"]
+    if content is None:
+        # We don't want to allow null values
+        content = " "
+    return Post(
+        id=remote_object_id(remote_post), author=author, title=remote_post["title"],
+        source=remote_post["source"], origin=remote_post["origin"], description=remote_post["description"],
+        contentType=remote_post["contentType"], content=content, categories=remote_post["categories"],
+        count=remote_post["count"], published=parse_published(remote_post["published"]),
+        visibility=remote_post["visibility"], unlisted=remote_post["unlisted"],
+    )
+
+
+def ingest_remote_posts(author, remote_posts, since=None):
+    """Add the posts of a remote author that are missing locally.
+
+    Parameters:
+        author - the local copy of the remote author
+        remote_posts - serialized posts from the author's node
+        since - if given, posts published before this time are skipped
+    Returns a dict mapping the id of every well-formed post considered to its Post.
+    """
+    posts = {}
+    for remote_post in remote_posts:
+        try:
+            post = post_row(remote_post, author)
+        except BAD_DATA_ERRORS:
+            continue
+        if since is None or post.published >= since:
+            posts[str(post.id)] = post
+    if not posts:
+        return {}
+
+    existing = {str(pk) for pk in Post.objects.filter(pk__in=list(posts.keys())).values_list("pk", flat=True)}
+    new = [post for post_id, post in posts.items() if post_id not in existing]
+    # bulk_create skips the signals that externalize images and fan posts out to follower streams
+    for post in new:
+        post.content = externalize(post.content) or post.content
+    Post.objects.bulk_create(new, ignore_conflicts=True)
+    add_posts_to_follower_streams(author.id, [
+        (post.id, post.published) for post in new
+        if not post.unlisted and post.visibility in (Post.VisibilityChoice.PUBLIC, Post.VisibilityChoice.FRIENDS_ONLY)
+    ])
+    return {str(pk): post for pk, post in Post.objects.in_bulk(list(posts.keys())).items()}
+
+
+def is_stale(author):
+    """Check whether a remote author's posts are due to be fetched again."""
+    synced = author.postsSyncedAt
+    return synced is None or timezone.now() - synced >= timedelta(seconds=settings.PROFILE_SYNC_TTL)
+
+
+def sync_in_background(author):
+    """Fetch a remote author's new posts in a worker thread if they are stale.
+
+    Returns True if a sync was started.
+    """
+    if not is_stale(author):
+        return False
+    node = node_for(author)
+    if node is None or not node.apiURL:
+        return False
+    # Only the first request in any process to see the author stale in each TTL window syncs them
+    now = timezone.now()
+    synced_before = now - timedelta(seconds=settings.PROFILE_SYNC_TTL)
+    stale = Q(postsSyncedAt__isnull=True) | Q(postsSyncedAt__lte=synced_before)
+    if not Author.objects.filter(stale, pk=author.pk).update(postsSyncedAt=now):
+        return False
+    _pool.submit(sync_in_thread, author.pk)
+    return True
+
+
+def sync_in_thread(author_id):
+    try:
+        sync(Author.objects.get(pk=author_id))
+    except Exception as e:
+        print(f"Syncing the posts of author {author_id} failed: {e}")
+    finally:
+        # Worker threads would otherwise keep their database connections open
+        connection.close()
+
+
+def sync(author):
+    """Fetch a remote author's posts from their node and store the new ones.
+
+    Returns the posts published since the last sync, or None if the node did not answer.
+    """
+    node = node_for(author)
+    if node is None or not node.apiURL:
+        return None
+    deadline = settings.NODE_CLIENT_CONNECT_TIMEOUT + settings.NODE_CLIENT_READ_TIMEOUT
+    [data] = fetch_json([(get_client(node), node.apiURL + PROFILE_PATH.format(author_id=author.pk))], deadline)
+    remote_posts = listed_items(data)
+    if remote_posts is None:
+        return None
+
+    posts = ingest_remote_posts(author, remote_posts, since=author.postsSyncedUntil)
+    updates = {"postsSyncedAt": timezone.now()}
+    if posts:
+        updates["postsSyncedUntil"] = max(post.published for post in posts.values())
+    Author.objects.filter(pk=author.pk).update(**updates)
+    return list(posts.values())
@@ -11,16 +11,23 @@ Licensed under the MIT License
 
 Sources:
 https://stackoverflow.com/questions/66340780/how-to-return-list-of-id-s-with-django-rest-framework-serializer
+https://docs.djangoproject.com/en/4.2/ref/models/expressions/#window-functions
 """
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from .models import Author, FollowRequest, Post, Comment, PostLike, CommentLike, Node, Notification
+from .models import Author, FollowRequest, InboxItem, Post, Comment, PostLike, CommentLike, Node, Notification
+from .blobs import external_content, parse_reference
+from .identity import identity_for
+from .summaries import summarize, use_preview
+from .thumbnails import variant_urls
 
 
 class AuthorSerializer(serializers.ModelSerializer):
@@ -90,7 +97,11 @@ class PostSerializer(serializers.ModelSerializer):
         description - a description of the post
         contentType - the content format of the post
             - can be plaintext, markdown or image?
-        content - the post text
+        content - the post text, or the URL of the post's image
+        contentTruncated - in lists of summarized posts, whether content is only the
+            start of the post text; the full post is at id
+        variants - for image posts sent by URL, the URLs of the image resized
+            to each width in IMAGE_VARIANT_WIDTHS
         author - the serialized author that created the post
         categories - list of categories that the post fits into
         count - the total number of comments on the post
@@ -135,28 +146,74 @@ class PostSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
+    @staticmethod
+    def prefetch(queryset, summary=False):
+        """Load what to_representation needs for a list of posts up front.
+
+        Serializing the returned queryset takes the same number of queries for
+        any number of posts: the authors are joined in, and only the first 5
+        comments of each post are fetched, with their authors, in a single query.
+        With `summary`, posts are listed with a preview of their content (see summaries.py).
+        """
+        first_comments = Comment.objects.annotate(
+            row=Window(RowNumber(), partition_by=F("post_id"), order_by=[F("published").asc(), F("id").asc()])
+        ).filter(row__lte=5).select_related("author").order_by("published", "id")
+        if summary:
+            queryset = summarize(queryset)
+        return queryset.select_related("author").prefetch_related(Prefetch("comment_set", queryset=first_comments, to_attr="first_comments"))
+
+    def inline_images(self):
+        """Check whether images are sent inline, for nodes that cannot fetch them by URL.
+
+        Set the inline_images context to decide up front; otherwise it depends
+        on the node making the request (see identity.py).
+        """
+        if "inline_images" in self.context:
+            return self.context["inline_images"]
+        request = self.context.get("request")
+        if request is None:
+            return False
+        node = identity_for(request).node
+        return node is not None and node.inlineImages
+
     # https://stackoverflow.com/questions/68743630/how-to-serialize-the-foreign-key-field-in-django-rest-framework
     def to_representation(self, instance):
+        truncated = use_preview(instance)
         representation = super().to_representation(instance)
+        if truncated is not None:
+            representation["contentTruncated"] = truncated
 
         # author object
-        author_field = representation["author"]
-        author = Author.objects.get(id=author_field)
+        author = instance.author
         representation["author"] = AuthorSerializer(author).data
 
         # id field
         representation['id'] = str(author.url) + '/posts/' + str(representation['id'])
 
+        # image posts hold a reference to a stored image; send its URL, or the image itself to nodes that need it
+        if parse_reference(instance.content) is not None:
+            request = self.context.get("request")
+            base_url = request.build_absolute_uri("/") if request is not None else author.host
+            representation["content"] = external_content(instance.content, base_url, self.inline_images())
+            variants = variant_urls(representation["content"])
+            if variants:
+                representation["variants"] = variants
+
         # comment objects
         if self.context.get("is_friend_only") and not self.context.get("user_is_author"):
             print("filtering comments on friends only post for", self.context.get("user"))
-            comments = CommentSerializer(instance.comment_set.all().filter(author=self.context.get("user")).order_by("published"), many=True).data
+            comment_set = instance.comment_set.filter(author=self.context.get("user"))
+            count, comments = comment_set.count(), comment_set.select_related("author").order_by("published")[:5]
+        elif hasattr(instance, "first_comments"):
+            # Loaded by prefetch
+            count, comments = instance.comment_count, instance.first_comments
         else:
-            comments = CommentSerializer(instance.comment_set.all().order_by("published"), many=True).data
+            count = instance.comment_count
+            comments = instance.comment_set.select_related("author").order_by("published")[:5]
 
         representation["comments"] = representation["id"] + "/comments"
-        representation["count"] = len(comments)
-        comments = comments[:5]  # at most the top 5 most recent comments
+        representation["count"] = count
+        comments = CommentSerializer(comments, many=True).data  # at most the first 5 comments
 
         # commentsSrc is an optional field and can be missing if there are no comments
         if comments:
@@ -182,11 +239,16 @@ class NodeSerializer(serializers.ModelSerializer):
         nodeName - the name of the node
         apiURL - the address to access the API service
         host - the IP of the node
+        supportsBatch - whether the node accepts batched inbox deliveries
+        authorsSyncedAt - when the node's author directory was last mirrored
+        inlineImages - whether the node needs images sent as base64 instead of URLs
     """
 
     class Meta:
         model = Node
-        fields = ['id', 'nodeName', 'nodeCred', 'apiURL', 'host']
+        fields = ['id', 'nodeName', 'nodeCred', 'apiURL', 'host', 'supportsBatch', 'authorsSyncedAt',
+                  'inlineImages']
+        read_only_fields = ['authorsSyncedAt']
 
     def create(self, validated_data):
         """
@@ -227,7 +289,9 @@ class FollowRequestSerializer(serializers.ModelSerializer):
         following = Author.objects.get(**validated_data["following"])
 
         summary = validated_data["summary"]
-        return FollowRequest.objects.create(follower=follower, following=following, summary=summary)
+        # A repeated request is the same request
+        return FollowRequest.objects.get_or_create(follower=follower, following=following,
+                                                   defaults={"summary": summary})[0]
 
     def to_representation(self, instance):
         results = super().to_representation(instance)
@@ -301,7 +365,9 @@ class PostLikeSerializer(serializers.ModelSerializer):
             **validated_data,
             'author': author_obj,
         }
-        return PostLike.objects.create(**data)
+        # An author likes a post at most once
+        post = data.pop('post')
+        return PostLike.objects.get_or_create(author=data.pop('author'), post=post, defaults=data)[0]
 
     def to_representation(self, instance):
         results = super().to_representation(instance)
@@ -340,7 +406,9 @@ class CommentLikeSerializer(serializers.ModelSerializer):
             **validated_data,
             'author': author_obj,
         }
-        return CommentLike.objects.create(**data)
+        # An author likes a comment at most once
+        comment = data.pop('comment')
+        return CommentLike.objects.get_or_create(author=data.pop('author'), comment=comment, defaults=data)[0]
 
     def to_representation(self, instance):
         results = super().to_representation(instance)
@@ -356,6 +424,32 @@ class CommentLikeSerializer(serializers.ModelSerializer):
         return super().to_internal_value(data)
 
 
+def serialize_inbox(rows, context=None):
+    """Serialize a page of an inbox, made of InboxItems and pulled Posts (see streams.inbox_sources).
+
+    Comments, likes and follow requests come with their InboxItems. The
+    posts of the page are loaded together with PostSerializer.prefetch.
+    """
+    post_ids = [row.id if isinstance(row, Post) else row.post_id for row in rows
+                if isinstance(row, Post) or row.kind == InboxItem.KindChoice.POST]
+    posts = PostSerializer.prefetch(Post.objects.filter(id__in=post_ids), summary=True).in_bulk() if post_ids else {}
+    data = []
+    for row in rows:
+        if isinstance(row, Post):
+            data.append(PostSerializer(posts[row.id], context=context).data)
+        elif row.kind == InboxItem.KindChoice.POST:
+            data.append(PostSerializer(posts[row.post_id], context=context).data)
+        elif row.comment_id is not None:
+            data.append(CommentSerializer(row.comment, context=context).data)
+        elif row.post_like_id is not None:
+            data.append(PostLikeSerializer(row.post_like, context=context).data)
+        elif row.comment_like_id is not None:
+            data.append(CommentLikeSerializer(row.comment_like, context=context).data)
+        elif row.follow_request_id is not None:
+            data.append(FollowRequestSerializer(row.follow_request, context=context).data)
+    return data
+
+
 class UserSignUpSerializer(serializers.Serializer):
     username = serializers.CharField()
     github = serializers.CharField(required=False)
@@ -10,16 +10,53 @@ Licensed under the MIT License
 Sources:
 """
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
-from .models import Author, Post, PostLike, Comment
+from .models import Author, Node, Post, PostLike, Comment, CommentLike
+from .streams import add_to_streams, add_to_follower_streams, update_follower_counts
+from .blobs import externalize
+from . import nodes
+
+
+@receiver(pre_save, sender=Post)
+def on_post_save(sender, instance, **kwargs):
+    """Move base64 images into the blob store, keeping only a reference in the post."""
+    reference = externalize(instance.content)
+    if reference is not None:
+        instance.content = reference
+
+
+@receiver(pre_save, sender=Author)
+def on_author_save(sender, instance, **kwargs):
+    """Point an author to the node with its host, if there is one."""
+    node = nodes.node_for(instance)
+    if node is None or node.host != instance.host:
+        instance.node = Node.objects.filter(host=instance.host).first()
+
+
+@receiver(post_save, sender=Node)
+def on_node_save(sender, instance, **kwargs):
+    """Relink authors to a node whose host may have changed, and reload the node registry."""
+    Author.objects.filter(node=instance).exclude(host=instance.host).update(node=None)
+    Author.objects.filter(host=instance.host).exclude(node=instance).update(node=instance)
+    nodes.invalidate()
+
+
+@receiver(post_delete, sender=Node)
+def on_node_delete(sender, instance, **kwargs):
+    nodes.invalidate()
+
 
 # stream update after post creation
 @receiver(post_save, sender=Post)
 def on_post_create(sender, instance, created, **kwargs):
     """Add a post to follower streams when created.
+
+    The streams are updated in bulk once the post has been committed.
     
     Parameters:
         instance - the post object created
@@ -27,23 +64,14 @@ def on_post_create(sender, instance, created, **kwargs):
     """
     if created:  # TODO not if post unlisted or private
         if not instance.unlisted and (instance.visibility == Post.VisibilityChoice.PUBLIC or instance.visibility == Post.VisibilityChoice.FRIENDS_ONLY):
-            post = instance
-            author = instance.author
-
-            followers = author.followers.all()
-
-            #print("sending public/friends only post to inbox")
-
-            for follower in followers:
-                follower.streamPosts.add(post)
-            
-            #print("post sent to stream inboxes:", post.title)
+            post_id, author_id, published = instance.id, instance.author_id, instance.published
+            transaction.on_commit(lambda: add_to_follower_streams(post_id, author_id, published))
         elif not instance.unlisted and instance.visibility == Post.VisibilityChoice.PRIVATE:
             post = instance
             reciever = instance.private_reciever
 
             if reciever:
-                reciever.streamPosts.add(post)
+                transaction.on_commit(lambda: add_to_streams(post.id, [reciever.id], post.published))
                 print("private post sent to", reciever.displayName, ":", post.title)
             else:
                 print("error: invalid private reciever")
@@ -57,10 +85,59 @@ def on_post_create(sender, instance, created, **kwargs):
 def on_post_liked(sender, instance, created, **kwargs):
     # TODO send post likes to inbox of the author who created the post
     # NOTE local only???
-    pass
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(like_count=F("like_count") + 1)
 
 @receiver(post_save, sender=Comment)
 def on_comment_create(sender, instance, created, **kwargs):
     # TODO send comments to inbox of the author who created the post
     # NOTE local only???
-    pass
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(comment_count=F("comment_count") + 1)
+
+
+@receiver(post_save, sender=CommentLike)
+def on_comment_liked(sender, instance, created, **kwargs):
+    if created:
+        Comment.objects.filter(pk=instance.comment_id).update(like_count=F("like_count") + 1)
+
+
+# counter updates after deletion; the rows may already be gone in a cascade, in which case nothing is updated
+@receiver(post_delete, sender=PostLike)
+def on_post_unliked(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(like_count=F("like_count") - 1)
+
+
+@receiver(post_delete, sender=Comment)
+def on_comment_delete(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(comment_count=F("comment_count") - 1)
+
+
+@receiver(post_delete, sender=CommentLike)
+def on_comment_unliked(sender, instance, **kwargs):
+    Comment.objects.filter(pk=instance.comment_id).update(like_count=F("like_count") - 1)
+
+
+@receiver(m2m_changed, sender=Author.following.through)
+def on_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Recount the followers of the authors who gained or lost followers."""
+    if action == "pre_clear" and not reverse:
+        instance._cleared_following = list(instance.following.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if reverse:
+            update_follower_counts([instance.pk])
+        elif action == "post_clear":
+            update_follower_counts(getattr(instance, "_cleared_following", []))
+        else:
+            update_follower_counts(pk_set)
+
+
+# deleting an author removes their follows without m2m_changed
+@receiver(pre_delete, sender=Author)
+def on_author_delete_start(sender, instance, **kwargs):
+    instance._deleted_following = list(instance.following.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Author)
+def on_author_delete(sender, instance, **kwargs):
+    update_follower_counts(getattr(instance, "_deleted_following", []))
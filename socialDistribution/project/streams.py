@@ -0,0 +1,201 @@
+"""
+Module containing helpers to build author inboxes and streams.
+
+Everything that arrives in an author's inbox is recorded as an InboxItem.
+Posts normally reach followers by being pushed into their inboxes when they
+are created (fan-out on write). Authors with more followers than
+settings.STREAM_FANOUT_FOLLOWER_LIMIT are not fanned out; their posts are
+pulled into each follower's stream when it is read instead. Which authors are
+pulled is decided by Author.follower_count, which is recounted whenever
+follows change. Either way a follower only sees the posts published since
+they followed (Follow.followed_at), as a pushed stream would hold.
+
+An author who rises above the limit keeps the rows already pushed; they are
+merged with the pulled posts. An author who drops back to the limit has the
+posts made while they were pulled backfilled into their followers' streams,
+since those were never pushed.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from .counters import actual_count
+from .models import Author, Comment, CommentLike, Follow, FollowRequest, InboxItem, Post, PostLike
+
+
+def add_to_inbox(owner, obj):
+    """Record an object as received in an author's inbox.
+
+    Parameters:
+        owner - the author whose inbox receives the object
+        obj - a Post, Comment, PostLike, CommentLike, or FollowRequest
+    """
+    if isinstance(obj, Post):
+        add_to_streams(obj.id, [owner.id], obj.published)
+    elif isinstance(obj, Comment):
+        InboxItem.objects.create(owner=owner, kind=InboxItem.KindChoice.COMMENT, comment=obj)
+    elif isinstance(obj, PostLike):
+        InboxItem.objects.create(owner=owner, kind=InboxItem.KindChoice.LIKE, post_like=obj)
+    elif isinstance(obj, CommentLike):
+        InboxItem.objects.create(owner=owner, kind=InboxItem.KindChoice.LIKE, comment_like=obj)
+    elif isinstance(obj, FollowRequest):
+        InboxItem.objects.create(owner=owner, kind=InboxItem.KindChoice.FOLLOW, follow_request=obj)
+    else:
+        raise TypeError(f"Cannot add {type(obj).__name__} to an inbox")
+
+
+def add_to_streams(post_id, author_ids, published):
+    """Add a post to the inboxes of many authors in bulk.
+
+    Parameters:
+        post_id - the id of the post to add
+        author_ids - the ids of the authors whose inboxes receive the post
+        published - the publish time of the post
+    """
+    InboxItem.objects.bulk_create(
+        [InboxItem(owner_id=author_id, kind=InboxItem.KindChoice.POST, post_id=post_id, received_at=published)
+         for author_id in author_ids],
+        ignore_conflicts=True,
+    )
+
+
+def add_to_follower_streams(post_id, author_id, published):
+    """Add a post to the streams of all followers of its author.
+
+    Nothing is written for authors above the fan-out limit, since their
+    posts are pulled in by stream_posts.
+    """
+    add_posts_to_follower_streams(author_id, [(post_id, published)])
+
+
+def add_posts_to_follower_streams(author_id, posts, since_follow=False):
+    """Add several posts by one author to the streams of all of their followers.
+
+    Parameters:
+        author_id - the id of the author of the posts
+        posts - (id, publish time) pairs of the posts to add
+        since_follow - only give followers the posts published since they followed
+    The followers are looked up once and every row is written in one bulk
+    insert. Nothing is written for authors above the fan-out limit.
+    """
+    if not posts:
+        return
+    # Checked on the counter so that the followers of popular authors are never scanned
+    if Author.objects.filter(pk=author_id, follower_count__gt=settings.STREAM_FANOUT_FOLLOWER_LIMIT).exists():
+        return
+    follows = Follow.objects.filter(to_author=author_id).values_list("from_author_id", "followed_at")
+    InboxItem.objects.bulk_create(
+        [InboxItem(owner_id=follower_id, kind=InboxItem.KindChoice.POST, post_id=post_id, received_at=published)
+         for follower_id, followed_at in follows for post_id, published in posts
+         if not since_follow or followed_at is None or published >= followed_at],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+
+
+def pulled_follows(author):
+    """Get the follows of `author` whose followed authors are not fanned out."""
+    return Follow.objects.filter(from_author=author, to_author__follower_count__gt=settings.STREAM_FANOUT_FOLLOWER_LIMIT)
+
+
+def update_follower_counts(author_ids):
+    """Recount the followers of some authors.
+
+    Authors that drop from above the fan-out limit to within it have their
+    streams backfilled once the change is committed.
+    """
+    author_ids = list(author_ids)
+    if not author_ids:
+        return
+    limit = settings.STREAM_FANOUT_FOLLOWER_LIMIT
+    authors = Author.objects.filter(pk__in=author_ids)
+    before = dict(authors.values_list("pk", "follower_count"))
+    authors.update(follower_count=actual_count(Follow, "to_author"))
+    for author_id, count in authors.values_list("pk", "follower_count"):
+        if before.get(author_id, 0) > limit >= count:
+            transaction.on_commit(lambda author_id=author_id: backfill_follower_streams(author_id))
+
+
+def backfill_follower_streams(author_id):
+    """Push an author's listed posts into the streams of their followers.
+
+    Each follower gets the posts published since they followed, as if the
+    posts had been pushed all along. Rows that already exist are skipped.
+    """
+    posts = Post.objects.filter(
+        author=author_id,
+        unlisted=False,
+        visibility__in=[Post.VisibilityChoice.PUBLIC, Post.VisibilityChoice.FRIENDS_ONLY],
+    ).values_list("id", "published")
+    add_posts_to_follower_streams(author_id, list(posts), since_follow=True)
+
+
+def pulled_posts(author):
+    """Get a filter for the posts of followed authors above the fan-out limit, or None if there are none.
+
+    The posts have the same visibility rules as on_post_create, and like
+    pushed posts are only those published since the author followed them.
+    """
+    follows = list(pulled_follows(author).values_list("to_author_id", "followed_at"))
+    if not follows:
+        return None
+    since_follow = Q()
+    for followed_id, followed_at in follows:
+        since_follow |= Q(author=followed_id) if followed_at is None else Q(author=followed_id, published__gte=followed_at)
+    return since_follow & Q(
+        unlisted=False,
+        visibility__in=[Post.VisibilityChoice.PUBLIC, Post.VisibilityChoice.FRIENDS_ONLY],
+    )
+
+
+def stream_posts(author):
+    """Get the posts in an author's stream, newest first.
+
+    Each post is annotated with stream_time, the key the stream is ordered by.
+
+    Posts pushed to the author are read in order off the (owner, received_at)
+    index. Posts of followed authors above the fan-out limit are merged in
+    (see pulled_posts).
+    """
+    pushed = Q(inboxitem__owner=author, inboxitem__kind=InboxItem.KindChoice.POST)
+    pulled = pulled_posts(author)
+    if pulled is None:
+        return Post.objects.filter(pushed).annotate(
+            stream_time=F("inboxitem__received_at")
+        ).order_by("-stream_time", "-id")
+
+    pushed_ids = InboxItem.objects.filter(owner=author, kind=InboxItem.KindChoice.POST).values("post_id")
+    return Post.objects.filter(Q(id__in=pushed_ids) | pulled).annotate(
+        stream_time=F("published")
+    ).order_by("-stream_time", "-id")
+
+
+def inbox_sources(author):
+    """Get the querysets that make up an author's inbox, each annotated with stream_time.
+
+    The first holds the InboxItems of every kind, read off the (owner,
+    received_at) index, with the objects they refer to joined in. If the
+    author follows anyone above the fan-out limit, the second holds those
+    authors' posts that were not pushed. InboxPagination merges them by time.
+    """
+    items = InboxItem.objects.filter(owner=author).select_related(
+        "comment__author", "comment__post__author",
+        "post_like__author", "post_like__post__author",
+        "comment_like__author", "comment_like__comment__post__author",
+        "follow_request__follower", "follow_request__following",
+    ).annotate(stream_time=F("received_at"))
+    pulled = pulled_posts(author)
+    if pulled is None:
+        return [items]
+    pushed_ids = InboxItem.objects.filter(owner=author, kind=InboxItem.KindChoice.POST).values("post_id")
+    return [items, Post.objects.filter(pulled).exclude(id__in=pushed_ids).only("id", "published").annotate(
+        stream_time=F("published")
+    )]
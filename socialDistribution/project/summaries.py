@@ -0,0 +1,45 @@
+"""
+Module containing the summary form of posts used by list endpoints.
+
+Lists of posts do not load the content column. Instead the database returns
+only its first POST_PREVIEW_LENGTH characters (plus one, to tell whether
+anything was cut off), so a list never reads a long post, or an image that
+was stored inline, in full. Text posts are listed with a preview of their
+content and image posts with their blob reference, which is always short.
+Clients fetch the full content from the single-post endpoint when needed.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/querysets/#defer
+https://docs.djangoproject.com/en/4.2/ref/models/database-functions/#substr
+"""
+
+from django.conf import settings
+from django.db.models.functions import Substr
+
+
+def summarize(posts):
+    """Load a queryset of posts with a preview of their content instead of the content."""
+    return posts.defer("content").annotate(content_preview=Substr("content", 1, settings.POST_PREVIEW_LENGTH + 1))
+
+
+def use_preview(post):
+    """Put the preview of a summarized post in place of its content.
+
+    Returns whether the content was cut short, or None if the post was not
+    loaded by summarize.
+    """
+    preview = getattr(post, "content_preview", None)
+    if preview is None:
+        return None
+    truncated = len(preview) > settings.POST_PREVIEW_LENGTH
+    if truncated and post.contentType.startswith("image/"):
+        # Part of an inline image is no use to anyone
+        preview = ""
+    # Fills in the deferred field, so reading it does not query the database
+    post.content = preview[:settings.POST_PREVIEW_LENGTH]
+    return truncated
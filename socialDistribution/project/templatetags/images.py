@@ -0,0 +1,23 @@
+"""
+Module containing template filters for stored images.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/howto/custom-template-tags/
+"""
+
+from django import template
+
+from ..thumbnails import variant_urls
+
+register = template.Library()
+
+
+@register.filter
+def srcset(url):
+    """Build an <img> srcset from the resized variants of a stored image, or "" for other images."""
+    return ", ".join(f"{variant} {width}w" for width, variant in variant_urls(url).items())
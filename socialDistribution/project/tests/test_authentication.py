@@ -0,0 +1,72 @@
+"""
+Test module for the cached Basic authentication of remote nodes.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.python.org/3/library/unittest.mock.html#autospeccing
+"""
+
+import base64
+from unittest import mock
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Author, Node
+
+
+class NodeBasicAuthenticationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create_user(username="Alice", password="alicepass"),
+                                          displayName="Alice")
+        cls.node = Node.objects.create(user=User.objects.create_user(username="remote", password="nodepass"),
+                                       host="https://remote.example.com/")
+        cls.url = reverse("project:posts_api", args=[cls.alice.id])
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, username, password):
+        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Basic {credentials}")
+        return self.client.get(self.url)
+
+    def hasher_calls(self, username, password, requests=3):
+        """Make several requests and count how many ran the password hasher."""
+        with mock.patch.object(PBKDF2PasswordHasher, "verify", autospec=True,
+                               side_effect=PBKDF2PasswordHasher.verify) as verify:
+            codes = {self.get(username, password).status_code for _ in range(requests)}
+        return verify.call_count, codes
+
+    def test_node_credentials_hashed_once(self):
+        self.assertEqual(self.hasher_calls("remote", "nodepass"), (1, {status.HTTP_200_OK}))
+
+    def test_wrong_password_rejected(self):
+        self.get("remote", "nodepass")
+        self.assertEqual(self.get("remote", "wrong").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_cache(self):
+        self.get("remote", "nodepass")
+        self.node.user.set_password("changed")
+        self.node.user.save()
+        self.assertEqual(self.get("remote", "nodepass").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get("remote", "changed").status_code, status.HTTP_200_OK)
+
+    def test_inactive_node_rejected(self):
+        self.get("remote", "nodepass")
+        User.objects.filter(pk=self.node.user.pk).update(is_active=False)
+        self.assertEqual(self.get("remote", "nodepass").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_other_users_not_cached(self):
+        calls, _ = self.hasher_calls("Alice", "alicepass")
+        self.assertEqual(calls, 3)
@@ -0,0 +1,222 @@
+"""
+Test module for the content-addressed image store.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/testing/tools/#django.test.override_settings
+"""
+
+import base64
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import outbox
+from ..blobs import blob_path, inline, store_blob, store_upload
+from ..forms import CreatePostForm
+from ..models import Author, Node, Post
+from ..serializers import PostSerializer
+from ..thumbnails import variant_urls
+from ..uploads import HashingUploadHandler
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8
+DATA_URI = "data:image/png;base64," + base64.b64encode(IMAGE).decode("ascii")
+DIGEST = hashlib.sha256(IMAGE).hexdigest()
+REFERENCE = f"/api/blobs/{DIGEST}.png"
+
+
+class BlobTestCase(TestCase):
+    """Keep blobs written by a test in a temporary directory."""
+
+    def setUp(self):
+        blob_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, blob_root)
+        settings = override_settings(BLOB_ROOT=blob_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class BlobStoreTest(BlobTestCase):
+    def test_store_is_content_addressed(self):
+        self.assertEqual(store_blob(IMAGE), DIGEST)
+        self.assertEqual(store_blob(IMAGE), DIGEST)
+        path = blob_path(DIGEST)
+        self.assertTrue(path.endswith(os.path.join(DIGEST[:2], DIGEST[2:4], DIGEST)))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), IMAGE)
+        self.assertEqual(os.listdir(os.path.dirname(path)), [DIGEST])
+
+    def test_post_keeps_reference(self):
+        alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        post = Post.objects.create(author=alice, title="Picture", contentType=Post.TypeChoice.IMAGE, content=DATA_URI)
+        self.assertEqual(post.content, REFERENCE)
+        self.assertEqual(Post.objects.get(pk=post.pk).content, REFERENCE)
+        self.assertEqual(inline(post.content), DATA_URI)
+
+    def test_text_post_untouched(self):
+        alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        post = Post.objects.create(author=alice, title="Text", content="data:image/png;base64,not base64!")
+        self.assertEqual(post.content, "data:image/png;base64,not base64!")
+
+
+class BlobViewTest(BlobTestCase, APITestCase):
+    def test_blob_is_streamed_with_cache_headers(self):
+        store_blob(IMAGE)
+        resp = self.client.get(REFERENCE)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(resp.streaming_content), IMAGE)
+        self.assertEqual(resp["Content-Type"], "image/png")
+        self.assertEqual(resp["ETag"], f'"{DIGEST}"')
+        self.assertIn("immutable", resp["Cache-Control"])
+
+        resp = self.client.get(REFERENCE, HTTP_IF_NONE_MATCH=f'"{DIGEST}"')
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_missing_blob(self):
+        self.assertEqual(self.client.get(REFERENCE).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get("/api/blobs/../settings.py").status_code, status.HTTP_404_NOT_FOUND)
+
+
+def make_jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320, 640])
+class VariantTest(BlobTestCase, APITestCase):
+    def test_variant_is_resized_and_cached(self):
+        digest = store_blob(make_jpeg(1000, 500))
+        resp = self.client.get(f"/api/blobs/{digest}-320.jpg")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["ETag"], f'"{digest}-320"')
+        with Image.open(io.BytesIO(b"".join(resp.streaming_content))) as image:
+            self.assertEqual(image.size, (320, 160))
+        self.assertTrue(os.path.exists(blob_path(digest) + "-320"))
+
+    def test_narrow_image_served_as_is(self):
+        original = make_jpeg(400, 300)
+        digest = store_blob(original)
+        resp = self.client.get(f"/api/blobs/{digest}-640.jpg")
+        self.assertEqual(b"".join(resp.streaming_content), original)
+        self.assertFalse(os.path.exists(blob_path(digest) + "-640"))
+
+    def test_unknown_width(self):
+        digest = store_blob(make_jpeg(1000, 500))
+        self.assertEqual(self.client.get(f"/api/blobs/{digest}-100.jpg").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_variant_urls(self):
+        self.assertEqual(variant_urls(REFERENCE), {"320": f"/api/blobs/{DIGEST}-320.png",
+                                                   "640": f"/api/blobs/{DIGEST}-640.png"})
+        self.assertEqual(variant_urls("https://local.example.com" + REFERENCE)["320"],
+                         f"https://local.example.com/api/blobs/{DIGEST}-320.png")
+        self.assertEqual(variant_urls("https://example.com/avatar.png"), {})
+        self.assertEqual(variant_urls(DATA_URI), {})
+
+    def test_local_api_lists_variants(self):
+        alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        post = Post.objects.create(author=alice, title="Picture", contentType=Post.TypeChoice.IMAGE, content=DATA_URI)
+        self.client.force_authenticate(user=alice.user)
+        resp = self.client.get(reverse("project:post-detail", args=[post.id]))
+        self.assertEqual(resp.data["variants"]["320"], f"/api/blobs/{DIGEST}-320.png")
+
+
+class UploadTest(BlobTestCase):
+    def form(self, data, content_type=Post.TypeChoice.IMAGE):
+        fields = {"title": "Picture", "description": "A picture", "contentType": content_type, "content": "",
+                  "categories": "art", "visibility": Post.VisibilityChoice.PUBLIC}
+        files = {"picture": SimpleUploadedFile("picture.jpg", data)} if data is not None else {}
+        return CreatePostForm(data=fields, files=files)
+
+    def test_upload_handler(self):
+        handler = HashingUploadHandler()
+        handler.new_file("picture", "picture.png", "image/png", None)
+        handler.receive_data_chunk(IMAGE[:1000], 0)
+        handler.receive_data_chunk(IMAGE[1000:], 1000)
+        uploaded = handler.file_complete(len(IMAGE))
+        self.assertEqual(uploaded.sha256, DIGEST)
+        temporary_path = uploaded.temporary_file_path()
+        self.assertEqual(store_upload(uploaded), DIGEST)
+        with open(blob_path(DIGEST), "rb") as f:
+            self.assertEqual(f.read(), IMAGE)
+        # The temporary file was moved into the store, not copied
+        self.assertFalse(os.path.exists(temporary_path))
+        uploaded.close()
+
+    def test_in_memory_upload(self):
+        self.assertEqual(store_upload(SimpleUploadedFile("picture.png", IMAGE)), DIGEST)
+        with open(blob_path(DIGEST), "rb") as f:
+            self.assertEqual(f.read(), IMAGE)
+
+    @override_settings(UPLOAD_MAX_BYTES=1024)
+    def test_upload_handler_limit(self):
+        handler = HashingUploadHandler()
+        handler.new_file("picture", "picture.png", "image/png", None)
+        handler.receive_data_chunk(IMAGE[:1000], 0)
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(IMAGE[1000:], 1000)
+
+    def test_content_type_follows_image(self):
+        form = self.form(make_jpeg(64, 32), Post.TypeChoice.IMAGE)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["contentType"], Post.TypeChoice.IMAGE2)
+
+    def test_missing_or_bad_image(self):
+        self.assertIn("picture", self.form(None).errors)
+        self.assertIn("picture", self.form(b"not an image").errors)
+
+
+class BlobSerializationTest(BlobTestCase, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice",
+                                          host="https://local.example.com/")
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), nodeName="remote",
+                                       nodeCred="secret", apiURL="https://remote.example.com/api/",
+                                       host="https://remote.example.com/")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob",
+                                        host="https://remote.example.com/")
+
+    def setUp(self):
+        super().setUp()
+        self.post = Post.objects.create(author=self.alice, title="Picture", contentType=Post.TypeChoice.IMAGE,
+                                        content=DATA_URI)
+
+    def get_content(self):
+        self.client.force_authenticate(user=self.node.user)
+        resp = self.client.get(reverse("project:single_post_api", args=[self.alice.id, self.post.id]))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.resp = resp
+        return resp.data["content"]
+
+    def test_api_sends_url(self):
+        self.assertEqual(self.get_content(), "http://testserver" + REFERENCE)
+        self.assertEqual(self.resp.data["variants"], variant_urls("http://testserver" + REFERENCE))
+
+    def test_api_inlines_for_node_that_needs_it(self):
+        Node.objects.filter(pk=self.node.pk).update(inlineImages=True)
+        self.assertEqual(self.get_content(), DATA_URI)
+        self.assertNotIn("variants", self.resp.data)
+
+    def test_outbox_payload(self):
+        self.assertEqual(outbox.enqueue(self.post, self.bob, PostSerializer)["content"],
+                         "https://local.example.com" + REFERENCE)
+        self.node.inlineImages = True
+        self.node.save()
+        self.assertEqual(outbox.enqueue(self.post, self.bob, PostSerializer)["content"], DATA_URI)
@@ -17,6 +17,7 @@ from django.utils import timezone
 from django.urls import reverse
 from django.utils.http import urlencode
 
+import base64
 import uuid
 import json
 
@@ -135,6 +136,15 @@ class CommentAPITest(APITestCase):
         self.assertEqual(data['page'], 2)
         self.assertEqual(data['size'], 2)
 
+    def test_get_comments_forged_cursor(self):
+        """Check that cursors with well-formed JSON but bad values are rejected."""
+        self.client.force_authenticate(user=self.userObj["Alice"])
+        url = reverse(self.url_name, args=[self.alice.id, self.post1.id])
+        for values in [["garbage", "x"], 5, [timezone.now().isoformat(), "not-a-uuid"], [None, None, None]]:
+            cursor = base64.urlsafe_b64encode(json.dumps({'v': values, 'r': False}).encode()).decode()
+            resp = self.client.get(f"{url}?{urlencode({'cursor': cursor})}")
+            self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND, values)
+
     def test_post_valid_comment(self):
         """Check that a valid comment is posted."""
         self.client.force_authenticate(user=self.userObj["Alice"])
@@ -0,0 +1,109 @@
+"""
+Test module for the denormalized like and comment counters.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..counters import repair_counters
+from ..models import Author, Comment, CommentLike, Post, PostLike
+
+
+class CounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.post = Post.objects.create(author=cls.alice, title="Hello")
+
+    def test_post_counters(self):
+        like = PostLike.objects.create(author=self.bob, post=self.post, summary="Bob likes this")
+        comment = Comment.objects.create(author=self.bob, post=self.post, comment="Nice")
+        Comment.objects.create(author=self.alice, post=self.post, comment="Thanks")
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (1, 2))
+
+        like.delete()
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (0, 1))
+
+    def test_comment_counter(self):
+        comment = Comment.objects.create(author=self.bob, post=self.post, comment="Nice")
+        for author in [self.alice, self.bob]:
+            CommentLike.objects.create(author=author, comment=comment, summary="likes this")
+        comment.refresh_from_db()
+        self.assertEqual(comment.like_count, 2)
+        CommentLike.objects.filter(author=self.bob).delete()
+        comment.refresh_from_db()
+        self.assertEqual(comment.like_count, 1)
+
+    def test_follower_counter(self):
+        carl = Author.objects.create(user=User.objects.create(username="Carl"), displayName="Carl")
+        self.alice.followers.add(self.bob, carl)
+        self.bob.following.add(carl)
+        counts = lambda: dict(Author.objects.values_list("displayName", "follower_count"))
+        self.assertEqual(counts(), {"Alice": 2, "Bob": 0, "Carl": 1})
+
+        self.bob.following.remove(self.alice)
+        self.assertEqual(counts(), {"Alice": 1, "Bob": 0, "Carl": 1})
+        self.bob.following.clear()
+        self.assertEqual(counts(), {"Alice": 1, "Bob": 0, "Carl": 0})
+        carl.user.delete()
+        self.assertEqual(counts(), {"Alice": 0, "Bob": 0})
+
+    def test_repair_counters(self):
+        comment = Comment.objects.create(author=self.bob, post=self.post, comment="Nice")
+        PostLike.objects.create(author=self.bob, post=self.post, summary="Bob likes this")
+        Post.objects.update(like_count=7, comment_count=0)
+        Comment.objects.update(like_count=-1)
+
+        out = StringIO()
+        call_command("repair_counters", stdout=out)
+        self.assertIn("Post.like_count: 1 rows fixed", out.getvalue())
+        self.post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count, comment.like_count), (1, 1, 0))
+        self.assertEqual(set(repair_counters().values()), {0})
+
+
+class CounterAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.post = Post.objects.create(author=cls.alice, title="Hello")
+
+    def test_like_and_unlike(self):
+        self.client.force_authenticate(user=self.bob.user)
+        url = reverse("project:post-like", args=[self.post.id])
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, status.HTTP_204_NO_CONTENT)
+        resp = self.client.get(reverse("project:post-detail", args=[self.post.id]))
+        self.assertEqual(resp.data["like_count"], 1)
+
+        self.client.post(reverse("project:post-unlike", args=[self.post.id]))
+        resp = self.client.get(reverse("project:post-list"))
+        self.assertEqual(resp.data[0]["like_count"], 0)
+
+    def test_counts_not_writable(self):
+        self.client.force_authenticate(user=self.alice.user)
+        resp = self.client.patch(reverse("project:post-detail", args=[self.post.id]),
+                                 {"like_count": 100, "contentType": "text/plain", "content": "edited"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
@@ -0,0 +1,166 @@
+"""
+Test module for mirroring and ingesting remote authors.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.python.org/3/library/unittest.mock.html
+"""
+
+import uuid
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import requests
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..directory import ingest_remote_authors, sync_remote_authors
+from ..models import Author, Node
+from ..utils import addOrGetRemoteAuthor
+
+HOST = "https://remote.example.com/"
+
+
+def remote_author(author_id, name):
+    return {"type": "author", "id": f"{HOST}authors/{author_id}", "url": f"{HOST}authors/{author_id}",
+            "host": HOST, "displayName": name, "github": None, "profileImage": None}
+
+
+@override_settings(AUTHOR_SYNC_PAGE_SIZE=2)
+class SyncRemoteAuthorsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), nodeName="remote",
+                                       nodeCred="secret", apiURL=f"{HOST}api/", host=HOST)
+        cls.directory = [remote_author(uuid.uuid4(), f"remote{i}") for i in range(5)]
+
+    def fake_get(self, url, **kwargs):
+        """Serve self.directory in pages, like a paginated authors endpoint."""
+        params = parse_qs(urlparse(url).query)
+        page, size = int(params["page"][0]), int(params["size"][0])
+        resp = mock.Mock()
+        resp.json.return_value = {"type": "authors", "items": self.directory[(page - 1) * size:page * size]}
+        return resp
+
+    def sync(self, get=None):
+        with mock.patch("project.federation.NodeClient.get", side_effect=get or self.fake_get) as fake:
+            results = sync_remote_authors()
+        return results, fake
+
+    def test_sync_follows_pages(self):
+        results, fake = self.sync()
+        self.assertEqual(fake.call_count, 3)
+        self.assertEqual(results, {self.node: (5, 0)})
+        author = Author.objects.get(displayName="remote0")
+        self.assertEqual(author.host, HOST)
+        self.assertFalse(author.user.is_active)
+        self.assertFalse(author.user.has_usable_password())
+        self.node.refresh_from_db()
+        self.assertIsNotNone(self.node.authorsSyncedAt)
+
+    def test_sync_is_incremental(self):
+        self.sync()
+        self.directory[0]["displayName"] = "renamed"
+        with self.assertNumQueries(6):
+            # SELECT nodes and existing authors, UPDATE of the changed row only, UPDATE of the sync time
+            results, fake = self.sync()
+        self.assertEqual(results, {self.node: (0, 1)})
+        self.assertTrue(Author.objects.filter(displayName="renamed").exists())
+        self.assertEqual(Author.objects.filter(host=HOST).count(), 5)
+
+    def test_node_without_pagination(self):
+        def get_all(url, **kwargs):
+            resp = mock.Mock()
+            resp.json.return_value = {"data": self.directory}
+            return resp
+        results, fake = self.sync(get_all)
+        self.assertEqual(fake.call_count, 1)
+        self.assertEqual(results, {self.node: (5, 0)})
+
+    def test_failed_node_keeps_mirror(self):
+        results, fake = self.sync(mock.Mock(side_effect=requests.ConnectionError))
+        self.assertEqual(results, {})
+        self.node.refresh_from_db()
+        self.assertIsNone(self.node.authorsSyncedAt)
+
+    def test_local_author_not_overwritten(self):
+        alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        self.directory.append(remote_author(alice.id, "impostor"))
+        self.sync()
+        alice.refresh_from_db()
+        self.assertEqual(alice.displayName, "Alice")
+
+    def test_command(self):
+        out = StringIO()
+        with mock.patch("project.federation.NodeClient.get", side_effect=self.fake_get):
+            call_command("sync_remote_authors", stdout=out)
+        self.assertIn(f"{HOST}: 5 created, 0 updated", out.getvalue())
+
+
+class IngestRemoteAuthorsTest(TestCase):
+    def test_add_remote_author(self):
+        author_id = uuid.uuid4()
+        author = addOrGetRemoteAuthor(remote_author(author_id, "Tom"))
+        self.assertEqual(author.id, author_id)
+        self.assertEqual(author.displayName, "Tom")
+        self.assertFalse(author.user.is_active)
+        self.assertFalse(author.user.has_usable_password())
+        self.assertEqual(addOrGetRemoteAuthor(remote_author(author_id, "Tom")), author)
+
+    def test_ingest_query_count_independent_of_authors(self):
+        remote_authors = [remote_author(uuid.uuid4(), f"remote{i}") for i in range(50)]
+        # SELECT existing, SELECT their nodes, then in a savepoint bulk INSERT users, SELECT users and
+        # bulk INSERT authors, then SELECT the new authors
+        with self.assertNumQueries(8):
+            authors = ingest_remote_authors(remote_authors)
+        self.assertEqual(len(authors), 50)
+        with self.assertNumQueries(1):
+            self.assertEqual(ingest_remote_authors(remote_authors), authors)
+
+    def test_bad_authors_skipped(self):
+        good = remote_author(uuid.uuid4(), "Tom")
+        bad = [None, {"id": f"{HOST}authors/not-a-uuid", "displayName": "Bad"}, {"id": f"{HOST}authors/{uuid.uuid4()}"}]
+        self.assertEqual(list(ingest_remote_authors([good, *bad]).values()), [Author.objects.get(displayName="Tom")])
+
+
+class SearchAuthorsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), nodeName="remote",
+                                       nodeCred="secret", apiURL=f"{HOST}api/", host=HOST)
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        Author.objects.create(user=User.objects.create(username="remote"), displayName="Tom", host=HOST)
+
+    def test_search_is_local(self):
+        self.client.force_authenticate(user=self.alice.user)
+        with mock.patch("project.federation.NodeClient.request") as request:
+            resp = self.client.get(reverse("project:search_authors"), {"username": "t"})
+        request.assert_not_called()
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([author["displayName"] for author in resp.data["items"]], ["Tom"])
+        self.assertEqual(resp.data["synced"], {HOST: None})
+
+    def test_search_matches_prefix_in_pages(self):
+        for name in ["tina", "Tara", "Stan", "tom"]:
+            Author.objects.create(user=User.objects.create(username=name), displayName=name)
+        self.client.force_authenticate(user=self.alice.user)
+        url = reverse("project:search_authors")
+        names = []
+        resp = self.client.get(url, {"username": "t", "size": 2, "cursor": ""})
+        while True:
+            names += [author["displayName"] for author in resp.data["items"]]
+            if resp.data["next"] is None:
+                break
+            resp = self.client.get(resp.data["next"])
+        # Names containing the query elsewhere, like Stan, are not matched; equal names are ordered by id
+        self.assertEqual([name.upper() for name in names], ["TARA", "TINA", "TOM", "TOM"])
@@ -0,0 +1,158 @@
+"""
+Test module for ingesting comments and likes from other nodes.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .. import engagement
+from ..engagement import ingest_remote_comment_likes, ingest_remote_comments, ingest_remote_post_likes
+from ..models import Author, Comment, CommentLike, Node, Post, PostLike
+from ..utils import addOrGetRemotePostLike
+
+REMOTE = "https://remote.example.com/"
+
+
+def remote_author(name):
+    author_id = uuid.uuid5(uuid.NAMESPACE_URL, name)
+    return {"type": "author", "id": f"{REMOTE}authors/{author_id}", "host": REMOTE,
+            "displayName": name, "url": f"{REMOTE}authors/{author_id}"}
+
+
+def remote_like(name, summary="Someone likes this"):
+    return {"type": "Like", "author": remote_author(name), "summary": summary, "context": REMOTE}
+
+
+def remote_comment(name, text="Nice post!"):
+    return {"type": "comment", "id": f"{REMOTE}authors/x/posts/y/comments/{uuid.uuid4()}",
+            "author": remote_author(name), "comment": text, "contentType": "text/plain",
+            "published": timezone.now().isoformat()}
+
+
+class RemoteEngagementTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.post = Post.objects.create(author=cls.alice, title="Hello", content="world")
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.comment_count
+
+    def test_likes_with_same_summary_kept(self):
+        likes = ingest_remote_post_likes(self.post, [remote_like("Bob"), remote_like("Carol")])
+        self.assertEqual(len(likes), 2)
+        self.assertEqual(PostLike.objects.filter(post=self.post).count(), 2)
+        self.assertEqual(self.counts(), (2, 0))
+
+    def test_likes_idempotent(self):
+        likes = [remote_like(f"Liker{i}") for i in range(5)]
+        ingest_remote_post_likes(self.post, likes[:3])
+        ingest_remote_post_likes(self.post, likes)
+        self.assertEqual(PostLike.objects.filter(post=self.post).count(), 5)
+        self.assertEqual(self.counts(), (5, 0))
+        self.assertEqual(addOrGetRemotePostLike(likes[0], self.post).author.displayName, "Liker0")
+        self.assertEqual(PostLike.objects.count(), 5)
+
+    def test_comments_idempotent(self):
+        comments = [remote_comment(f"Commenter{i}") for i in range(3)]
+        ingested = ingest_remote_comments(self.post, comments)
+        ingest_remote_comments(self.post, comments)
+        self.assertEqual(len(ingested), 3)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 3)
+        self.assertEqual(self.counts(), (0, 3))
+
+    def test_comment_likes(self):
+        comment = next(iter(ingest_remote_comments(self.post, [remote_comment("Bob")]).values()))
+        ingest_remote_comment_likes(comment, [remote_like("Bob"), remote_like("Carol"), remote_like("Bob")])
+        comment.refresh_from_db()
+        self.assertEqual(CommentLike.objects.filter(comment=comment).count(), 2)
+        self.assertEqual(comment.like_count, 2)
+
+    def test_bad_items_skipped(self):
+        likes = ingest_remote_post_likes(self.post, [remote_like("Bob"), {"type": "Like"}, "junk", {"author": {}}])
+        self.assertEqual(list(likes.values())[0].author.displayName, "Bob")
+        self.assertEqual(self.counts(), (1, 0))
+        self.assertEqual(ingest_remote_comments(self.post, [{"id": "not-a-uuid"}]), {})
+
+    def test_queries_independent_of_size(self):
+        def queries(count, prefix):
+            likes = [remote_like(f"{prefix}{i}") for i in range(count)]
+            # Create the authors first; their creation is covered by test_directory
+            ingest_remote_post_likes(self.post, likes)
+            PostLike.objects.filter(post=self.post).delete()
+            with CaptureQueriesContext(connection) as captured:
+                ingest_remote_post_likes(self.post, likes)
+            return len(captured)
+        self.assertEqual(queries(2, "Small"), queries(20, "Large"))
+
+
+class EngagementRefreshTest(TestCase):
+    # Any node is refreshed, not only the ones the app was first written for
+    host = "https://new-node.example.com/"
+
+    @classmethod
+    def setUpTestData(cls):
+        Node.objects.create(user=User.objects.create(username="new"), host=cls.host, apiURL=f"{cls.host}api/")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob", host=cls.host)
+        cls.post = Post.objects.create(author=cls.bob, title="Hello", content="world")
+
+    def setUp(self):
+        patcher = mock.patch.object(engagement._pool, "submit")
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stale_post_refreshed_once(self):
+        self.assertTrue(engagement.refresh_in_background(self.post))
+        self.assertFalse(engagement.refresh_in_background(Post.objects.get(pk=self.post.pk)))
+        self.submit.assert_called_once_with(engagement.refresh_in_thread, self.post.pk)
+
+    def test_refresh_claimed_once_across_processes(self):
+        # Copies loaded by different workers before either claimed the refresh
+        copies = [Post.objects.select_related("author").get(pk=self.post.pk) for _ in range(2)]
+        self.assertEqual([engagement.refresh_in_background(post) for post in copies], [True, False])
+        self.submit.assert_called_once_with(engagement.refresh_in_thread, self.post.pk)
+
+    def test_fresh_post_not_refreshed(self):
+        self.post.engagementSyncedAt = timezone.now() - timedelta(seconds=5)
+        self.assertFalse(engagement.refresh_in_background(self.post))
+        self.post.engagementSyncedAt = timezone.now() - timedelta(days=1)
+        self.assertTrue(engagement.refresh_in_background(self.post))
+
+    def test_local_and_private_posts_not_refreshed(self):
+        local = Post.objects.create(author=Author.objects.create(user=User.objects.create(username="Alice")),
+                                    title="Local", content="world")
+        private = Post.objects.create(author=self.bob, title="Secret", content="world",
+                                      visibility=Post.VisibilityChoice.PRIVATE)
+        self.assertFalse(engagement.refresh_in_background(local))
+        self.assertFalse(engagement.refresh_in_background(private))
+        self.submit.assert_not_called()
+
+    def test_refresh(self):
+        responses = [{"comments": [remote_comment("Carol")]}, {"items": [remote_like("Carol"), remote_like("Dave")]}]
+        with mock.patch.object(engagement, "fetch_json", return_value=responses) as fetch:
+            self.assertTrue(engagement.refresh(self.post))
+        urls = [url for client, url in fetch.call_args.args[0]]
+        self.assertEqual(urls[1], f"{self.host}api/authors/{self.bob.id}/posts/{self.post.pk}/likes")
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.like_count, post.comment_count), (2, 1))
+        self.assertFalse(engagement.is_stale(post))
+
+    def test_unreachable_node_stays_stale(self):
+        with mock.patch.object(engagement, "fetch_json", return_value=[None, None]):
+            self.assertFalse(engagement.refresh(self.post))
+        self.assertIsNone(Post.objects.get(pk=self.post.pk).engagementSyncedAt)
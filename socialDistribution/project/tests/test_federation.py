@@ -0,0 +1,73 @@
+"""
+Test module for the HTTP clients used to talk to remote nodes.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+import requests
+
+from ..federation import client_for_host, fetch_json, get_client
+from ..models import Node
+
+
+class NodeClientTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), nodeName="remote",
+                                       nodeCred="secret", apiURL="https://remote.example.com/api/",
+                                       host="https://remote.example.com/")
+
+    def test_client_reused(self):
+        client = get_client(self.node)
+        self.assertIs(get_client(Node.objects.get(pk=self.node.pk)), client)
+        self.assertIs(client_for_host("https://remote.example.com/"), client)
+        self.assertEqual(client.session.auth, ("remote", "secret"))
+
+    def test_client_replaced_when_credentials_change(self):
+        client = get_client(self.node)
+        self.node.nodeCred = "changed"
+        self.node.save()
+        new_client = get_client(self.node)
+        self.assertIsNot(new_client, client)
+        self.assertEqual(new_client.session.auth, ("remote", "changed"))
+
+    def test_unknown_host(self):
+        self.assertIsNone(client_for_host("https://unknown.example.com/"))
+
+
+class FetchJsonTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ["fast", "slow", "down"]:
+            Node.objects.create(user=User.objects.create(username=name), nodeName=name, nodeCred="secret",
+                                apiURL=f"https://{name}.example.com/api/", host=f"https://{name}.example.com/")
+
+    def fake_get(self, url, **kwargs):
+        if "slow" in url:
+            time.sleep(1)
+        elif "down" in url:
+            raise requests.ConnectionError
+        resp = mock.Mock()
+        resp.json.return_value = {"url": url}
+        return resp
+
+    def test_partial_results_at_deadline(self):
+        urls = [(client_for_host(f"https://{name}.example.com/"), f"https://{name}.example.com/api/")
+                for name in ["fast", "slow", "down"]]
+        with mock.patch("project.federation.NodeClient.get", side_effect=self.fake_get):
+            start = time.perf_counter()
+            results = fetch_json(urls, 0.3)
+            elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(results, [{"url": "https://fast.example.com/api/"}, None, None])
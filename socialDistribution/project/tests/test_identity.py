@@ -0,0 +1,85 @@
+"""
+Test module for the request-scoped caller identity.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..identity import identity_for
+from ..models import Author, Node, Post
+
+
+class IdentityTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), host="https://remote.example.com/")
+
+    def request(self, user, authorization=""):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=authorization)
+        request.user = user
+        return request
+
+    def test_author(self):
+        identity = identity_for(self.request(self.alice.user, "Bearer token"))
+        self.assertEqual(identity.scheme, "Bearer")
+        self.assertEqual(identity.author, self.alice)
+        self.assertFalse(identity.is_node)
+        self.assertFalse(identity.basic_without_node)
+
+    def test_node(self):
+        identity = identity_for(self.request(self.node.user, "Basic cmVtb3RlOnNlY3JldA=="))
+        self.assertTrue(identity.is_node)
+        self.assertIsNone(identity.author)
+        self.assertFalse(identity.basic_without_node)
+
+    def test_basic_without_node(self):
+        self.assertTrue(identity_for(self.request(self.alice.user, "Basic YWxpY2U6c2VjcmV0")).basic_without_node)
+
+    def test_anonymous(self):
+        identity = identity_for(self.request(AnonymousUser()))
+        self.assertEqual(identity.scheme, "")
+        with self.assertNumQueries(0):
+            self.assertIsNone(identity.author)
+            self.assertFalse(identity.is_node)
+
+    def test_resolved_once(self):
+        request = self.request(User.objects.get(pk=self.alice.user.pk))
+        identity = identity_for(request)
+        with self.assertNumQueries(2):
+            identity.author, identity.node
+        with self.assertNumQueries(0):
+            self.assertIs(identity_for(request), identity)
+            identity.author, identity.node, request.user.author
+
+
+class IdentityQueriesTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), host="https://remote.example.com/")
+        for i in range(3):
+            Post.objects.create(author=cls.alice, title=f"post {i}", content="Hello")
+
+    def test_caller_looked_up_once_per_request(self):
+        for user in [self.alice.user, self.node.user]:
+            self.client.force_authenticate(user=user)
+            with CaptureQueriesContext(connection) as queries:
+                resp = self.client.get(reverse("project:posts_api", args=[self.alice.id]))
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(resp.data["items"]), 3)
+            node_lookups = [query for query in queries if 'FROM "project_node"' in query["sql"]]
+            self.assertLessEqual(len(node_lookups), 1)
@@ -0,0 +1,123 @@
+"""
+Test module for the background processing of objects sent to inboxes by nodes.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/testing/tools/#overriding-settings
+"""
+
+import uuid
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import inbound
+from ..models import Author, InboundItem, Node, Notification, Post, PostLike
+from ..serializers import PostLikeSerializer
+
+HOST = "http://127.0.0.1:8000/"
+REMOTE = "https://remote.example.com/"
+
+
+class InboundTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice",
+                                          host=HOST, url=f"{HOST}authors/alice")
+        cls.post = Post.objects.create(author=cls.alice, title="Hello", content="world")
+        cls.node = Node.objects.create(user=User.objects.create(username="remote"), host=REMOTE)
+        bob_id = "4b1ee2a7-2d0e-4e7c-9b5f-2ec0e1a5c7a1"
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), id=bob_id, displayName="Bob",
+                                        host=REMOTE, url=f"{REMOTE}authors/{bob_id}")
+        # The like as the node would send it
+        like = PostLike.objects.create(author=cls.bob, post=cls.post, summary="Bob likes your post", context=HOST)
+        cls.like = PostLikeSerializer(like).data
+        like.delete()
+        cls.url = reverse("project:inbox_api", args=[cls.alice.id])
+
+    def send(self, payload, user=None):
+        self.client.force_authenticate(user=user or self.node.user)
+        return self.client.post(self.url, payload, format="json")
+
+    def test_node_object_processed_later(self):
+        self.assertEqual(self.send(self.like).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(InboundItem.objects.get().status, InboundItem.StatusChoice.PENDING)
+        self.assertFalse(PostLike.objects.exists())
+
+        self.assertEqual(inbound.process(), 1)
+        self.assertEqual(InboundItem.objects.get().status, InboundItem.StatusChoice.PROCESSED)
+        like = PostLike.objects.get(author=self.bob, post=self.post)
+        self.assertTrue(self.alice.inbox_items.filter(post_like=like).exists())
+        self.assertEqual(Notification.objects.filter(author=self.alice).count(), 1)
+        self.assertEqual(inbound.process(), 0)
+
+    def test_replay_processed_once(self):
+        for _ in range(3):
+            self.assertEqual(self.send(self.like).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(InboundItem.objects.count(), 1)
+        inbound.process()
+        self.send(self.like)
+        inbound.process()
+        self.assertEqual(PostLike.objects.count(), 1)
+        self.assertEqual(self.alice.inbox_items.count(), 1)
+
+    def test_concurrent_replay_recorded_once(self):
+        with transaction.atomic():
+            first = inbound.record(self.alice, self.like)
+            # The second insert loses the race on the digest but leaves the transaction usable
+            second = inbound.record(self.alice, self.like)
+            self.assertEqual(first.pk, second.pk)
+            self.assertEqual(InboundItem.objects.count(), 1)
+
+    def test_bad_object_fails(self):
+        self.send({**self.like, "object": "not a url"})
+        inbound.process()
+        item = InboundItem.objects.get()
+        self.assertEqual(item.status, InboundItem.StatusChoice.FAILED)
+        self.assertEqual(item.attempts, 1)
+        self.assertTrue(item.last_error)
+        self.assertFalse(Notification.objects.exists())
+
+    def test_bad_author_fails_only_its_item(self):
+        poison = {**self.like["author"], "id": f"{REMOTE}authors/{uuid.uuid4()}", "url": REMOTE + "x" * 200}
+        self.send({**self.like, "author": poison})
+        self.send(self.like)
+        self.assertEqual(inbound.process(), 2)
+        statuses = dict(InboundItem.objects.values_list("payload__author__url", "status"))
+        self.assertEqual(statuses[poison["url"]], InboundItem.StatusChoice.FAILED)
+        self.assertEqual(statuses[self.like["author"]["url"]], InboundItem.StatusChoice.PROCESSED)
+        self.assertEqual(PostLike.objects.get().author.displayName, "Bob")
+
+    def test_batch_author_error_retried_per_item(self):
+        carol_url = f"{REMOTE}authors/{uuid.uuid4()}"
+        carol = {**self.like["author"], "id": carol_url, "url": carol_url, "displayName": "Carol"}
+        self.send({**self.like, "author": carol})
+        with mock.patch.object(inbound, "ingest_remote_authors", side_effect=DatabaseError("value too long")):
+            self.assertEqual(inbound.process(), 1)
+        item = InboundItem.objects.get()
+        self.assertEqual((item.status, item.attempts), (InboundItem.StatusChoice.PROCESSED, 1))
+        self.assertEqual(PostLike.objects.get().author.displayName, "Carol")
+
+    def test_unknown_type_rejected(self):
+        self.assertEqual(self.send({"type": "unknown"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(InboundItem.objects.exists())
+
+    def test_local_client_processed_immediately(self):
+        self.assertEqual(self.send(self.like, user=self.alice.user).status_code, status.HTTP_201_CREATED)
+        self.assertFalse(InboundItem.objects.exists())
+
+    @override_settings(INBOX_ASYNC=False)
+    def test_sync_mode(self):
+        self.assertEqual(self.send(self.like).status_code, status.HTTP_201_CREATED)
+        self.assertFalse(InboundItem.objects.exists())
+        self.assertTrue(PostLike.objects.exists())
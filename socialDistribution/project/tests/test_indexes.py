@@ -0,0 +1,67 @@
+"""
+Test module for the lookup indexes and uniqueness constraints.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/models/constraints/
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from ..models import Author, Comment, CommentLike, FollowRequest, Post, PostLike
+from ..serializers import FollowRequestSerializer, PostLikeSerializer
+
+
+class ConstraintTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.bob.url = f"https://local.example.com/authors/{cls.bob.id}"
+        cls.bob.save()
+        cls.post = Post.objects.create(author=cls.alice, title="Hello")
+        cls.comment = Comment.objects.create(author=cls.bob, post=cls.post, comment="Hi")
+
+    def test_duplicates_rejected(self):
+        PostLike.objects.create(author=self.bob, post=self.post, summary="Bob likes this")
+        CommentLike.objects.create(author=self.alice, comment=self.comment, summary="Alice likes this")
+        FollowRequest.objects.create(follower=self.bob, following=self.alice, summary="Bob wants to follow Alice")
+        for model, fields in [(PostLike, {"author": self.bob, "post": self.post}),
+                              (CommentLike, {"author": self.alice, "comment": self.comment}),
+                              (FollowRequest, {"follower": self.bob, "following": self.alice})]:
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                model.objects.create(summary="again", **fields)
+
+    def test_replayed_inbox_items_reuse_rows(self):
+        like = PostLike.objects.create(author=self.bob, post=self.post, summary="Bob likes this",
+                                       context="https://www.w3.org/ns/activitystreams")
+        follow_request = FollowRequest.objects.create(follower=self.bob, following=self.alice, summary="follow")
+        for obj, serializer_class in [(like, PostLikeSerializer), (follow_request, FollowRequestSerializer)]:
+            data = serializer_class(obj).data
+            if serializer_class is PostLikeSerializer:
+                data = {**data, "post": self.post.id}
+            serializer = serializer_class(data=data)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            self.assertEqual(serializer.save(), obj)
+
+
+class ExplainQueriesTest(TestCase):
+    def test_command(self):
+        alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        post = Post.objects.create(author=alice, title="Hello")
+        Comment.objects.create(author=alice, post=post, comment="Hi")
+        out = StringIO()
+        call_command("explain_queries", stdout=out)
+        output = out.getvalue()
+        self.assertIn(f"GET /api/authors/{alice.id}/posts/ -> 200", output)
+        self.assertRegex(output, r"\d+ distinct queries, \d+ with full table scans")
+        self.assertEqual(Post.objects.count(), 1)
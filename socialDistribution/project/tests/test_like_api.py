@@ -95,8 +95,12 @@ class PostLikeAPITest(APITestCase):
 
     def test_get_many_likes(self):
         """Test retrieving a multiple likes."""
+        # An author can only like a post once
         for i in range(3):
-            PostLike.objects.create(**self.like_dict)
+            user = User.objects.create(username=f"Liker{i}", password="testpassword1")
+            userid = uuid.uuid4()
+            author = Author.objects.create(user=user, displayName=f"Liker{i}", id=userid, url=f'http://127.0.0.1:8000/authors/{userid}')
+            PostLike.objects.create(**{**self.like_dict, 'author': author})
 
         self.client.force_authenticate(user=self.userObj["Alice"])
         url = reverse(self.url_name, args=[self.alice.id, self.post1.id])
@@ -201,8 +205,12 @@ class CommentLikeAPITest(APITestCase):
 
     def test_get_many_likes(self):
         """Test retrieving a multiple likes."""
+        # An author can only like a comment once
         for i in range(3):
-            CommentLike.objects.create(**self.like_dict)
+            user = User.objects.create(username=f"Liker{i}", password="testpassword1")
+            userid = uuid.uuid4()
+            author = Author.objects.create(user=user, displayName=f"Liker{i}", id=userid, url=f'http://127.0.0.1:8000/authors/{userid}')
+            CommentLike.objects.create(**{**self.like_dict, 'author': author})
 
         self.client.force_authenticate(user=self.userObj["Alice"])
         url = reverse(self.url_name, args=[self.alice.id, self.post1.id, self.comment1.id])
@@ -277,18 +285,12 @@ class LikedAPITest(APITestCase):
         self.comment1 = Comment.objects.get(comment='Nice post!')
 
     def get_comment_json(self, like_dict):
-        """Helper method to get the JSON for a CommentLike"""
-        like = CommentLike.objects.create(**like_dict)
-        like_json = CommentLikeSerializer(like).data
-        like.delete()
-        return like_json
+        """Helper method to get the JSON for an existing CommentLike"""
+        return CommentLikeSerializer(CommentLike.objects.get(**like_dict)).data
     
     def get_post_json(self, like_dict):
-        """Helped method to get the JSON for a PostLike"""
-        like = PostLike.objects.create(**like_dict)
-        like_json = PostLikeSerializer(like).data
-        like.delete()
-        return like_json
+        """Helped method to get the JSON for an existing PostLike"""
+        return PostLikeSerializer(PostLike.objects.get(**like_dict)).data
 
     def test_get_no_likes(self):
         """Check empty query."""
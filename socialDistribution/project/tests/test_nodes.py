@@ -0,0 +1,76 @@
+"""
+Test module for the in-memory node registry and Author.node links.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .. import nodes
+from ..directory import ingest_remote_authors
+from ..models import Author, Node, Post
+from ..serializers import PostSerializer
+from ..utils import send_to_inbox
+
+HOST = "https://remote.example.com/"
+
+
+class NodeRegistryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.node = Node.objects.create(user=User.objects.create(username="remote-node"), nodeName="remote",
+                                       apiURL=f"{HOST}api/", host=HOST)
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob", host=HOST)
+
+    def test_authors_linked_on_save(self):
+        self.assertEqual(self.bob.node, self.node)
+        self.assertIsNone(self.alice.node)
+
+    def test_authors_relinked_when_node_host_changes(self):
+        self.node.host = "https://moved.example.com/"
+        self.node.save()
+        self.assertIsNone(Author.objects.get(pk=self.bob.pk).node)
+        self.node.host = HOST
+        self.node.save()
+        self.assertEqual(Author.objects.get(pk=self.bob.pk).node, self.node)
+
+    def test_node_created_after_author(self):
+        carol = Author.objects.create(user=User.objects.create(username="Carol"), displayName="Carol",
+                                      host="https://other.example.com/")
+        node = Node.objects.create(user=User.objects.create(username="other-node"), host="https://other.example.com/")
+        self.assertEqual(Author.objects.get(pk=carol.pk).node, node)
+
+    def test_ingested_authors_linked(self):
+        author_id = uuid.uuid4()
+        remote = {"id": f"{HOST}authors/{author_id}", "host": HOST, "displayName": "Dan"}
+        self.assertEqual(ingest_remote_authors([remote])[str(author_id)].node_id, self.node.pk)
+
+    def test_resolving_node_makes_no_queries(self):
+        nodes.all_nodes()
+        with self.assertNumQueries(0):
+            self.assertEqual(nodes.node_for(self.bob), self.node)
+            self.assertIsNone(nodes.node_for(self.alice))
+
+    def test_registry_reloaded_when_node_saved(self):
+        self.assertFalse(nodes.node_for(self.bob).inlineImages)
+        self.node.inlineImages = True
+        self.node.save()
+        self.assertTrue(nodes.node_for(self.bob).inlineImages)
+
+    def test_send_to_inbox_resolves_node_without_queries(self):
+        post = Post.objects.create(author=self.alice, title="Hello", content="world")
+        nodes.all_nodes()
+        with CaptureQueriesContext(connection) as queries:
+            send_to_inbox(post, self.bob, PostSerializer)
+        self.assertFalse([query for query in queries if "project_node" in query["sql"]])
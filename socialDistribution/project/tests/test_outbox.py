@@ -0,0 +1,191 @@
+"""
+Test module for the remote delivery outbox.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.python.org/3/library/unittest.mock.html
+"""
+
+import uuid
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .. import outbox
+from ..models import Author, FollowRequest, Node, OutboxItem, Post, PostLike
+from ..serializers import PostLikeSerializer
+from ..utils import create_post, update_followers
+
+
+class OutboxTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        node_user = User.objects.create(username="remote-node")
+        cls.node = Node.objects.create(user=node_user, nodeName="remote", nodeCred="secret",
+                                       apiURL="https://remote.example.com/api/", host="https://remote.example.com/")
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob",
+                                        host="https://remote.example.com/")
+        cls.alice.followers.add(cls.bob)
+
+    def make_post(self):
+        with mock.patch("project.federation.NodeClient.post") as post:
+            create_post({"author": self.alice, "title": "Hello", "content": "world"})
+            post.assert_not_called()
+
+    def test_create_post_enqueues_remote_delivery(self):
+        self.make_post()
+        item = OutboxItem.objects.get()
+        self.assertEqual(item.recipient, self.bob)
+        self.assertEqual(item.status, OutboxItem.StatusChoice.PENDING)
+        self.assertEqual(item.payload["title"], "Hello")
+
+    def test_create_post_makes_no_requests(self):
+        carol = Author.objects.create(user=User.objects.create(username="Carol"), displayName="Carol",
+                                      host="https://remote.example.com/")
+        FollowRequest.objects.create(follower=self.alice, following=carol, summary="Alice wants to follow Carol")
+        with mock.patch("project.federation.NodeClient.request") as request:
+            create_post({"author": self.alice, "title": "Hello", "content": "world"})
+        request.assert_not_called()
+
+    def test_update_followers(self):
+        carol = Author.objects.create(user=User.objects.create(username="Carol"), displayName="Carol",
+                                      host="https://remote.example.com/")
+        dave = Author.objects.create(user=User.objects.create(username="Dave"), displayName="Dave",
+                                     host="https://remote.example.com/")
+        for author in [carol, dave]:
+            FollowRequest.objects.create(follower=self.alice, following=author, summary="follow")
+
+        def answer(url, **kwargs):
+            return mock.Mock(status_code=200, json=lambda: {"isFollower": str(carol.id) in url})
+        with mock.patch("project.federation.NodeClient.get", side_effect=answer):
+            self.assertEqual(update_followers(), 1)
+        self.assertEqual(list(self.alice.following.all()), [carol])
+        self.assertEqual(list(FollowRequest.objects.values_list("following", flat=True)), [dave.id])
+
+    def test_drain_delivers(self):
+        self.make_post()
+        with mock.patch("project.federation.NodeClient.post") as post:
+            post.return_value.status_code = 201
+            self.assertEqual(outbox.drain(), 1)
+        post.assert_called_once()
+        self.assertEqual(post.call_args.args[0], f"https://remote.example.com/api/authors/{self.bob.id}/inbox")
+        self.assertEqual(OutboxItem.objects.get().status, OutboxItem.StatusChoice.DELIVERED)
+        self.assertEqual(outbox.drain(), 0)
+
+    def test_drain_retries_failures(self):
+        self.make_post()
+        with mock.patch("project.federation.NodeClient.post") as post:
+            post.return_value.status_code = 500
+            outbox.drain()
+        item = OutboxItem.objects.get()
+        self.assertEqual(item.status, OutboxItem.StatusChoice.PENDING)
+        self.assertEqual(item.attempts, 1)
+        self.assertEqual(item.last_error, "HTTP 500")
+        # Not due again until the backoff has passed
+        self.assertEqual(outbox.drain(), 0)
+
+    def test_local_followers_not_queued(self):
+        carl = Author.objects.create(user=User.objects.create(username="Carl"), displayName="Carl")
+        self.alice.followers.add(carl)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_post()
+        self.assertEqual(OutboxItem.objects.count(), 1)
+        self.assertTrue(carl.inbox_items.filter(post__title="Hello").exists())
+
+    def test_drain_batches_by_node(self):
+        self.node.supportsBatch = True
+        self.node.save()
+        dave = Author.objects.create(user=User.objects.create(username="Dave"), displayName="Dave",
+                                     host="https://remote.example.com/")
+        self.alice.followers.add(dave)
+        self.make_post()
+        with mock.patch("project.federation.NodeClient.post") as post:
+            post.return_value.status_code = 200
+            post.return_value.json.return_value = {"type": "inbox-batch", "items": [{"status": 200}, {"status": 404}]}
+            self.assertEqual(outbox.drain(), 2)
+        post.assert_called_once()
+        self.assertEqual(post.call_args.args[0], "https://remote.example.com/api/inbox/batch")
+        self.assertEqual(len(post.call_args.kwargs["json"]["items"]), 2)
+        statuses = sorted(OutboxItem.objects.values_list("status", flat=True))
+        self.assertEqual(statuses, [OutboxItem.StatusChoice.DELIVERED, OutboxItem.StatusChoice.PENDING])
+
+    def test_drain_malformed_batch_results(self):
+        self.node.supportsBatch = True
+        self.node.save()
+        dave = Author.objects.create(user=User.objects.create(username="Dave"), displayName="Dave",
+                                     host="https://remote.example.com/")
+        self.alice.followers.add(dave)
+        self.make_post()
+        with mock.patch("project.federation.NodeClient.post") as post:
+            post.return_value.status_code = 200
+            post.return_value.json.return_value = {"type": "inbox-batch", "items": ["ok", {"status": "201"}]}
+            self.assertEqual(outbox.drain(), 2)
+        self.assertEqual(set(OutboxItem.objects.values_list("status", "last_error")),
+                         {(OutboxItem.StatusChoice.PENDING, "HTTP 500")})
+
+    def test_drain_batch_fallback(self):
+        self.node.supportsBatch = True
+        self.node.save()
+        dave = Author.objects.create(user=User.objects.create(username="Dave"), displayName="Dave",
+                                     host="https://remote.example.com/")
+        self.alice.followers.add(dave)
+        self.make_post()
+        with mock.patch("project.federation.NodeClient.post") as post:
+            post.return_value.status_code = 404
+            outbox.drain()
+        # One rejected batch request, then one request per item
+        self.assertEqual(post.call_count, 3)
+
+
+class InboxBatchAPITest(APITestCase):
+    url_name = "project:inbox_batch_api"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.node_user = User.objects.create(username="remote-node")
+        Node.objects.create(user=cls.node_user, nodeName="remote", host="https://remote.example.com/")
+        cls.alice, cls.bob = [
+            Author.objects.create(user=User.objects.create(username=name), displayName=name, id=author_id,
+                                  url=f"http://127.0.0.1:8000/authors/{author_id}")
+            for name, author_id in [("Alice", uuid.uuid4()), ("Bob", uuid.uuid4())]
+        ]
+        cls.post = Post.objects.create(author=cls.alice, title="Hello")
+
+    def like_json(self, author):
+        like = PostLike.objects.create(author=author, post=self.post, summary=f"{author} likes this",
+                                       context="http://127.0.0.1:8000/")
+        data = PostLikeSerializer(like).data
+        like.delete()
+        return data
+
+    def test_batch(self):
+        self.client.force_authenticate(user=self.node_user)
+        items = [
+            {"recipient": self.alice.url, "item": self.like_json(self.bob)},
+            {"recipient": str(self.alice.id), "item": self.like_json(self.alice)},
+            {"recipient": "http://127.0.0.1:8000/authors/00000000-0000-0000-0000-000000000000", "item": {}},
+            {"recipient": str(self.alice.id), "item": {"type": "unknown"}},
+            # A list where a URL is expected fails with AttributeError
+            {"recipient": str(self.alice.id), "item": {**self.like_json(self.bob), "object": ["not", "a", "url"]}},
+            "junk",
+        ]
+        resp = self.client.post(reverse(self.url_name), {"type": "inbox-batch", "items": items}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["status"] for result in resp.data["items"]], [201, 201, 404, 400, 400, 400])
+        self.assertEqual(PostLike.objects.filter(post=self.post).count(), 2)
+        self.assertEqual(self.alice.inbox_items.count(), 2)
+
+    def test_batch_requires_node(self):
+        self.client.force_authenticate(user=self.alice.user)
+        resp = self.client.post(reverse(self.url_name), {"items": []}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -11,7 +11,9 @@ Sources:
 https://docs.djangoproject.com/en/4.2/
 """
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
@@ -23,7 +25,7 @@ import json
 from rest_framework.test import APITestCase
 from rest_framework import status
 
-from ..models import Author, Post
+from ..models import Author, Comment, Node, Post
 from ..serializers import AuthorSerializer, PostSerializer
 
 class PostsTest(APITestCase):
@@ -103,6 +105,90 @@ class PostsTest(APITestCase):
         self.assertEqual(resp.data["detail"], "Invalid page.")
         self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_posts_cursor(self):
+        self.client.force_authenticate(user=self.userObj["Alice"])
+        # Posts sharing a publish time are ordered by id
+        published = timezone.now()
+        for i in range(3):
+            Post.objects.create(content=f'post #{i + 3}', published=published, author=self.alice)
+        expected = list(Post.objects.filter(author=self.alice).order_by('published', 'id'))
+
+        url = reverse(self.url_name, args=[self.alice.id])
+        resp = self.client.get(f"{url}?{urlencode({'cursor': '', 'size': 2})}")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsNone(resp.data["prev"])
+        seen = [item["id"] for item in resp.data["items"]]
+        pages = [resp.data]
+        while pages[-1]["next"]:
+            resp = self.client.get(pages[-1]["next"])
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            seen += [item["id"] for item in resp.data["items"]]
+            pages.append(resp.data)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([item_id.split('/')[-1] for item_id in seen], [str(post.id) for post in expected])
+
+        # Going back from the last page returns the middle page
+        resp = self.client.get(pages[-1]["prev"])
+        self.assertEqual(resp.data["items"], pages[1]["items"])
+
+    def test_get_posts_invalid_cursor(self):
+        self.client.force_authenticate(user=self.userObj["Alice"])
+        url = reverse(self.url_name, args=[self.alice.id])
+        resp = self.client.get(f"{url}?cursor=garbage")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_posts_query_count(self):
+        self.client.force_authenticate(user=self.userObj["Alice"])
+        url = reverse(self.url_name, args=[self.alice.id])
+        for post in [self.post1, self.post2]:
+            for i in range(7):
+                Comment.objects.create(author=self.bob, post=post, comment=f"comment {i}")
+        with CaptureQueriesContext(connection) as small_page:
+            resp = self.client.get(url)
+        self.assertEqual([item["count"] for item in resp.data["items"]], [7, 7])
+        self.assertEqual([comment["comment"] for comment in resp.data["items"][0]["commentsSrc"]["comments"]],
+                         [f"comment {i}" for i in range(5)])
+
+        for i in range(10):
+            post = Post.objects.create(author=self.alice, title=f"POST {i + 3}")
+            for j in range(i):
+                Comment.objects.create(author=self.bob, post=post, comment=f"comment {j}")
+        with self.assertNumQueries(len(small_page)):
+            resp = self.client.get(url)
+        self.assertEqual(len(resp.data["items"]), 12)
+        self.assertEqual(resp.data["items"][-1]["count"], 9)
+
+    @override_settings(POST_PREVIEW_LENGTH=10)
+    def test_get_posts_summarized(self):
+        Post.objects.filter(pk=self.post1.pk).update(content="a long post, cut short in lists")
+        url = reverse(self.url_name, args=[self.alice.id])
+        self.client.force_authenticate(user=self.userObj["Bob"])
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get(url)
+        self.assertEqual([(item["content"], item["contentTruncated"]) for item in resp.data["items"]],
+                         [("a long pos", True), ("post #2", False)])
+        # Only the preview is read
+        for query in queries:
+            self.assertEqual(query["sql"].count('"project_post"."content"'), query["sql"].count('SUBSTR("project_post"."content"'))
+
+        # Other nodes get the full posts
+        node = Node.objects.create(user=User.objects.create(username="remote-node"), host="https://remote.example.com/")
+        self.client.force_authenticate(user=node.user)
+        resp = self.client.get(url)
+        self.assertEqual(resp.data["items"][0]["content"], "a long post, cut short in lists")
+        self.assertNotIn("contentTruncated", resp.data["items"][0])
+
+    @override_settings(POST_PREVIEW_LENGTH=10)
+    def test_local_post_list_summarized(self):
+        Post.objects.filter(pk=self.post1.pk).update(content="a long post, cut short in lists")
+        self.client.force_authenticate(user=self.userObj["Alice"])
+        resp = self.client.get(reverse("project:post-list"))
+        self.assertEqual([(item["content"], item["content_truncated"]) for item in resp.data],
+                         [("a long pos", True), ("post #2", False)])
+        resp = self.client.get(reverse("project:post-detail", args=[self.post1.id]))
+        self.assertEqual(resp.data["content"], "a long post, cut short in lists")
+
     def test_invalid_method(self):
         self.client.force_authenticate(user=self.userObj["Alice"])
         url = reverse(self.url_name, args=[self.alice.id])
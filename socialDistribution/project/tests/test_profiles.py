@@ -0,0 +1,139 @@
+"""
+Test module for syncing the posts of remote authors.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APITestCase
+
+from .. import profiles
+from ..models import Author, InboxItem, Node, Post
+
+# Any node is synced, not only the ones the app was first written for
+HOST = "https://new-node.example.com/"
+
+
+def remote_post(author, title, published):
+    post_id = uuid.uuid4()
+    return {"type": "post", "id": f"{HOST}authors/{author.id}/posts/{post_id}", "title": title,
+            "source": HOST, "origin": HOST, "description": "", "contentType": "text/plain", "content": "Hello",
+            "categories": "", "count": 0, "published": published.isoformat(), "visibility": "PUBLIC",
+            "unlisted": False}
+
+
+class ProfileSyncTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Node.objects.create(user=User.objects.create(username="new"), host=HOST, apiURL=f"{HOST}api/")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob", host=HOST)
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.alice.following.add(cls.bob)
+
+    def sync(self, remote_posts):
+        with mock.patch.object(profiles, "fetch_json", return_value=[{"data": remote_posts}]) as self.fetch:
+            return profiles.sync(Author.objects.get(pk=self.bob.pk))
+
+    def test_sync_inserts_new_posts(self):
+        now = timezone.now()
+        listed = [remote_post(self.bob, f"post {i}", now - timedelta(hours=i)) for i in range(3)]
+        self.assertEqual(len(self.sync(listed)), 3)
+        [(client, url)] = self.fetch.call_args.args[0]
+        self.assertEqual(url, f"{HOST}api/authors/{self.bob.id}/posts/")
+        self.assertEqual(Post.objects.filter(author=self.bob).count(), 3)
+        # The signals skipped by bulk_create still fan the posts out to followers
+        self.assertEqual(InboxItem.objects.filter(owner=self.alice).count(), 3)
+
+        bob = Author.objects.get(pk=self.bob.pk)
+        self.assertEqual(bob.postsSyncedUntil, Post.objects.get(title="post 0").published)
+        self.assertFalse(profiles.is_stale(bob))
+
+    def test_fan_out_queries_independent_of_size(self):
+        def queries(count):
+            listed = [remote_post(self.bob, f"post {i}", timezone.now()) for i in range(count)]
+            with CaptureQueriesContext(connection) as captured:
+                self.sync(listed)
+            Post.objects.filter(author=self.bob).delete()
+            Author.objects.filter(pk=self.bob.pk).update(postsSyncedUntil=None)
+            return len(captured)
+        self.assertEqual(queries(1), queries(10))
+
+    def test_sync_is_incremental(self):
+        now = timezone.now()
+        old = [remote_post(self.bob, f"old {i}", now - timedelta(days=i + 1)) for i in range(3)]
+        self.sync(old[:1])
+        Post.objects.filter(author=self.bob).delete()
+        # Only posts published since the watermark are considered, so older ones are not refetched
+        synced = self.sync([remote_post(self.bob, "new", now)] + old)
+        self.assertEqual({post.title for post in synced}, {"new", "old 0"})
+        self.assertEqual(set(Post.objects.filter(author=self.bob).values_list("title", flat=True)), {"new", "old 0"})
+
+    def test_replay_inserts_nothing(self):
+        listed = [remote_post(self.bob, f"post {i}", timezone.now()) for i in range(2)]
+        self.sync(listed)
+        Author.objects.filter(pk=self.bob.pk).update(postsSyncedUntil=None)
+        # Load the author, find the existing ids, read the posts back, and update the watermark
+        with self.assertNumQueries(4):
+            self.sync(listed)
+        self.assertEqual(Post.objects.filter(author=self.bob).count(), 2)
+
+    def test_bad_posts_skipped(self):
+        listed = [remote_post(self.bob, "good", timezone.now()), {"id": "bad"}, "junk",
+                  {**remote_post(self.bob, "no date", timezone.now()), "published": "yesterday"}]
+        self.assertEqual([post.title for post in self.sync(listed)], ["good"])
+
+    def test_unreachable_node(self):
+        with mock.patch.object(profiles, "fetch_json", return_value=[None]):
+            self.assertIsNone(profiles.sync(self.bob))
+        self.assertIsNone(Author.objects.get(pk=self.bob.pk).postsSyncedAt)
+
+
+class ProfileViewSyncTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Node.objects.create(user=User.objects.create(username="new"), host=HOST, apiURL=f"{HOST}api/")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob", host=HOST)
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        Post.objects.create(author=cls.bob, title="Stored", content="Hello")
+
+    def setUp(self):
+        patcher = mock.patch.object(profiles._pool, "submit")
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_authenticate(user=self.alice.user)
+
+    def get(self, author):
+        return self.client.get(reverse("project:profile_api", args=[author.id]))
+
+    def test_serves_local_posts_and_syncs_once(self):
+        for _ in range(3):
+            resp = self.get(self.bob)
+            self.assertEqual([post["title"] for post in resp.data], ["Stored"])
+        self.submit.assert_called_once_with(profiles.sync_in_thread, self.bob.pk)
+
+    def test_sync_claimed_once_across_processes(self):
+        # Copies loaded by different workers before either claimed the sync
+        copies = [Author.objects.get(pk=self.bob.pk) for _ in range(2)]
+        self.assertEqual([profiles.sync_in_background(author) for author in copies], [True, False])
+        self.submit.assert_called_once_with(profiles.sync_in_thread, self.bob.pk)
+
+    def test_fresh_and_local_authors_not_synced(self):
+        Author.objects.filter(pk=self.bob.pk).update(postsSyncedAt=timezone.now())
+        self.get(self.bob)
+        self.get(self.alice)
+        self.submit.assert_not_called()
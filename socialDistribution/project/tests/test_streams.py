@@ -0,0 +1,260 @@
+"""
+Test module for adding posts to author streams.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/testing/tools/#django.test.TestCase.captureOnCommitCallbacks
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import Author, Comment, Follow, FollowRequest, InboxItem, Notification, Post, PostLike
+from ..serializers import CommentSerializer
+from ..streams import add_to_inbox, pulled_follows, stream_posts
+from ..utils import send_to_inbox
+
+
+class StreamFanOutTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.followers = []
+        for i in range(20):
+            follower = Author.objects.create(user=User.objects.create(username=f"follower{i}"),
+                                             displayName=f"follower{i}")
+            cls.alice.followers.add(follower)
+            cls.followers.append(follower)
+
+    def test_post_added_to_follower_streams(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=self.alice, title="Hello")
+        for follower in self.followers:
+            self.assertTrue(follower.inbox_items.filter(post=post).exists())
+        self.assertFalse(self.alice.inbox_items.exists())
+
+    def test_streams_updated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            post = Post.objects.create(author=self.alice, title="Hello")
+        self.assertFalse(post.inboxitem_set.exists())
+        self.assertEqual(len(callbacks), 1)
+
+    def test_fan_out_query_count_independent_of_followers(self):
+        # one INSERT for the post, one check of the follower counter, one SELECT of
+        # follower ids, and one bulk INSERT of inbox items
+        with self.assertNumQueries(4):
+            with self.captureOnCommitCallbacks(execute=True):
+                Post.objects.create(author=self.alice, title="Hello")
+
+    def test_unlisted_post_not_added(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.alice, title="Hello", unlisted=True)
+        self.assertFalse(InboxItem.objects.exists())
+
+    def test_private_post_added_to_reciever(self):
+        reciever = self.followers[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(author=self.alice, title="Hello", visibility=Post.VisibilityChoice.PRIVATE,
+                                       private_reciever=reciever)
+        self.assertEqual([item.owner for item in post.inboxitem_set.all()], [reciever])
+
+
+class HybridStreamTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.carl = Author.objects.create(user=User.objects.create(username="Carl"), displayName="Carl")
+        cls.alice.followers.add(cls.bob, cls.carl)
+        cls.carl.followers.add(cls.bob)
+        # The posts made by the tests are backdated, so the follows must be older still
+        Follow.objects.update(followed_at=timezone.now() - timedelta(days=1))
+
+    def make_posts(self):
+        """Create posts of every visibility by Alice and Carl, interleaved in time."""
+        now = timezone.now()
+        options = [
+            {"visibility": Post.VisibilityChoice.PUBLIC},
+            {"visibility": Post.VisibilityChoice.FRIENDS_ONLY},
+            {"visibility": Post.VisibilityChoice.PUBLIC, "unlisted": True},
+            {"visibility": Post.VisibilityChoice.PRIVATE, "private_reciever": self.bob},
+            {"visibility": Post.VisibilityChoice.PRIVATE, "private_reciever": self.carl},
+        ]
+        i = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            for author in [self.alice, self.carl]:
+                for option in options:
+                    Post.objects.create(author=author, title=f"post {i}", published=now - timedelta(minutes=i),
+                                        **option)
+                    i += 1
+
+    def get_streams(self):
+        return [list(stream_posts(author)) for author in [self.alice, self.bob, self.carl]]
+
+    def test_hybrid_stream_matches_pushed_stream(self):
+        self.make_posts()
+        pushed = self.get_streams()
+        with override_settings(STREAM_FANOUT_FOLLOWER_LIMIT=1):
+            # Alice is now above the limit; her pushed rows are removed
+            InboxItem.objects.filter(post__author=self.alice,
+                                     post__visibility__in=["PUBLIC", "FRIENDS_ONLY"]).delete()
+            hybrid = self.get_streams()
+        self.assertEqual(pushed, hybrid)
+        self.assertEqual([post.title for post in pushed[1]], ["post 0", "post 1", "post 3", "post 5", "post 6", "post 8"])
+
+    @override_settings(STREAM_FANOUT_FOLLOWER_LIMIT=1)
+    def test_popular_author_not_fanned_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            alice_post = Post.objects.create(author=self.alice, title="Alice")
+            carl_post = Post.objects.create(author=self.carl, title="Carl")
+        self.assertFalse(alice_post.inboxitem_set.exists())
+        self.assertEqual([item.owner for item in carl_post.inboxitem_set.all()], [self.bob])
+        self.assertEqual(set(stream_posts(self.bob)), {alice_post, carl_post})
+
+
+    def test_pulled_follows_read_from_counter(self):
+        with override_settings(STREAM_FANOUT_FOLLOWER_LIMIT=1):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual([follow.to_author for follow in pulled_follows(self.bob)], [self.alice])
+        self.assertNotIn("GROUP BY", queries[0]["sql"])
+
+    @override_settings(STREAM_FANOUT_FOLLOWER_LIMIT=1)
+    def test_backfill_when_dropping_under_limit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pulled_post = Post.objects.create(author=self.alice, title="Pulled")
+            Post.objects.create(author=self.alice, title="Unlisted", unlisted=True)
+        self.assertFalse(pulled_post.inboxitem_set.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.followers.remove(self.carl)
+        self.assertEqual([item.owner for item in pulled_post.inboxitem_set.all()], [self.bob])
+        self.assertEqual([post.title for post in stream_posts(self.bob)], ["Pulled"])
+
+    @override_settings(STREAM_FANOUT_FOLLOWER_LIMIT=1)
+    def test_only_posts_since_follow_pulled_or_backfilled(self):
+        Follow.objects.filter(from_author=self.bob).update(followed_at=timezone.now())
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.alice, title="Before", published=timezone.now() - timedelta(hours=1))
+            Post.objects.create(author=self.alice, title="After")
+        self.assertEqual([post.title for post in stream_posts(self.bob)], ["After"])
+        # Carl followed a day ago, so both posts are backfilled to Carl once Alice is pushed again
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.followers.remove(self.bob)
+        self.assertEqual([post.title for post in stream_posts(self.carl)], ["After", "Before"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.followers.add(self.bob)
+            self.alice.followers.remove(self.carl)
+        self.assertEqual([post.title for post in stream_posts(self.bob)], [])
+
+
+class InboxItemTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.alice.followers.add(cls.bob)
+
+    def test_stream_ordered_by_index(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in [2, 0, 1]:
+                Post.objects.create(author=self.alice, title=f"post {i}", published=now - timedelta(minutes=i))
+        self.assertEqual([post.title for post in stream_posts(self.bob)], ["post 0", "post 1", "post 2"])
+
+    def test_inbox_records_other_kinds(self):
+        post = Post.objects.create(author=self.alice, title="Hello")
+        comment = Comment.objects.create(author=self.bob, post=post, comment="Nice")
+        like = PostLike.objects.create(author=self.bob, post=post, summary="Bob likes this")
+        follow_request = FollowRequest.objects.create(follower=self.bob, following=self.alice, summary="")
+        for obj in [comment, like, follow_request]:
+            add_to_inbox(self.alice, obj)
+        kinds = list(self.alice.inbox_items.order_by("received_at").values_list("kind", flat=True))
+        self.assertEqual(kinds, ["comment", "Like", "Follow"])
+        self.assertFalse(stream_posts(self.alice).exists())
+
+    def test_local_comment_notifies_only(self):
+        post = Post.objects.create(author=self.alice, title="Hello")
+        comment = Comment.objects.create(author=self.bob, post=post, comment="Nice")
+        notification = {"author": self.alice, "message": "Bob commented on your post", "link": "http://example.com/"}
+        send_to_inbox(comment, self.alice, CommentSerializer, notification)
+        self.assertEqual(list(Notification.objects.values_list("message", flat=True)), ["Bob commented on your post"])
+        self.assertFalse(self.alice.inbox_items.exists())
+
+    def test_add_post_twice(self):
+        post = Post.objects.create(author=self.alice, title="Hello")
+        add_to_inbox(self.bob, post)
+        add_to_inbox(self.bob, post)
+        self.assertEqual(self.bob.inbox_items.count(), 1)
+
+
+class InboxAPICursorTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.alice.followers.add(cls.bob)
+
+    def test_inbox_cursor_pages(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                Post.objects.create(author=self.alice, title=f"post {i}", published=now - timedelta(minutes=i))
+        self.client.force_authenticate(user=self.bob.user)
+        url = reverse("project:inbox_api", args=[self.bob.id])
+
+        resp = self.client.get(url, {"cursor": "", "size": 3})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["post 0", "post 1", "post 2"])
+        resp = self.client.get(resp.data["next"])
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["post 3", "post 4"])
+        self.assertIsNone(resp.data["next"])
+
+        # Page numbers still work without a cursor
+        resp = self.client.get(url, {"page": 2, "size": 3})
+        self.assertEqual([item["title"] for item in resp.data["items"]], ["post 3", "post 4"])
+
+    def test_inbox_serves_every_kind_in_order(self):
+        now = timezone.now()
+        post = Post.objects.create(author=self.bob, title="Mine", published=now - timedelta(minutes=5))
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.alice, title="Hello", published=now - timedelta(minutes=4))
+        for obj in [Comment.objects.create(author=self.alice, post=post, comment="Nice"),
+                    PostLike.objects.create(author=self.alice, post=post, summary="Alice likes your post"),
+                    FollowRequest.objects.create(follower=self.alice, following=self.bob, summary="")]:
+            add_to_inbox(self.bob, obj)
+        self.client.force_authenticate(user=self.bob.user)
+        url = reverse("project:inbox_api", args=[self.bob.id])
+        for params in [{}, {"cursor": ""}]:
+            resp = self.client.get(url, params)
+            self.assertEqual([item["type"] for item in resp.data["items"]], ["Follow", "Like", "comment", "post"])
+
+    @override_settings(STREAM_FANOUT_FOLLOWER_LIMIT=0)
+    def test_inbox_merges_pulled_posts(self):
+        now = timezone.now()
+        Follow.objects.update(followed_at=now - timedelta(days=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(4):
+                Post.objects.create(author=self.alice, title=f"post {i}", published=now - timedelta(minutes=2 * i))
+        add_to_inbox(self.bob, FollowRequest.objects.create(follower=self.alice, following=self.bob, summary=""))
+        InboxItem.objects.filter(kind="Follow").update(received_at=now - timedelta(minutes=3))
+        self.client.force_authenticate(user=self.bob.user)
+        url = reverse("project:inbox_api", args=[self.bob.id])
+        resp = self.client.get(url, {"cursor": "", "size": 3})
+        self.assertEqual([item.get("title", item["type"]) for item in resp.data["items"]], ["post 0", "post 1", "Follow"])
+        resp = self.client.get(resp.data["next"])
+        self.assertEqual([item.get("title", item["type"]) for item in resp.data["items"]], ["post 2", "post 3"])
+        resp = self.client.get(url, {"page": 2, "size": 3})
+        self.assertEqual([item.get("title", item["type"]) for item in resp.data["items"]], ["post 2", "post 3"])
@@ -0,0 +1,67 @@
+"""
+Test module for the post and comment visibility rules.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from ..models import Author, Comment, Post
+from ..visibility import Viewer
+
+
+class VisibilityTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Author.objects.create(user=User.objects.create(username="Alice"), displayName="Alice")
+        cls.bob = Author.objects.create(user=User.objects.create(username="Bob"), displayName="Bob")
+        cls.carl = Author.objects.create(user=User.objects.create(username="Carl"), displayName="Carl")
+        cls.alice.followers.add(cls.bob)
+        cls.posts = {
+            "public": Post.objects.create(author=cls.alice, title="public"),
+            "friends": Post.objects.create(author=cls.alice, title="friends",
+                                           visibility=Post.VisibilityChoice.FRIENDS_ONLY),
+            "private": Post.objects.create(author=cls.alice, title="private", visibility=Post.VisibilityChoice.PRIVATE,
+                                           private_reciever=cls.carl),
+            "unlisted": Post.objects.create(author=cls.alice, title="unlisted", unlisted=True),
+        }
+
+    def visible_titles(self, author):
+        return {post.title for post in Viewer(author).visible_posts(Post.objects.all())}
+
+    def test_visible_posts(self):
+        self.assertEqual(self.visible_titles(self.alice), {"public", "friends", "private", "unlisted"})
+        self.assertEqual(self.visible_titles(self.bob), {"public", "friends", "unlisted"})
+        self.assertEqual(self.visible_titles(self.carl), {"public", "private", "unlisted"})
+        self.assertEqual(self.visible_titles(None), {"public", "unlisted"})
+
+    def test_can_see_matches_filter(self):
+        posts = list(Post.objects.all())
+        for author in [self.alice, self.bob, self.carl, None]:
+            viewer = Viewer(author)
+            self.assertEqual({post.title for post in posts if viewer.can_see(post)}, self.visible_titles(author))
+
+    def test_can_see_loads_following_once(self):
+        posts = list(Post.objects.all()) * 10
+        viewer = Viewer(self.bob)
+        with self.assertNumQueries(1):
+            self.assertEqual(sum(viewer.can_see(post) for post in posts), 30)
+
+    def test_listed_only(self):
+        titles = {post.title for post in Viewer(self.bob).visible_posts(Post.objects.all(), listed_only=True)}
+        self.assertEqual(titles, {"public", "friends"})
+
+    def test_visible_comments(self):
+        post = self.posts["friends"]
+        for author in [self.alice, self.bob, self.carl]:
+            Comment.objects.create(author=author, post=post, comment=author.displayName)
+        comments = post.comment_set.all()
+        self.assertEqual(Viewer(self.alice).visible_comments(post, comments).count(), 3)
+        self.assertEqual([c.comment for c in Viewer(self.bob).visible_comments(post, comments)], ["Bob"])
+        self.assertFalse(Viewer(None).visible_comments(post, comments).exists())
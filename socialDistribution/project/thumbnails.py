@@ -0,0 +1,91 @@
+"""
+Module containing the resized variants of stored images.
+
+Streams and profiles show images far smaller than most uploads, so every
+stored image can also be served at the fixed widths in IMAGE_VARIANT_WIDTHS.
+A variant is made the first time it is requested and kept on disk next to
+its original, e.g. BLOB_ROOT/ab/cd/<sha256>-320. Images no wider than a
+variant are served as they are; images are never scaled up.
+
+Serializers expose the variant URLs of image posts (and of avatars stored
+here) so clients can pick one with srcset.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://pillow.readthedocs.io/en/stable/reference/Image.html#PIL.Image.Image.thumbnail
+"""
+
+import io
+import os
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from PIL import Image
+
+from .blobs import blob_path, blob_reference, parse_reference, write_file
+
+FORMATS = {"image/png": "PNG", "image/jpeg": "JPEG"}
+
+
+def resize(data_file, width, mime):
+    """Resize an image to `width`, keeping its aspect ratio.
+
+    Returns the encoded bytes, or None if the image is already no wider than
+    `width`. Raises OSError if the image cannot be decoded.
+    """
+    with Image.open(data_file) as image:
+        if image.width <= width:
+            return None
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA" if mime == "image/png" else "RGB")
+        # thumbnail() lets the JPEG decoder downscale while decoding
+        image.thumbnail((width, image.height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if mime == "image/jpeg":
+            image.save(buffer, "JPEG", quality=85, optimize=True)
+        else:
+            image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def variant_path(digest, width, mime):
+    """Get the file of a stored image at a variant width, making it on first use.
+
+    Returns the original's path if the image is too narrow to shrink or cannot
+    be decoded. Raises FileNotFoundError if the image is not stored.
+    """
+    original = blob_path(digest)
+    path = f"{original}-{width}"
+    if os.path.exists(path):
+        return path
+    with open(original, "rb") as f:
+        try:
+            data = resize(f, width, mime)
+        except (OSError, Image.DecompressionBombError):
+            return original
+    if data is None:
+        return original
+    write_file(path, data)
+    return path
+
+
+def variant_urls(url):
+    """Map each variant width to the URL of that variant of a stored image.
+
+    Parameters:
+        url - a blob reference, or an absolute URL of one
+    Returns an empty dict for anything that is not a stored image.
+    """
+    parts = urlsplit(url or "")
+    parsed = parse_reference(parts.path)
+    if parsed is None or (parts.scheme and parts.scheme not in ("http", "https")):
+        return {}
+    digest, mime = parsed
+    return {
+        str(width): urlunsplit(parts._replace(path=blob_reference(digest, mime, width)))
+        for width in settings.IMAGE_VARIANT_WIDTHS
+    }
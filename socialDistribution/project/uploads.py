@@ -0,0 +1,46 @@
+"""
+Module containing the upload handler for image uploads.
+
+Uploaded files are always streamed to a temporary file on disk, never held
+in memory, and are hashed chunk by chunk as they arrive so they can be moved
+into the blob store without being read again. Files larger than
+UPLOAD_MAX_BYTES are dropped as soon as they pass the limit; the rest of the
+request body is read and discarded without being stored.
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/ref/files/uploads/#custom-upload-handlers
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk, computing their SHA-256 and enforcing UPLOAD_MAX_BYTES.
+
+    The uploaded file gets a sha256 attribute with the hex digest of its bytes.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.UPLOAD_MAX_BYTES:
+            raise SkipFile
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        return file
@@ -77,6 +77,7 @@ urlpatterns = [
   path('api/authors/<str:pk>/posts/<str:post_id>', views.SinglePostApiView.as_view(), name='single_post_api'),
   # Inbox API
   path('api/authors/<str:pk>/inbox', views.InboxAPIView.as_view(), name='inbox_api'),
+  path('api/inbox/batch', views.InboxBatchAPIView.as_view(), name='inbox_batch_api'),
   # Node API
   path('api/nodes/', views.NodeAPIView.as_view(), name='node_api'),
 
@@ -113,6 +114,7 @@ urlpatterns = [
   # Notifications API
   path('api/authors/<str:author_id>/notifications', views.NotificationAPIView.as_view(), name="notifications_api"),
   
+  path('api/blobs/<str:name>', views.blob_view, name="blob"),
   path('api/search', views.SearchAuthors.as_view(), name="search_authors"),
   path('api/authors/<str:pk>/profile', views.ProfileAPIView.as_view(), name="profile_api"),
   path('api/authors/<str:author_id>/posts/<str:post_id>/create_comment', views.AddCommentView.as_view(), name="create_comment")
@@ -1,38 +1,63 @@
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
 from project.models import *
 from project.serializers import PostSerializer
+from project import outbox
+from project.directory import ingest_remote_authors, remote_author_id
+from project.engagement import ingest_remote_comment_likes, ingest_remote_comments, ingest_remote_post_likes
+from project.profiles import ingest_remote_posts
+from project.federation import fetch_json, get_client
+from project.nodes import node_for
+from project.streams import add_to_inbox
 
 import requests
 
 
-def update_followers(author):
-    for fr in FollowRequest.objects.filter(follower=author):
-        following = fr.following
-        node = Node.objects.filter(host=following.host)
-        if node.count():
-            node = node.first()
-            url = f"{node.apiURL}/authors/{following.id}/followers/{author.id}"
-            auth = (node.nodeName, node.nodeCred)
-            resp = requests.get(url, auth=auth)
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get('isFollower', True) and data:
-                    fr.delete()
-                    author.following.add(following)
+def update_followers(author=None):
+    """Turn follow requests to remote authors that have been accepted into follows.
+
+    The nodes of the followed authors are asked concurrently. This runs in the
+    deliver_outbox worker, never while a user waits.
+
+    Parameters:
+        author - only check the requests sent by this author; all requests if None
+    Returns the number of follow requests that were accepted.
+    """
+    follow_requests = FollowRequest.objects.filter(following__node__isnull=False).select_related("follower", "following")
+    if author is not None:
+        follow_requests = follow_requests.filter(follower=author)
+    checks = []
+    for fr in follow_requests:
+        node = node_for(fr.following)
+        if node is not None:
+            checks.append((fr, get_client(node), f"{node.apiURL}authors/{fr.following.id}/followers/{fr.follower.id}"))
+    if not checks:
+        return 0
+
+    deadline = settings.NODE_CLIENT_CONNECT_TIMEOUT + settings.NODE_CLIENT_READ_TIMEOUT
+    accepted = 0
+    for (fr, client, url), data in zip(checks, fetch_json([(client, url) for fr, client, url in checks], deadline)):
+        if isinstance(data, dict) and data and data.get('isFollower', True):
+            fr.delete()
+            fr.follower.following.add(fr.following)
+            accepted += 1
+    return accepted
 
 
 def create_local_post(author_id, post_id):
     author = get_object_or_404(Author, pk=author_id)
-    # TODO: Bad url construction
-    if "im-a-teapot" in author.host:
-        auth = ("teapot", "rooibos")
-        url = f"https://im-a-teapot-41db2c906820.herokuapp.com/authors/{author.pk}/posts/{post_id}"
-    elif "silk-cmput404" in author.host:
-        auth = ("restlessclients", "django100")
-        url = f"https://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{author.pk}/posts/{post_id}"
-    
-    resp = requests.get(url, auth=auth)
+    node = node_for(author)
+    if node is None:
+        return None
+    client = get_client(node)
+    url = f"{node.apiURL}authors/{author.pk}/posts/{post_id}"
+
+    try:
+        resp = client.get(url)
+    except requests.RequestException:
+        return None
     serializer = PostSerializer(data=resp.json())
     if serializer.is_valid():
         return serializer.save()
@@ -40,156 +65,63 @@ def create_local_post(author_id, post_id):
 
 
 def send_to_inbox(obj, recipient, serializer, notification=None):
+    """Deliver an object to an author's inbox.
+
+    Local recipients are updated immediately. Deliveries to remote recipients
+    are queued in the outbox and sent by the deliver_outbox command.
+    """
+    if node_for(recipient) is not None:
+        return outbox.enqueue(obj, recipient, serializer)
+
     data = serializer(instance=obj).data
-    # Fix using host as foreign key to node
-    node = Node.objects.filter(host=recipient.host)
-    if node.count():
-        node = node.first()
-        url = f"{node.apiURL}authors/{recipient.id}/inbox"
-        auth = (node.nodeName, node.nodeCred)
-        resp = requests.post(url,json=data, auth=auth)
+    # Local authors are notified of comments instead of getting them in their inbox
+    if notification is None:
+        add_to_inbox(recipient, obj)
     else:
-        # Would need to check type anyway
-        if notification is None:
-            recipient.streamPosts.add(obj)
-        else:
-            Notification.objects.create(**notification)
+        Notification.objects.create(**notification)
     return data
 
 
 def create_post(post_dict, recipient=None):
-    post = Post.objects.create(**post_dict)
-    update_followers(post.author)
-    if post.visibility != Post.VisibilityChoice.PRIVATE:
-        for follower in post.author.followers.all():
-            send_to_inbox(post, follower, PostSerializer)
-    elif recipient is not None:
-        send_to_inbox(post, recipient, PostSerializer)
+    """Create a post and send it to the inboxes of its audience.
+
+    The post and its queued remote deliveries are committed together.
+    """
+    with transaction.atomic():
+        post = Post.objects.create(**post_dict)
+        if post.visibility != Post.VisibilityChoice.PRIVATE:
+            # Local followers are handled in bulk by the on_post_create signal
+            for follower in post.author.followers.filter(node__isnull=False):
+                send_to_inbox(post, follower, PostSerializer)
+        elif recipient is not None:
+            send_to_inbox(post, recipient, PostSerializer)
     return post
 
 
 def addOrGetRemoteAuthor(remoteAuthor):
-    if remoteAuthor["host"]=="https://im-a-teapot-41db2c906820.herokuapp.com/":
-        index = 5
-    elif remoteAuthor["host"]=="https://silk-cmput404-project-21e5c91727a7.herokuapp.com":
-        index = 5
-    elif remoteAuthor["host"]=="https://restlessclients-7b4ebf6b9382.herokuapp.com/":
-        index = 4
-        # remoteAuthor["host"]="https://im-a-teapot-41db2c906820.herokuapp.com/"
-        # index = 5
-    else:
-        index = 4
-    if remoteAuthor["id"][-1] != '/':
-        index = -1
-    else:
-        index = -2
-    # print(remoteAuthor)
-    author_id = remoteAuthor["id"].split('/')[index]
-    query = Author.objects.filter(pk=author_id)
-    # print("p1", remoteAuthor)
-    if query.count() == 0:
-        user = User.objects.create_user(username=author_id, password="inactive")
-        user.is_active = False # This user should remain inactive
-        user.save()
-        # print("p2", remoteAuthor)
-
-        if (remoteAuthor["profileImage"] is None):
-            # TODO: change the default value / avoid hardcoding
-            # We don't want to allow null values
-            remoteAuthor["profileImage"] = "https://clipart-library.com/img/1331574.jpg" # "https://i.imgur.com/k7XVwpB.jpeg"
-        
-        author = Author.objects.create(user=user, id=author_id,  url=remoteAuthor["url"],
-                host=remoteAuthor["host"], displayName = remoteAuthor["displayName"], github=remoteAuthor["github"],
-                profileImage=remoteAuthor["profileImage"])
-        return author.save()
-    return query.first()
+    """Get the local copy of a remote author, creating it if it does not exist"""
+    return ingest_remote_authors([remoteAuthor])[remote_author_id(remoteAuthor)]
 
 
 def addOrGetRemotePost(remotePost, author):
     """Fetch a remote post if it does not exist"""
-    if remotePost['id'][-1] == '/':
-        ind = -2
-    else:
-        ind = -1
-    query = Post.objects.filter(pk=remotePost["id"].split("/")[ind])
-
-    if (remotePost["content"] is None):
-            # We don't want to allow null values
-            remotePost["content"] = " "
-
-    if query.count() == 0:
-        remotePost = Post.objects.create(author=author, title=remotePost["title"],
-                id=remotePost["id"].split("/")[ind], source=remotePost["source"], origin=remotePost["origin"],
-                description=remotePost["description"], contentType=remotePost["contentType"],
-                content=remotePost["content"], categories=remotePost["categories"],
-                count=remotePost["count"], published=remotePost["published"],
-                visibility=remotePost["visibility"], unlisted=remotePost["unlisted"]
-        )
-        return remotePost.save()
-    return query.first()
+    posts = ingest_remote_posts(author, [remotePost])
+    return next(iter(posts.values()), None)
 
 
 def addOrGetRemoteComment(remoteComment, post):
     """Fetch a remote comment if it does not exist"""
-    try:
-        if remoteComment['id'][-1] == '/':
-            ind = -2
-        else:
-            ind = -1
-    except:
-        print("bad data: ignored")
-        return
-    query = Comment.objects.filter(pk=remoteComment["id"].split("/")[ind])
-    if query.count() == 0:
-        # The author might not exist yet
-        author = addOrGetRemoteAuthor(remoteComment['author'])
-
-        remoteComment = Comment.objects.create(author=author, post=post,
-                comment=remoteComment["comment"], contentType=remoteComment["contentType"],
-                id=remoteComment["id"].split("/")[ind], published=remoteComment["published"]
-        )
-        return remoteComment.save()
-    return query.first()
+    comments = ingest_remote_comments(post, [remoteComment])
+    return next(iter(comments.values()), None)
 
 
 def addOrGetRemotePostLike(remotePostLike, post):
     """Fetch a remote post like if it does not exist"""
-    # Since we do not have access to the postLike's ID, use the summary to check for existance
-    query = PostLike.objects.filter(summary=remotePostLike["summary"])
-
-    if query.count() == 0:
-        author = addOrGetRemoteAuthor(remotePostLike['author'])
-
-        # Catch badly formatted fields:
-        if not("summary" in remotePostLike):
-            remotePostLike["summary"] = str(author.displayName) + " likes this"
-        if not("context" in remotePostLike):
-            remotePostLike["context"] = "http://127.0.0.1:8000/"
-
-        remotePostLike = PostLike.objects.create(author=author, post=post,
-                summary=remotePostLike["summary"], context=remotePostLike["context"]#,
-        )
-        return remotePostLike.save()
-    return query.first()
+    likes = ingest_remote_post_likes(post, [remotePostLike])
+    return next(iter(likes.values()), None)
 
 
 def addOrGetRemoteCommentLike(remoteCommentLike, comment):
     """Fetch a remote comment like if it does not exist"""
-
-    # Since we do not have access to the commentLike's ID, use the summary to check for existance
-    query = CommentLike.objects.filter(summary=remoteCommentLike["summary"])
-
-    if query.count() == 0:
-        author = addOrGetRemoteAuthor(remoteCommentLike['author'])
-
-        # Catch badly formatted fields:
-        if not("summary" in remoteCommentLike):
-            remoteCommentLike["summary"] = str(author.displayName) + " likes this"
-        if not("context" in remoteCommentLike):
-            remoteCommentLike["context"] = "http://127.0.0.1:8000/"
-
-        remoteCommentLike = CommentLike.objects.create(author=author, comment=comment,
-                summary=remoteCommentLike["summary"], context=remoteCommentLike["context"]
-        )
-        return remoteCommentLike.save()
-    return query.first()
\ No newline at end of file
+    likes = ingest_remote_comment_likes(comment, [remoteCommentLike])
+    return next(iter(likes.values()), None)
\ No newline at end of file
@@ -2,6 +2,7 @@ from typing import Any
 from django.db import models
 from django.db.models.query import QuerySet
 from django.db.models import Q
+from django.db.models.functions import Upper
 from django.http import HttpResponse
 from django.shortcuts import render
 from django.views import generic
@@ -28,7 +29,6 @@ https://docs.djangoproject.com/en/4.2/ref/class-based-views/generic-editing/#dja
 from django.contrib.auth.models import User
 
 
-import base64
 import json
 
 from django.shortcuts import render
@@ -45,7 +45,9 @@ from django.contrib import messages
 from django.contrib.auth.models import User
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
 
 from rest_framework import status
 from rest_framework.decorators import api_view
@@ -60,11 +62,23 @@ from datetime import datetime
 from operator import itemgetter
 
 from .serializers import PostSerializer, AuthorSerializer, NodeSerializer, FollowRequestSerializer, \
-    CommentLikeSerializer, CommentSerializer, PostLikeSerializer, UserSignUpSerializer, NotificationSerializer
+    CommentLikeSerializer, CommentSerializer, PostLikeSerializer, UserSignUpSerializer, NotificationSerializer, \
+    serialize_inbox
 from .models import Author, CommentLike, Post, Comment, PostLike, FollowRequest, Node, Notification
 from .forms import AuthorCreationForm, EditProfileForm, CreatePostForm, EditPostForm
-from .pagination import CommentPagination, AuthorPagination, PostPagination, InboxPagination
+from .pagination import CommentPagination, AuthorPagination, AuthorSearchPagination, PostPagination, InboxPagination
 from .utils import *
+from .streams import add_to_inbox, inbox_sources, stream_posts
+from .directory import ingest_remote_authors
+from .engagement import refresh_in_background
+from .profiles import sync_in_background
+from .federation import client_for
+from .nodes import node_for
+from .visibility import viewer_for
+from .identity import identity_for
+from . import inbound
+from .blobs import BLOB_NAME, MIME_TYPES, blob_path, blob_reference, store_upload
+from .thumbnails import variant_path
 
 
 class AuthorView(generic.DetailView):
@@ -82,56 +96,14 @@ class PostView(UserPassesTestMixin, generic.DetailView):
     template_name = 'project/post.html'
     model = Post
 
-    # TODO delete prints
     def test_func(self):
         post = self.get_object()
-        user = self.request.user.author
-
-        if post.visibility == Post.VisibilityChoice.FRIENDS_ONLY:
-            print("accessing friends post")
-            return post.author == user or user in post.author.followers.all()
-        elif post.visibility == Post.VisibilityChoice.PRIVATE:
-            print("accessing private post")
-            return post.author == user or post.private_reciever == user
-        elif post.visibility == Post.VisibilityChoice.PUBLIC:
-            print("accessing public post")
-            return True
-        else:
-            raise Exception("Post has invalid visibility option")
+        return viewer_for(self.request).can_see(post)
 
     def get_object(self):
         post = get_object_or_404(Post, id=self.kwargs["pk"], author=self.kwargs["author_id"]) # Ensure the post belongs to this author
-        pkvalue = self.kwargs['pk']
-        aivalue = self.kwargs["author_id"]
-        postLikesList = []
-
-        if post.visibility != "PUBLIC":
-            return post
-        # otherwise try to fetch the comments on the public post
-        elif post.author.host=="https://im-a-teapot-41db2c906820.herokuapp.com/":
-            response = requests.get(f"https://im-a-teapot-41db2c906820.herokuapp.com/api/authors/{aivalue}/posts/{pkvalue}/comments", auth=("teapot", "rooibos"))
-            commentsList = response.json()["comments"]
-            # response2 = requests.get(f"https://im-a-teapot-41db2c906820.herokuapp.com/api/authors/{aivalue}/posts/{pkvalue}/likes/", auth=("teapot", "rooibos"))
-            # postLikesList = response2.json()["likes"]
-
-        elif post.author.host=="https://silk-cmput404-project-21e5c91727a7.herokuapp.com":
-            response = requests.get(f"http://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{aivalue}/posts/{pkvalue}/comments", auth=("RESTless Clients", "RESTlessClients1!"))
-            commentsList = response.json()["comments"]
-            response2 = requests.get(f"https://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{aivalue}/posts/{pkvalue}/likes", auth=("RESTless Clients", "RESTlessClients1!"))
-            postLikesList = response2.json()["items"]
-
-        elif post.author.host=="https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/":
-            response = requests.get(f"https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/authors/{aivalue}/posts/{pkvalue}/comments", auth=("cross-server", "password"))
-            commentsList = response.json()["items"]
-            # response2 = requests.get(f"https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/authors/{aivalue}/posts/{pkvalue}/likes", auth=("cross-server", "password"))
-            # postLikesList = response2.json()["items"]
-
-        else:
-            return post
-        for comment in commentsList:
-            addOrGetRemoteComment(comment, post)
-        for like in postLikesList:
-            addOrGetRemotePostLike(like, post)
+        # Serve the comments and likes we have; stale ones of remote posts are refetched in the background
+        refresh_in_background(post)
         return post
 
 
@@ -145,7 +117,7 @@ class StreamView(generic.ListView):
 
     def get_queryset(self):
         self.author = get_object_or_404(Author, displayName=self.kwargs["username"])
-        return self.author.streamPosts.order_by("-published")
+        return stream_posts(self.author)
 
 
 def stream_view(request):
@@ -157,27 +129,11 @@ class ProfileAPIView(ListAPIView):
 
     def get_queryset(self):
         author = get_object_or_404(Author, pk=self.kwargs['pk'])
-        pkvalue = self.kwargs['pk']
-        postsList = []
-
-        if author.host=="https://im-a-teapot-41db2c906820.herokuapp.com/":
-            response = requests.get(f"https://im-a-teapot-41db2c906820.herokuapp.com/api/authors/{pkvalue}/posts/", auth=("teapot", "rooibos"))
-            postsList = response.json()["items"]
-        elif author.host=="https://silk-cmput404-project-21e5c91727a7.herokuapp.com":
-            response = requests.get(f"http://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{pkvalue}/posts/", auth=("RESTless Clients", "RESTlessClients1!"))
-            try:
-                postsList = response.json()["data"]
-            except:
-                print("bad data, ignored")
-        elif author.host=="https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/":
-            response = requests.get(f"https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/authors/{pkvalue}/posts/", auth=("cross-server", "password"))
-            postsList = response.json()["items"]
-
-        for post in postsList:
-            addOrGetRemotePost(post, author)
-        
+        # Serve the posts we have; a remote author's new posts are fetched in the background
+        sync_in_background(author)
+
         query = author.post_set.all().order_by('-published')
-        return query
+        return PostSerializer.prefetch(query, summary=True)
 
 class ProfileView(generic.DetailView):
     """Display an author's profile"""
@@ -186,26 +142,8 @@ class ProfileView(generic.DetailView):
 
     def get_object(self):
         author = get_object_or_404(Author, pk=self.kwargs['pk'])
-        pkvalue = self.kwargs['pk']
-        postsList = []
-
-        if author.host=="https://im-a-teapot-41db2c906820.herokuapp.com/":
-            response = requests.get(f"https://im-a-teapot-41db2c906820.herokuapp.com/api/authors/{pkvalue}/posts/", auth=("teapot", "rooibos"))
-            postsList = response.json()["items"]
-        elif author.host=="https://silk-cmput404-project-21e5c91727a7.herokuapp.com":
-            response = requests.get(f"http://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{pkvalue}/posts/", auth=("RESTless Clients", "RESTlessClients1!"))
-            try:
-                postsList = response.json()["data"]
-            except:
-                print("bad data, ignored")
-        elif author.host=="https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/":
-            response = requests.get(f"https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/authors/{pkvalue}/posts/", auth=("cross-server", "password"))
-            postsList = response.json()["items"]
-        else:
-            return author
-
-        for post in postsList:
-            addOrGetRemotePost(post, author)
+        # Serve the posts we have; a remote author's new posts are fetched in the background
+        sync_in_background(author)
         return author
 
 
@@ -252,12 +190,11 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         form.instance.contentType = form.cleaned_data['contentType']
         
 
-        if form.instance.contentType == 'image/png;base64':
-            form.instance.content = 'data:image/png;base64,'+ str(base64.b64encode(form.cleaned_data['picture'].file.read()).decode('ascii'))
-
+        if form.instance.contentType in (Post.TypeChoice.IMAGE, Post.TypeChoice.IMAGE2):
+            # Only a reference to the stored image is kept in the post
+            mime = form.instance.contentType.split(';')[0]
+            form.instance.content = blob_reference(store_upload(form.cleaned_data['picture']), mime)
 
-        elif form.instance.contentType == 'image/jpeg;base64':
-            form.instance.content = 'data:image/jpeg;base64,'+ str(base64.b64encode(form.cleaned_data['picture'].file.read()).decode('ascii'))
         # TODO These are just placeholders. Need to figure out what to put here for part 2
         form.instance.source = "http://127.0.0.1:8000/"
         form.instance.origin = "http://127.0.0.1:8000/"
@@ -303,11 +240,8 @@ class AuthorAPIView(ListAPIView):
     pagination_class = AuthorPagination
 
     def get_queryset(self):
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-
         self.Error = False
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             self.Error = True
         #return Author.objects.all().order_by("id")
         return Author.objects.filter(host="https://restlessclients-7b4ebf6b9382.herokuapp.com/").order_by("id")
@@ -344,13 +278,11 @@ class UpdateAuthorApiView(APIView):
     # Restricted to local access.
     def post(self, request, *args, **kwargs):
         # Reference: https://stackoverflow.com/questions/152248/can-i-use-http-basic-authentication-with-django/62028635#62028635
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, id=self.kwargs["pk"])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
             
             serializer = AuthorSerializer(author, data=request.data, partial=True)
@@ -372,44 +304,28 @@ class PostsAPIView(ListCreateAPIView):
 
     # TODO Visibility
     def get_queryset(self):
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-
         self.Error = False
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             self.Error = True
 
         author = get_object_or_404(Author, pk=self.kwargs["pk"])
+        viewer = viewer_for(self.request)
         self.posts = Post.objects.filter(author=self.kwargs["pk"])
+        if not viewer.is_author(author):
+            self.posts = viewer.visible_posts(self.posts, listed_only=True)
 
-        try:
-            user = get_object_or_404(Author, user=self.request.user)
-        except Http404:
-            user = None
-
-        if user == None:
-            print("can'f find user for posts api")
-            self.posts = self.posts.filter(unlisted=False)
-            self.posts = self.posts.exclude(visibility=Post.VisibilityChoice.FRIENDS_ONLY)
-            self.posts = self.posts.exclude(visibility=Post.VisibilityChoice.PRIVATE)            
-        elif not user == author:
-            print("user is not author for posts api")
-            self.posts = self.posts.filter(unlisted=False)
-            self.posts = self.posts.exclude(Q(visibility=Post.VisibilityChoice.FRIENDS_ONLY) & ~Q(author__followers=user))
-            self.posts = self.posts.exclude(Q(visibility=Post.VisibilityChoice.PRIVATE) & ~Q(private_reciever=user))
-
-        self.posts = self.posts.order_by('published')
+        # Other nodes get full posts; our own clients get summaries
+        summary = not identity_for(self.request).is_node
+        self.posts = PostSerializer.prefetch(self.posts.order_by('published'), summary=summary)
         return self.posts
 
     # Restricted to local access.
     def post(self, request, *args, **kwargs):
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, pk=kwargs["pk"])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
             post = Post.objects.create(author=author) # Create with at least the author
@@ -428,29 +344,26 @@ class SinglePostApiView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         author = get_object_or_404(Author, id=self.kwargs["pk"])
         post = get_object_or_404(Post, id=self.kwargs["post_id"], author=self.kwargs["pk"]) # Ensure the post belongs to this author
         
         # TODO we may want to verify the host here
-        try:
-            user = get_object_or_404(Author, user=self.request.user)
-        except Http404:
-            user = None
+        viewer = viewer_for(request)
+        user = viewer.author
 
-        if post.visibility == Post.VisibilityChoice.FRIENDS_ONLY and not (user == post.author or user in post.author.followers.all()):
-            return Response(status=403, data={"detail": "Friends only post. User does not have access"})
-        elif post.visibility == Post.VisibilityChoice.PRIVATE and not (user == post.author or user == post.private_reciever):
+        if not viewer.can_see(post):
+            if post.visibility == Post.VisibilityChoice.FRIENDS_ONLY:
+                return Response(status=403, data={"detail": "Friends only post. User does not have access"})
             return Response(status=403, data={"detail": "Private post. User does not have access"})
 
         context = {
             "user": user,
             "is_friend_only": post.visibility == Post.VisibilityChoice.FRIENDS_ONLY,
-            "user_is_author": user == post.author
+            "user_is_author": user == post.author,
+            "request": request,
         }
 
         serializer = PostSerializer(post, data=request.data, partial=True, context=context)
@@ -460,13 +373,11 @@ class SinglePostApiView(APIView):
     
     # Restricted to local access.
     def post(self, request, *args, **kwargs):
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, id=self.kwargs["pk"])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
             post = get_object_or_404(Post, id=self.kwargs["post_id"], author=self.kwargs["pk"]) # Ensure the post belongs to this author
@@ -478,13 +389,11 @@ class SinglePostApiView(APIView):
 
     # Restricted to local access.
     def delete(self, request, *args, **kwargs):
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, id=self.kwargs["pk"])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
             post = get_object_or_404(Post, id=self.kwargs["post_id"], author=self.kwargs["pk"]) # Ensure the post belongs to this author
@@ -493,13 +402,11 @@ class SinglePostApiView(APIView):
 
     # Restricted to local access.
     def put(self, request, *args, **kwargs):
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, id=self.kwargs["pk"])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
             post = Post.objects.create(author=author, id=self.kwargs["post_id"]) # Create with at least the author and post id
@@ -524,91 +431,88 @@ class InboxAPIView(ListCreateAPIView):
     def get_queryset(self):
         author = get_object_or_404(Author, id=self.kwargs["pk"])
         
-        self.inbox = author.streamPosts.all()
+        # Posts, comments, likes and follow requests, newest first
+        self.inbox = inbox_sources(author)
         self.author_str = str(author.host) + "authors/" + str(author.id)
 
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if (token_type == "Basic") or (author.user != self.request.user):
+        if identity_for(self.request).scheme == "Basic" or author.user_id != self.request.user.id:
             self.Basic = True
         else:
             self.Basic = False
         return self.inbox
+
+    def list(self, request, *args, **kwargs):
+        """Return a page of the inbox, serializing each item by its kind."""
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(serialize_inbox(page, self.get_serializer_context()))
     
     def post(self, request, *args, **kwargs):
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         author = get_object_or_404(Author, id=self.kwargs["pk"])
-
-        data = {
-            **request.data
-        }
-
-        # remote_author = addOrGetRemoteAuthor(request.data['author'])
-        
-
-        if request.data["type"] == "post":
-            post_author = addOrGetRemoteAuthor(data['author'])
-            # update the inbox, i.e. update streamPosts in the Author model
-            post = get_object_or_404(Post, id=request.data["id"].split('/')[6])
-            if post.visibility != post.VisibilityChoice.PRIVATE and not author.following.filter(id=post_author.id).count():
-                # We have unfollowed the remote author, don't accept
-                return Response(status=status.HTTP_204_NO_CONTENT)
-            author.streamPosts.add(post)
-            return Response(status=200)
-        elif request.data["type"] == "Follow":
-            follower = addOrGetRemoteAuthor(data['actor'])
-            serializer = FollowRequestSerializer(data=request.data)
-        elif request.data["type"] == "Like":
-            like_author = addOrGetRemoteAuthor(data['author'])
-            # data['author']['id'] = like_author.id
-            if "comment" in request.data["object"]:
-                message = f"{data['author']['displayName']} liked your comment"
-                link = "/".join(data['object'].split('/')[:7])
-                comment_id = request.data["object"].split('/')[8]
-                data['comment'] = comment_id
-                serializer = CommentLikeSerializer(data=data)
-            else:
-                message = f"{data['author']['displayName']} liked your post"
-                link = data['object']
-                data['post'] = request.data["object"].split('/')[6]
-                serializer = PostLikeSerializer(data=data)
-            Notification.objects.create(author=author, message=message, link=link)
-        elif request.data["type"] == "comment":
-            comment_author = addOrGetRemoteAuthor(request.data['author'])
-            post_id = request.data["id"].split('/')[6]
-            data['post'] = post_id
-            
-            serializer = CommentSerializer(data=data)
-            link = f"{author.url}/posts/{post_id}"
-            message = f"{data['author']['displayName']} commented on your post"
-            Notification.objects.create(author=author, message=message, link=link)
-        else:
-            return Response(status=400) # Invalid type
-    
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=201)
-        return Response(status=400, data=serializer.errors)
+        if settings.INBOX_ASYNC and identity_for(request).is_node and inbound.accepts(request.data):
+            # Answer the node now and process the object in the process_inbound worker
+            inbound.record(author, request.data)
+            return Response(status=status.HTTP_202_ACCEPTED)
+        return inbound.receive(author, request.data)
 
     # Restricted to local access.
     def delete(self, request, *args, **kwargs):
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, id=self.kwargs["pk"])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
-            author.streamPosts.clear()
+            author.inbox_items.all().delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class InboxBatchAPIView(APIView):
+    """
+    Receive many inbox objects from a remote node in one request.
+
+    The body is {"type": "inbox-batch", "items": [{"recipient": ..., "item": ...}]}
+    where each recipient is an author id or URL and each item is an object that
+    could be POSTed to that author's inbox. The items are processed in one
+    transaction and the response holds a status for each one, in order.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if not identity_for(request).is_node:
+            return Response({"detail": "Invalid authorization: access denied."}, status=401)
+
+        items = request.data.get("items")
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a list of items."}, status=400)
+
+        results = []
+        with transaction.atomic():
+            entries = [entry.get("item") for entry in items if isinstance(entry, dict)]
+            try:
+                # Create the remote authors of every item in bulk rather than one at a time
+                with transaction.atomic():
+                    ingest_remote_authors(author for author in map(inbound.actor, entries) if isinstance(author, dict))
+            except DatabaseError:
+                pass  # Each item's handler creates its own author instead
+            for entry in items:
+                try:
+                    author = get_object_or_404(Author, id=str(entry["recipient"]).rstrip('/').split('/')[-1])
+                    # Roll back only this item if it fails part way through
+                    with transaction.atomic():
+                        resp = inbound.receive(author, entry["item"])
+                except Http404:
+                    results.append({"status": 404})
+                except inbound.BAD_DATA_ERRORS:
+                    results.append({"status": 400})
+                else:
+                    results.append({"status": resp.status_code})
+        return Response({"type": "inbox-batch", "items": results}, status=200)
+
+
 class NodeAPIView(APIView):
     """
     Get the list of nodes
@@ -654,20 +558,15 @@ def add_comment(request, **kwargs):
             content = request.POST.get('content')
             comment = Comment.objects.create(author=request.user.author, post=post, comment=content, contentType="text/plain")  # Assuming contentType is plain text for this example
             author = post.author
-            if "restlessclients" not in author.host:
-                # TODO: Bad url construction
-                # if "restlessclients" in author.host:
-                #     auth = ("webcrawlers", "socialwebsilk")
-                #     url = f"https://restlessclients-7b4ebf6b9382.herokuapp.com/api/authors/{author.pk}/inbox"
-                if "im-a-teapot" in author.host:
-                    auth = ("teapot", "rooibos")
-                    url = f"https://im-a-teapot-41db2c906820.herokuapp.com/authors/{author.pk}/inbox/"
-                elif "silk-cmput404" in author.host:
-                    auth = ("restlessclients", "django100")
-                    url = f"https://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{author.pk}/inbox/"
-                
+            node = node_for(author)
+            if node is not None:
+                client = client_for(author)
+                url = f"{node.apiURL}authors/{author.pk}/inbox/"
                 comment_data = CommentSerializer(comment).data
-                resp = requests.post(url, json=comment_data, auth=auth)
+                try:
+                    client.post(url, json=comment_data)
+                except requests.RequestException:
+                    print(f"{author.host} is unreachable")
     return HttpResponseRedirect(reverse('project:post', kwargs=kwargs))
 
 @login_required
@@ -689,20 +588,15 @@ def like_post(request, **kwargs):
             if post is not None:
                 like = PostLike.objects.create(author=request.user.author, post=post, summary=f"{request.user.username} likes this", context=post.source)
                 author = post.author
-                if "restlessclients" not in author.host:
-                    # TODO: Bad url construction
-                    # if "restlessclients" in author.host:
-                    #     auth = ("webcrawlers", "socialwebsilk")
-                    #     url = f"https://restlessclients-7b4ebf6b9382.herokuapp.com/api/authors/{author.pk}/inbox"
-                    if "im-a-teapot" in author.host:
-                        auth = ("teapot", "rooibos")
-                        url = f"https://im-a-teapot-41db2c906820.herokuapp.com/authors/{author.pk}/inbox/"
-                    elif "silk-cmput404" in author.host:
-                        auth = ("restlessclients", "django100")
-                        url = f"https://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{author.pk}/inbox/"
-    
+                node = node_for(author)
+                if node is not None:
+                    client = client_for(author)
+                    url = f"{node.apiURL}authors/{author.pk}/inbox/"
                     like_data = PostLikeSerializer(like).data
-                    resp = requests.post(url, json=like_data, auth=auth)
+                    try:
+                        client.post(url, json=like_data)
+                    except requests.RequestException:
+                        print(f"{author.host} is unreachable")
     # else:
     #     PostLike.objects.filter(author=request.user.author, post=post).delete()
     return HttpResponseRedirect(reverse('project:post', args=[kwargs['author_id'], pk]))
@@ -731,19 +625,19 @@ class FollowRequestSendView(APIView):
         if request.user.author.id != author.id and not request_exists:
             summary = f"{request.user.author.displayName} wants to follow {author.displayName}"
             fr = FollowRequest.objects.create(follower=request.user.author, following=author, summary=summary)
-            if "restlessclients" not in author.host:
-                # TODO: Bad url construction
-                if "im-a-teapot" in author.host:
-                    auth = ("teapot", "rooibos")
-                    url = f"https://im-a-teapot-41db2c906820.herokuapp.com/authors/{author.pk}/inbox"
-                elif "silk-cmput404" in author.host:
-                    auth = ("restlessclients", "django100")
-                    url = f"https://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/{author.pk}/inbox"
-                
+            node = node_for(author)
+            if node is None:
+                add_to_inbox(author, fr)
+            else:
+                url = f"{node.apiURL}authors/{author.pk}/inbox"
                 fr_data = FollowRequestSerializer(fr).data
-                resp = requests.post(url, json=fr_data, auth=auth)
-                if resp.status_code >= 400:
+                try:
+                    resp = client_for(author).post(url, json=fr_data)
+                except requests.RequestException:
                     fr.delete()
+                else:
+                    if resp.status_code >= 400:
+                        fr.delete()
         # return redirect(reverse('project:profile', args=[pk]))
         return Response(status=status.HTTP_201_CREATED)
 
@@ -776,88 +670,37 @@ def accept_follow_request(request, pk):
     return redirect(reverse('project:home'))
 
 
-class SearchAuthors(APIView):
-    """Search for an author by displayName."""
+class SearchAuthors(ListAPIView):
+    """Search for an author by the start of their displayName.
+
+    Remote authors are mirrored locally by the sync_remote_authors command,
+    so the search makes no requests to other nodes. Names are matched and
+    ordered on UPPER(displayName), which the author_name_search index covers,
+    so a page of results is read off the index instead of scanning every author.
+    """
 
     #authentication_classes = [BasicAuthentication, SessionAuthentication]
     #permission_classes = [IsAuthenticated]
 
+    serializer_class = AuthorSerializer
+    pagination_class = AuthorSearchPagination
+
     def get_queryset(self):
         query = self.request.GET.get("username")
-        try:
-            response = requests.get("https://im-a-teapot-41db2c906820.herokuapp.com/api/authors/", auth=("teapot", "rooibos"))
-            authorsList = response.json()["items"]
-            for author in authorsList:
-                if len(author["id"].split('/'))==5:
-                    if not Author.objects.filter(id=author["id"].split('/')[4]).exists():
-                        addOrGetRemoteAuthor(author)
-                else:
-                    if not Author.objects.filter(id=author["id"].split('/')[5]).exists():
-                        addOrGetRemoteAuthor(author)
-        except:
-            # Catch in case of bad data
-            print("im-a-teapot server is down")
-
-        try:
-            response2 = requests.get("https://silk-cmput404-project-21e5c91727a7.herokuapp.com/api/authors/", auth=("RESTless Clients", "RESTlessClients1!"))
-            authorsList2 = response2.json()['data']
-
-            for author in authorsList2:
-                if not Author.objects.filter(id=author["id"].split('/')[5]).exists():
-                    addOrGetRemoteAuthor(author)
-        except:
-            # Catch in case of bad data
-            print("webcrawlers server is down")
-
-        try:
-            response3 = requests.get("https://cmput404-project-backend-tian-aaf1fa9b20e8.herokuapp.com/authors/", auth=("cross-server", "password"))
-            authorsList3 = response3.json()['items']
-
-            for author in authorsList3:
-                if not Author.objects.filter(id=author["id"].split('/')[4]).exists():
-                    addOrGetRemoteAuthor(author)
-        except:
-            # Catch in case of bad data
-            print("ctrl+c and ctrl+v server is down")
-
-        # TODO: remove example testcase for addOrGetRemoteCommentLike
-        # resp = requests.get("https://restlessclients-7b4ebf6b9382.herokuapp.com/api/authors/a0cda9c8-5320-4757-acbb-3b7077820584/", auth=("grapevine", "socialwebgrape"))
-        # print(resp.json())
-        # author = addOrGetRemoteAuthor(resp.json())
-        # print(author)
-        # resp2 = requests.get("https://restlessclients-7b4ebf6b9382.herokuapp.com/api/authors/a0cda9c8-5320-4757-acbb-3b7077820584/posts/b06e75fb-868c-4dbe-9bf5-620397116625", auth=("grapevine", "socialwebgrape"))
-        # post = addOrGetRemotePost(resp2.json(), author)
-        # resp3 = requests.get("https://restlessclients-7b4ebf6b9382.herokuapp.com/api/authors/a0cda9c8-5320-4757-acbb-3b7077820584/posts/b06e75fb-868c-4dbe-9bf5-620397116625/comments/", auth=("grapevine", "socialwebgrape"))
-        # commentsList = resp3.json()["comments"]
-        # for comment in commentsList:
-        #     comment = addOrGetRemoteComment(comment, post)
-        #     resp4 = requests.get("https://restlessclients-7b4ebf6b9382.herokuapp.com/api/authors/a0cda9c8-5320-4757-acbb-3b7077820584/posts/b06e75fb-868c-4dbe-9bf5-620397116625/comments/396b79bb-0ce8-4803-9f69-02550829c1bf/likes", auth=("grapevine", "socialwebgrape"))
-        #     for commentLike in resp4.json():
-        #         commentLike = addOrGetRemoteCommentLike(commentLike, comment)
-
-        
-        if query == None:
-            userlist = Author.objects.all().order_by('displayName')
-            return userlist
-        else:
-            userlist = Author.objects.filter(displayName__icontains=query).order_by('displayName')
-            return userlist
-
+        authors = Author.objects.annotate(name_key=Upper("displayName")).order_by("name_key", "id")
+        if query:
+            prefix = query.upper()
+            # The lower bound lets the database seek to the first match in the index
+            authors = authors.filter(name_key__gte=prefix, name_key__startswith=prefix)
+        return authors
 
     def get(self, request, *args, **kwargs):
-        """Return the serialized followers of the author."""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        """Return a page of the matching authors."""
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
-
-        query_set = self.get_queryset()
-        serializer = AuthorSerializer(query_set, many=True)
-        results = {
-            "type": "authors",
-            "items": serializer.data
-        }
-        return Response(results)
+        # When each node's authors were last mirrored
+        self.synced = dict(Node.objects.values_list("host", "authorsSyncedAt"))
+        return self.list(request, *args, **kwargs)
 
 
 class FollowersAPIView(APIView):
@@ -872,9 +715,7 @@ class FollowersAPIView(APIView):
     
     def get(self, request, *args, **kwargs):
         """Return the serialized followers of the author."""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         query_set = self.get_queryset()
@@ -893,9 +734,7 @@ class FollowerAPIView(APIView):
     
     def get(self, request, *args, **kwargs):
         """Check if the author is a follower. 404 if not"""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         # Not sure what this should return in the response
@@ -907,13 +746,11 @@ class FollowerAPIView(APIView):
     # Restricted to local access.
     def put(self, request, *args, **kwargs):
         """Add a follower to the author if authenticated."""
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, pk=kwargs['pk'])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
             # Add to DB if necessary?
@@ -924,13 +761,11 @@ class FollowerAPIView(APIView):
     # Restricted to local access.
     def delete(self, request, *args, **kwargs):
         """Remove an author from the followers of another if authenticated."""
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             author = get_object_or_404(Author, pk=kwargs['pk'])
-            if author.user != request.user:
+            if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
             follower = get_object_or_404(author.followers, pk=kwargs['follower_id'])
@@ -945,13 +780,11 @@ class FollowRequestAPIView(APIView):
 
     def get(self, request, *args, **kwargs):
         """Retrieve the follow requests for an author"""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         author = get_object_or_404(Author, pk=kwargs['pk'])
-        if author.user != request.user:
+        if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         serializer = FollowRequestSerializer(FollowRequest.objects.filter(following=author), many=True)
@@ -959,9 +792,7 @@ class FollowRequestAPIView(APIView):
 
     def post(self, request, *args, **kwargs):
         """Create the follow request"""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         
         # Make sure author exists?
@@ -969,7 +800,7 @@ class FollowRequestAPIView(APIView):
         # Assumes other author is in the database?
         serializer = FollowRequestSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            add_to_inbox(author, serializer.save())
             return Response(serializer.data, status=201)
         return Response(status=400, data=serializer.errors)
 
@@ -987,12 +818,9 @@ class CommentAPIView(ListCreateAPIView):
         """Check that author and post exist and get comments
         in reverse chronological order.
         """
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        
-        
+
         self.Error = False
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             self.Error = True
     
     
@@ -1000,18 +828,11 @@ class CommentAPIView(ListCreateAPIView):
     
     
         author = get_object_or_404(Author, pk=self.kwargs['author_id'])
-        try:
-            user = get_object_or_404(Author, user=self.request.user)
-        except Http404:
-            user = None
-
         self.post_obj = get_object_or_404(Post, pk=self.kwargs["post_id"])
 
-        if self.post_obj.visibility == Post.VisibilityChoice.FRIENDS_ONLY and not author == user:
-            # users can only see their own comments on friends only
-            return self.post_obj.comment_set.all().filter(author=user).order_by('-published')
-        else:
-            return self.post_obj.comment_set.all().order_by('-published')
+        # users can only see their own comments on friends only posts
+        comments = viewer_for(self.request).visible_comments(self.post_obj, self.post_obj.comment_set.all())
+        return comments.order_by('-published')
 
 
 
@@ -1022,9 +843,7 @@ class CommentAPIView(ListCreateAPIView):
     # Restricted to local access.
     def post(self, request, *args, **kwargs):
         """Add a comment to a post if authenticated"""
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         else:
             data = {
@@ -1049,9 +868,7 @@ class PostLikeAPIView(ListAPIView):
 
     def get_queryset(self):
         """Check author and post exist and get likes"""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         author = get_object_or_404(Author, pk=self.kwargs['author_id'])
@@ -1068,9 +885,7 @@ class CommentLikeAPIView(ListAPIView):
 
     def get_queryset(self):
         """Check author, post, and comment exist and get likes."""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         author = get_object_or_404(Author, pk=self.kwargs['author_id'])
@@ -1086,13 +901,11 @@ class UserLikedAPIView(APIView):
 
     def get(self, request, *args, **kwargs):
         """Concatenate the liked posts and liked comments from the author."""
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         author = get_object_or_404(Author, pk=kwargs['author_id'])
-        if author.user != request.user:
+        if author.user_id != request.user.id:
                 return Response({"detail": "Invalid authorization: access denied."}, status=401)
 
         postlikeserializer = PostLikeSerializer(author.postlike_set.filter(post__visibility=Post.VisibilityChoice.PUBLIC), many=True)
@@ -1118,9 +931,7 @@ class SharePostView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-        if token_type == "Basic":
+        if identity_for(request).scheme == "Basic":
             return Response({"detail": "Invalid authorization: access denied."}, status=401)
         new_post = {
             **request.data,
@@ -1132,6 +943,7 @@ class SharePostView(APIView):
         new_post.pop('like_count')
         new_post.pop('comment_count')
         new_post.pop('liked_by_me')
+        new_post.pop('variants', None)
         post = create_post(new_post)
         return Response(status=status.HTTP_201_CREATED)
 
@@ -1141,13 +953,42 @@ class NotificationAPIView(ListAPIView):
     serializer_class = NotificationSerializer
 
     def get_queryset(self):
-        auth_header = self.request.META.get('HTTP_AUTHORIZATION', '')
-        token_type, _, credentials = auth_header.partition(' ')
-
         self.Error = False
-        if token_type == "Basic" and not (Node.objects.filter(user=self.request.user).exists()):
+        if identity_for(self.request).basic_without_node:
             self.Error = True
 
         # 404 if invalid author
         author = get_object_or_404(Author, pk=self.kwargs['author_id'])
         return author.notification_set.all().order_by('-timestamp')
+
+
+def blob_view(request, name):
+    """Stream a stored image.
+
+    Blobs are named by the hash of their bytes and never change, so the
+    name doubles as the ETag and clients may cache the response forever.
+    Resized variants are made on first request.
+
+    Parameters:
+        name - the blob's file name, <sha256>.<png|jpg>, or <sha256>-<width>.<png|jpg>
+            for a variant
+    """
+    match = BLOB_NAME.match(name)
+    if match is None:
+        raise Http404
+    width = match["width"] and int(match["width"])
+    if width and width not in settings.IMAGE_VARIANT_WIDTHS:
+        raise Http404
+    etag = f'"{name.rsplit(".", 1)[0]}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+    else:
+        mime = MIME_TYPES[match["ext"]]
+        try:
+            path = variant_path(match["digest"], width, mime) if width else blob_path(match["digest"])
+            response = FileResponse(open(path, "rb"), content_type=mime)
+        except FileNotFoundError:
+            raise Http404
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
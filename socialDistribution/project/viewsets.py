@@ -1,4 +1,4 @@
-from django.db.models import Count, Exists, OuterRef, Subquery, Func, F, IntegerField, Q
+from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from django.http import Http404
 from rest_framework import viewsets, filters, response, status, permissions
@@ -9,6 +9,9 @@ from . import models
 from . import local_serializers as serializers
 from .models import FollowRequest, PostLike, Comment, CommentLike, Post, Author
 from .permissions import PostPermission
+from .streams import add_to_inbox
+from .summaries import summarize
+from .visibility import viewer_for
 from .local_serializers import FollowRequestSerializer, CommentSerializer, AddCommentSerializer, PostRetrieveSerializer
 
 
@@ -37,9 +40,11 @@ class AuthorViewSet(viewsets.ModelViewSet):
         follower = self.request.user.author
         if following == follower:
             raise ValidationError("Authors cannot follow themselves")
-        FollowRequest.objects.get_or_create(
+        follow_request, created = FollowRequest.objects.get_or_create(
             follower=follower, following=following, defaults={"summary": ""}
         )
+        if created:
+            add_to_inbox(following, follow_request)
         return response.Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=True, methods=["POST"])
@@ -93,44 +98,11 @@ class PostViewSet(viewsets.ModelViewSet):
     filterset_fields = ["author"]
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = viewer_for(self.request).visible_posts(super().get_queryset(), listed_only=self.action == "list")
 
-        try:
-            user = get_object_or_404(Author, user=self.request.user)
-        except Http404:
-            user = None
-
-        if user == None:
-            print("can'f find user for posts api")
-            print("user", user)
-            print("author", author)
-            if self.action == "list":
-                qs = qs.filter(unlisted=False)
-            qs = qs.exclude(visibility=Post.VisibilityChoice.FRIENDS_ONLY)
-            qs = qs.exclude(visibility=Post.VisibilityChoice.PRIVATE)            
-        else:
-            print("user is not author for posts api")
-            if self.action == "list":
-                qs = qs.filter(unlisted=False)
-            qs = qs.exclude(Q(visibility=Post.VisibilityChoice.FRIENDS_ONLY) & ~(Q(author__followers=user) | Q(author=user)))
-            qs = qs.exclude(Q(visibility=Post.VisibilityChoice.PRIVATE) & ~(Q(private_reciever=user) | Q(author=user)))
-
-        like_count = PostLike.objects.filter(
-            post=OuterRef("id")
-        ).order_by().annotate(
-            count=Func(F('id'), function='Count', output_field=IntegerField())
-        ).values('count')
-
-        comment_count = Comment.objects.filter(
-            post=OuterRef("id")
-        ).order_by().annotate(
-            count=Func(F('id'), function='Count', output_field=IntegerField())
-        ).values('count')
-
-        qs = qs.annotate(
-            like_count=Subquery(like_count),
-            comment_count=Subquery(comment_count),
-        )
+        # like_count and comment_count are read from the row
+        if self.action == 'list':
+            qs = summarize(qs)
         if self.action == 'retrieve':
             qs = qs.annotate(
                 liked_by_me=Exists(PostLike.objects.filter(author=self.request.user.author, post=OuterRef("pk")))
@@ -155,38 +127,17 @@ class PostViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["GET"])
     def comments(self, request, pk=None, **kwargs):
 
-        try:
-            post = get_object_or_404(Post, pk=pk)
-            post_author = post.author
-            user = request.user.author
-        except:
-            post = None
-            post_author = None
-            user = request.user.author
-    
-        if post == None or (post.visibility == Post.VisibilityChoice.FRIENDS_ONLY and not post_author == user):
-            # filter comments if friends only post or 
-            like_count = CommentLike.objects.filter(
-                comment=OuterRef("id")
-            ).order_by().annotate(
-                count=Func(F('id'), function='Count', output_field=IntegerField())
-            ).values('count')
-
-            comments = Comment.objects.filter(post_id=pk, author=user).annotate(
-                like_count=Subquery(like_count),
-                liked_by_me=Exists(CommentLike.objects.filter(author=request.user.author, comment=OuterRef("pk")))
-            )
+        viewer = viewer_for(request)
+        post = Post.objects.filter(pk=pk).first()
+        comments = Comment.objects.filter(post_id=pk)
+        if post is None:
+            comments = comments.filter(author=viewer.author)
         else:
-            like_count = CommentLike.objects.filter(
-                comment=OuterRef("id")
-            ).order_by().annotate(
-                count=Func(F('id'), function='Count', output_field=IntegerField())
-            ).values('count')
-                    
-            comments = Comment.objects.filter(post_id=pk).annotate(
-                like_count=Subquery(like_count),
-                liked_by_me=Exists(CommentLike.objects.filter(author=request.user.author, comment=OuterRef("pk")))
-            )
+            # filter comments if friends only post
+            comments = viewer.visible_comments(post, comments)
+        comments = comments.annotate(
+            liked_by_me=Exists(CommentLike.objects.filter(author=request.user.author, comment=OuterRef("pk")))
+        )
     
         data = CommentSerializer(comments, many=True).data
         return response.Response(data=data)
@@ -198,13 +149,7 @@ class PostViewSet(viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
         instance = serializer.post_comment(post_id=pk, author_id=request.user.author.id)
-        like_count = CommentLike.objects.filter(
-            comment=OuterRef("id")
-        ).order_by().annotate(
-            count=Func(F('id'), function='Count', output_field=IntegerField())
-        ).values('count')
         instance = Comment.objects.annotate(
-            like_count=Subquery(like_count),
             liked_by_me=Exists(CommentLike.objects.filter(author=self.request.user.author, comment=OuterRef("pk")))
         ).get(pk=instance.pk)
         serializer = CommentSerializer(instance=instance)
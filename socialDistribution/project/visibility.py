@@ -0,0 +1,106 @@
+"""
+Module containing the rules for who can see which posts and comments.
+
+A Viewer wraps the author making a request (or nobody, for anonymous users
+and remote nodes). The same rules are available as a single SQL predicate
+for filtering querysets, and as a check on one post that makes no queries
+once the viewer's followed authors are loaded. Use viewer_for to get the
+viewer of a request, so the followed authors are loaded at most once per
+request.
+
+The rules:
+    PUBLIC posts are visible to everyone
+    FRIENDS_ONLY posts are visible to their author and the author's followers
+    PRIVATE posts are visible to their author and their private reciever
+    comments on a FRIENDS_ONLY post are visible to the post's author; other
+        viewers only see their own comments
+
+Date: 2026-10-18
+
+Copyright 2023 RESTless Clients
+Licensed under the MIT License
+
+Sources:
+https://docs.djangoproject.com/en/4.2/topics/db/queries/#complex-lookups-with-q-objects
+"""
+
+from functools import cached_property
+
+from django.db.models import Q
+
+from .identity import identity_for
+from .models import Author, Post
+
+
+class Viewer:
+    """The author viewing posts.
+
+    Attributes:
+        author - the viewing author, or None for anonymous viewers and nodes
+        following_ids - the ids of the authors the viewer follows, loaded on first use
+    """
+
+    def __init__(self, author):
+        self.author = author
+
+    @cached_property
+    def following_ids(self):
+        if self.author is None:
+            return frozenset()
+        return frozenset(self.author.following.values_list("id", flat=True))
+
+    def is_author(self, author):
+        """Check whether the viewer is the given author."""
+        return self.author is not None and author is not None and self.author.pk == author.pk
+
+    def can_see(self, post):
+        """Check whether the viewer can see a post, without querying for the post's author."""
+        if post.visibility == Post.VisibilityChoice.PUBLIC:
+            return True
+        if self.author is None:
+            return False
+        if post.author_id == self.author.pk:
+            return True
+        if post.visibility == Post.VisibilityChoice.FRIENDS_ONLY:
+            return post.author_id in self.following_ids
+        if post.visibility == Post.VisibilityChoice.PRIVATE:
+            return post.private_reciever_id == self.author.pk
+        return False
+
+    def post_filter(self):
+        """Get a Q object matching the posts the viewer can see."""
+        public = Q(visibility=Post.VisibilityChoice.PUBLIC)
+        if self.author is None:
+            return public
+        return public | Q(author=self.author) | Q(
+            visibility=Post.VisibilityChoice.FRIENDS_ONLY,
+            author__in=Author.objects.filter(followers=self.author).values("id"),
+        ) | Q(visibility=Post.VisibilityChoice.PRIVATE, private_reciever=self.author)
+
+    def visible_posts(self, posts, listed_only=False):
+        """Filter a queryset of posts to the ones the viewer can see.
+
+        Parameters:
+            posts - the queryset of posts
+            listed_only - also drop unlisted posts, for browsing
+        """
+        posts = posts.filter(self.post_filter())
+        if listed_only:
+            posts = posts.filter(unlisted=False)
+        return posts
+
+    def visible_comments(self, post, comments):
+        """Filter a queryset of comments on `post` to the ones the viewer can see."""
+        if post.visibility != Post.VisibilityChoice.FRIENDS_ONLY:
+            return comments
+        if self.author is not None and post.author_id == self.author.pk:
+            return comments
+        return comments.filter(author=self.author) if self.author is not None else comments.none()
+
+
+def viewer_for(request):
+    """Get the viewer making a request, created once and cached on the request."""
+    viewer = getattr(request, "viewer", None)
+    if viewer is None:
+        viewer = request.viewer = Viewer(identity_for(request).author)
+    return viewer
@@ -99,7 +99,7 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        'rest_framework.authentication.BasicAuthentication',
+        'project.authentication.NodeBasicAuthentication',
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
 }
@@ -177,4 +177,56 @@ CORS_ALLOWED_ORIGINS = [
     "https://test-social-distibution-s-599bb08fc4a4.herokuapp.com"
 ]
 
-FRONTEND_ASSETS = BASE_DIR.parent / "frontend" / "dist" / "assets"
\ No newline at end of file
+FRONTEND_ASSETS = BASE_DIR.parent / "frontend" / "dist" / "assets"
+# Outbox delivery to remote inboxes (see project/outbox.py)
+OUTBOX_WORKERS = 8
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_LEASE_SECONDS = 300
+OUTBOX_BATCH_SIZE = 50
+# Seconds between the outbox worker's checks of pending remote follow requests
+FOLLOW_RECONCILE_INTERVAL = 60
+
+# Authors with more followers than this are not fanned out to follower
+# streams on post creation; their posts are merged in when streams are read
+STREAM_FANOUT_FOLLOWER_LIMIT = 1000
+
+# HTTP clients for remote nodes (see project/federation.py)
+NODE_CLIENT_POOL_SIZE = 10
+NODE_CLIENT_CONNECT_TIMEOUT = 3.05
+NODE_CLIENT_READ_TIMEOUT = 10
+NODE_FETCH_WORKERS = 16
+# Seconds a process keeps its in-memory list of nodes (see project/nodes.py)
+NODE_REGISTRY_TTL = 60
+# Seconds a node's verified Basic credentials are cached (see project/authentication.py)
+NODE_CREDENTIAL_CACHE_TTL = 300
+
+# Page size used when mirroring remote author directories (see project/directory.py)
+AUTHOR_SYNC_PAGE_SIZE = 100
+
+# Content-addressed storage for post images (see project/blobs.py)
+BLOB_ROOT = BASE_DIR / "blobs"
+# Widths of the resized variants served for stored images (see project/thumbnails.py)
+IMAGE_VARIANT_WIDTHS = [320, 640, 1280]
+
+# Uploads are streamed to disk and hashed as they arrive (see project/uploads.py)
+FILE_UPLOAD_HANDLERS = ["project.uploads.HashingUploadHandler"]
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+# Characters of content included for each post in list endpoints (see project/summaries.py)
+POST_PREVIEW_LENGTH = 300
+
+# Objects POSTed to inboxes by nodes are recorded and answered with 202, then
+# processed by the process_inbound command (see project/inbound.py)
+INBOX_ASYNC = True
+INBOUND_MAX_ATTEMPTS = 5
+INBOUND_LEASE_SECONDS = 300
+
+# Seconds the comments and likes of a remote post are served before being
+# refetched in the background (see project/engagement.py)
+ENGAGEMENT_REFRESH_TTL = 120
+ENGAGEMENT_REFRESH_WORKERS = 4
+
+# Seconds the posts of a remote author are served before their node is asked
+# for new ones in the background (see project/profiles.py)
+PROFILE_SYNC_TTL = 300
+PROFILE_SYNC_WORKERS = 4